@@ -7,14 +7,20 @@ os.environ.setdefault("OAUTHLIB_RELAX_TOKEN_SCOPE", "1")
 
 import sys
 import json
+import time
 import asyncio
 from types import SimpleNamespace
 from datetime import date, timedelta
 
-import pandas as pd
+_APP_T0 = time.perf_counter()
+
 import streamlit as st
 from google.oauth2.credentials import Credentials
 
+# Carga diferida: pandas y los módulos de análisis se importan recién cuando se usan
+from modules.lazy_imports import lazy_module, timed_import, module_available, import_timings
+pd = lazy_module("pandas")
+
 # ====== Config base ======
 try:
     st.set_page_config(layout="wide", page_title="Análisis SEO", page_icon="📊")
@@ -26,15 +32,94 @@ for _name in [
     "app_constants","app_config","app_ext","app_utils","app_params",
     "app_errors","app_activity","app_auth_flow","app_diagnostics","app_ai",
 ]:
-    try:
-        _mod = __import__(f"modules.{_name}", fromlist=["*"])
-        sys.modules.setdefault(_name, _mod)
-    except Exception:
-        pass
+    # Proxies diferidos: el módulo real se importa en el primer uso
+    sys.modules.setdefault(_name, lazy_module(f"modules.{_name}"))
 
 # ====== UI / Branding ======
 from modules.ui import apply_page_style, get_user, sidebar_user_info, login_screen
 
+# ====== Carga de módulos ======
+from modules.app_config import apply_base_style_and_logo, get_app_home
+from modules.app_utils import get_qp, clear_qp, has_gsc_scope, norm, has_ga4_scope
+
+def has_docs_scope(scopes: set[str] | list[str] | tuple[str, ...] | None) -> bool:
+    return "https://www.googleapis.com/auth/documents" in set(scopes or [])
+
+from modules.app_activity import maybe_prefix_sheet_name_with_medio, activity_log_append
+try:
+    from modules.app_auth_flow import step0_google_identity, logout_screen
+except ModuleNotFoundError:
+    from app_auth_flow import step0_google_identity, logout_screen
+except Exception as e:
+    import traceback as _tb
+    st.error(f"Error al importar modules.app_auth_flow: {e}")
+    st.code(_tb.format_exc())
+    st.stop()
+
+app_diagnostics = lazy_module("modules.app_diagnostics")  # solo se usa en DEBUG
+from modules.utils import token_store
+from modules.drive import ensure_drive_clients, get_google_identity, pick_destination, share_controls
+
+# ====== Estilo ======
+apply_base_style_and_logo()
+try:
+    apply_page_style()
+except Exception:
+    pass
+
+st.markdown("""<style>header[data-testid="stHeader"] { z-index:1500 !important; }</style>""", unsafe_allow_html=True)
+st.title("Analizador SEO 🚀")
+
+# Flag global
+st.session_state.setdefault("post_actions_visible", False)
+
+# ============== App ==============
+
+APP_HOME = get_app_home()
+
+# Detectar pantalla de logout por query param
+_view = get_qp().get("view")
+if isinstance(_view, list):
+    _view = _view[0] if _view else None
+if _view == "logout":
+    logout_screen(APP_HOME)
+    st.stop()
+
+# Preferir Paso 0 (OIDC + Drive/Sheets + GSC en un solo botón)
+prefer_oidc = bool(st.secrets.get("auth", {}).get("prefer_oidc", True))
+
+ident = st.session_state.get("_google_identity")
+user = get_user()
+
+# Si había bypass y preferimos OIDC, forzamos Paso 0
+if prefer_oidc and st.session_state.get("_auth_bypass"):
+    st.session_state.pop("_auth_bypass", None)
+    user = None
+
+# --- PASO 0: Login botón Google (web) ---
+if prefer_oidc and not ident:
+    ident = step0_google_identity()  # guarda st.session_state["creds_dest"] y token_store["creds_dest"]
+    if not ident:
+        st.stop()
+
+# Si no hay user de Streamlit, creamos uno con la identidad OIDC
+if not user:
+    if ident:
+        user = SimpleNamespace(
+            is_logged_in=True,
+            name=(ident.get("name") or "Invitado"),
+            email=(ident.get("email") or "—"),
+            picture=(ident.get("picture")),
+        )
+    else:
+        login_screen()
+        st.stop()
+
+# ====== Módulos de análisis (diferidos hasta después del login) ======
+_t_mods = time.perf_counter()
+from modules.gsc import ensure_sc_client
+from modules.app_errors import run_with_indicator, queue_job, job_owner
+
 # ====== Documento de texto ======
 # Intentar local -> externo -> fallback mínimo.
 from modules.utils import ensure_external_package
@@ -48,9 +133,9 @@ except Exception:
     except Exception:
         # Fallback mínimo: crea un Doc en blanco, inserta el texto y lo mueve a la carpeta destino.
         def create_doc_from_template_with_content(credentials, title, analysis_text, dest_folder_id=None):
-            from googleapiclient.discovery import build
-            drive = build("drive", "v3", credentials=credentials, cache_discovery=False)
-            docs  = build("docs",  "v1", credentials=credentials, cache_discovery=False)
+            from modules.google_clients import get_service
+            drive = get_service("drive", "v3", credentials)
+            docs  = get_service("docs",  "v1", credentials)
             # Crear Doc
             doc = docs.documents().create(body={"title": title}).execute()
             doc_id = doc["documentId"]
@@ -72,8 +157,6 @@ except Exception:
             ).execute()
             return doc_id
 
-# ====== Carga de módulos ======
-from modules.app_config import apply_base_style_and_logo, get_app_home
 from modules.app_ext import (
     USING_EXT,
     run_core_update,
@@ -86,11 +169,6 @@ from modules.app_ext import (
     run_discover_retention,  # NUEVO
 )
 
-from modules.app_utils import get_qp, clear_qp, has_gsc_scope, norm, has_ga4_scope
-
-def has_docs_scope(scopes: set[str] | list[str] | tuple[str, ...] | None) -> bool:
-    return "https://www.googleapis.com/auth/documents" in set(scopes or [])
-
 from modules.app_ai import load_prompts, gemini_healthcheck, gemini_summary
 from modules.app_params import (
     params_for_core_update,
@@ -116,28 +194,17 @@ except Exception:
         run_sections_analysis = None
     run_ga4_audience_report = None
 
-from modules.app_activity import maybe_prefix_sheet_name_with_medio, activity_log_append
-from modules.app_errors import run_with_indicator
-try:
-    from modules.app_auth_flow import step0_google_identity, logout_screen
-except ModuleNotFoundError:
-    from app_auth_flow import step0_google_identity, logout_screen
-except Exception as e:
-    import traceback as _tb
-    st.error(f"Error al importar modules.app_auth_flow: {e}")
-    st.code(_tb.format_exc())
-    st.stop()
+# ====== Módulos GA4 (los clientes gRPC se importan solo si se elige GA4) ======
+if module_available("google.analytics.admin_v1beta") and module_available("google.analytics.data_v1beta"):
+    def build_admin_client(credentials):
+        return timed_import("modules.ga4_admin").build_admin_client(credentials)
 
-from modules.app_diagnostics import scan_repo_for_gsc_and_filters, read_context
-from modules.utils import token_store
-from modules.drive import ensure_drive_clients, get_google_identity, pick_destination, share_controls
-from modules.gsc import ensure_sc_client
+    def build_data_client(credentials):
+        return timed_import("modules.ga4_data").build_data_client(credentials)
 
-# ====== Módulos GA4 ======
-try:
-    from modules.ga4_admin import build_admin_client, list_account_property_summaries
-    from modules.ga4_data import build_data_client
-except Exception:
+    def list_account_property_summaries(admin_client):
+        return timed_import("modules.ga4_admin").list_account_property_summaries(admin_client)
+else:
     build_admin_client = None
     build_data_client = None
     def list_account_property_summaries(_): return []
@@ -146,70 +213,93 @@ try:
 except Exception:
     class PermissionDenied(Exception): pass
 
-# ====== Estilo ======
-apply_base_style_and_logo()
-try:
-    apply_page_style()
-except Exception:
-    pass
-
-st.markdown("""<style>header[data-testid="stHeader"] { z-index:1500 !important; }</style>""", unsafe_allow_html=True)
-st.title("Analizador SEO 🚀")
-
-# Flag global
-st.session_state.setdefault("post_actions_visible", False)
-
 # ---------- IA / Prompts ----------
 load_prompts()
 if not st.session_state.get("DEBUG"):
     try:
-        ok, _ = gemini_healthcheck()
+        # Chequeo liviano: no importa el SDK de Gemini en cada rerun
+        ok, _ = gemini_healthcheck(import_sdk=False)
         if not ok:
             st.caption("💡 Podés cargar una API key de Gemini en Secrets.")
     except Exception:
         pass
 
-# ============== App ==============
-
-APP_HOME = get_app_home()
-
-# Detectar pantalla de logout por query param
-_view = get_qp().get("view")
-if isinstance(_view, list):
-    _view = _view[0] if _view else None
-if _view == "logout":
-    logout_screen(APP_HOME)
-    st.stop()
-
-# Preferir Paso 0 (OIDC + Drive/Sheets + GSC en un solo botón)
-prefer_oidc = bool(st.secrets.get("auth", {}).get("prefer_oidc", True))
-
-ident = st.session_state.get("_google_identity")
-user = get_user()
-
-# Si había bypass y preferimos OIDC, forzamos Paso 0
-if prefer_oidc and st.session_state.get("_auth_bypass"):
-    st.session_state.pop("_auth_bypass", None)
-    user = None
-
-# --- PASO 0: Login botón Google (web) ---
-if prefer_oidc and not ident:
-    ident = step0_google_identity()  # guarda st.session_state["creds_dest"] y token_store["creds_dest"]
-    if not ident:
-        st.stop()
-
-# Si no hay user de Streamlit, creamos uno con la identidad OIDC
-if not user:
-    if ident:
-        user = SimpleNamespace(
-            is_logged_in=True,
-            name=(ident.get("name") or "Invitado"),
-            email=(ident.get("email") or "—"),
-            picture=(ident.get("picture")),
-        )
+st.session_state["_startup_timing"] = {
+    "hasta_login_s": round(_t_mods - _APP_T0, 3),
+    "modulos_analisis_s": round(time.perf_counter() - _t_mods, 3),
+}
+
+def _render_trace_panel():
+    """Desglose de tiempos de las últimas ejecuciones (modules/tracing.py) + export JSON."""
+    from modules import tracing
+    traces = tracing.recent(st.session_state)
+    if not traces:
+        st.caption("Todavía no hay ejecuciones registradas en esta sesión.")
+        return
+    labels = [f"{t.name} · {t.started_at[11:19]} UTC · {t.duration:.1f}s" + (f" · ❌ {t.root.error}" if t.root.error else "")
+              for t in traces]
+    idx = st.selectbox("Ejecución", range(len(traces)), format_func=lambda i: labels[i], key="trace_panel_pick")
+    tr = traces[idx]
+    tot = tr.totals()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Total", f"{tr.duration:.1f}s")
+    c2.metric("Llamadas API", tot.get("api_calls", 0))
+    c3.metric("Filas", tot.get("rows", 0))
+    c4.metric("MB", f"{tot.get('bytes', 0) / 1e6:.1f}")
+    st.dataframe(tr.breakdown(), use_container_width=True, hide_index=True)
+    spans = sorted((sp.to_dict() for sp in tr.spans if sp is not tr.root), key=lambda d: d["duration_s"], reverse=True)
+    if spans:
+        st.caption("Spans más lentos")
+        st.dataframe([{"span": d["name"], "tipo": d["kind"], "seg": d["duration_s"], "inicio": d["start_s"],
+                       "hilo": d["thread"], **d["counters"], "error": d["error"]} for d in spans[:25]],
+                     use_container_width=True, hide_index=True)
+    st.download_button("⬇️ Exportar traza (JSON)", data=tr.to_json(), file_name=f"traza_{tr.id}.json",
+                       mime="application/json", key=f"trace_dl_{tr.id}")
+
+_JOB_ICONS = {"queued": "🕒", "running": "⏳", "done": "✅", "error": "❌", "cancelled": "🚫"}
+
+def _jobs_panel_body():
+    from modules import jobs
+    owner = job_owner()
+    if not owner:
+        # Sin dueño conocido no se lista nada (nunca la cola compartida de owner "")
+        st.caption("No pude identificar tu email de Google: los análisis corren en primer plano.")
+        return
+    try:
+        rows = jobs.list_jobs(owner=owner, limit=10)
+    except Exception as e:
+        st.caption(f"No pude leer la cola de trabajos: {e}")
+        return
+    if not rows:
+        st.caption("No hay trabajos en segundo plano.")
+        return
+    for job in rows:
+        st.markdown(f"{_JOB_ICONS.get(job['status'], '•')} **{job['title']}** · `{job['id']}`")
+        if job["status"] in ("queued", "running"):
+            st.progress(float(job["progress"] or 0.0), text=job["message"] or "En cola")
+            if jobs.can_cancel(job) and st.button("Cancelar", key=f"job_cancel_{job['id']}"):
+                jobs.cancel(job["id"])
+        elif job["status"] == "error":
+            with st.expander("Ver error"):
+                st.code(job["error"] or "(sin detalle)")
+        for site, sid in job["result"]:
+            st.markdown(f"• {site} → https://docs.google.com/spreadsheets/d/{sid}")
+
+def _render_jobs_panel():
+    """Trabajos del usuario (modules/jobs.py); se refresca solo mientras haya alguno activo."""
+    from modules import jobs
+    owner = job_owner()
+    try:
+        jobs.ensure_workers()
+        active = bool(owner) and any(j["status"] in ("queued", "running")
+                                     for j in jobs.list_jobs(owner=owner, limit=10))
+    except Exception:
+        active = False
+    if active and hasattr(st, "fragment"):
+        st.fragment(run_every=5)(_jobs_panel_body)()
     else:
-        login_screen()
-        st.stop()
+        _jobs_panel_body()
+        st.button("🔄 Actualizar", key="jobs_refresh")
 
 # Sidebar → mantenimiento
 def maintenance_extra_ui():
@@ -221,15 +311,32 @@ def maintenance_extra_ui():
     # Debug de fecha de publicación (Discover Retention) + forzar compat
     st.checkbox("🐞 Debug publicación (Discover)", key="debug_pubdate", value=True)
     st.checkbox("🧰 Forzar modo compat (Discover)", key="force_daily_compat", value=False)
+    st.checkbox("📥 Ejecutar análisis en segundo plano", key="bg_jobs", value=False,
+                help="El informe corre en un proceso aparte: podés seguir usando la app o cerrar la pestaña.")
+    if st.session_state.get("bg_jobs"):
+        with st.expander("📥 Trabajos en segundo plano", expanded=True):
+            _render_jobs_panel()
 
     # Pequeño panel de diagnóstico opcional
     if st.session_state.get("DEBUG"):
         try:
-            ctx = read_context()
+            ctx = app_diagnostics.read_context()
             st.caption(f"Context: {ctx}")
         except Exception:
             pass
 
+        with st.expander("⏱️ Perfil de carga (imports)", expanded=False):
+            st.write(st.session_state.get("_startup_timing") or {})
+            _rows = [{"módulo": m, "segundos": round(t, 3)} for m, t in import_timings()]
+            if _rows:
+                st.dataframe(_rows, use_container_width=True, hide_index=True)
+            else:
+                st.caption("Sin imports diferidos registrados en este proceso.")
+            st.caption("Perfil en frío: `python -m modules.lazy_imports`")
+
+        with st.expander("⏱️ Tiempos por etapa (últimas ejecuciones)", expanded=False):
+            _render_trace_panel()
+
         # 👇👇 INSERTAR ESTE BLOQUE AQUÍ 👇👇
         with st.expander("seo_analisis_ext (diagnóstico)", expanded=True):
             import importlib, sys
@@ -238,6 +345,11 @@ def maintenance_extra_ui():
                 st.write("seo_analisis_ext versión:", getattr(ext, "__version__", "?"))
                 st.write("archivo:", getattr(ext, "__file__", "?"))
                 st.write("¿exporta run_discover_retention?:", hasattr(ext, "run_discover_retention"))
+                try:
+                    from modules.utils import external_package_cache_status
+                    st.write("caché por commit:", external_package_cache_status())
+                except Exception:
+                    pass
                 # También probá si existe como submódulo:
                 try:
                     mod = importlib.import_module("seo_analisis_ext.discover_retention")
@@ -249,6 +361,20 @@ def maintenance_extra_ui():
                 st.write("sys.path top:", sys.path[:5])
         # 👆👆 HASTA AQUÍ 👆👆
 
+        with st.expander("📇 Índice de fechas de publicación", expanded=False):
+            from modules import pubdate_index
+            st.write(pubdate_index.stats())
+            if st.button("Vaciar índice", key="pubdate_index_clear"):
+                pubdate_index.forget()
+                st.success("Índice vaciado.")
+
+        with st.expander("💾 Checkpoints de ejecuciones sin terminar", expanded=False):
+            from modules import checkpoints
+            st.write(checkpoints.stats())
+            if st.button("Borrar checkpoints", key="checkpoints_clear"):
+                checkpoints.clear_all()
+                st.success("Checkpoints borrados: la próxima ejecución empieza de cero.")
+
 
 sidebar_user_info(user, maintenance_extra=maintenance_extra_ui)
 
@@ -258,7 +384,29 @@ _action = _qp.get("action")
 if isinstance(_action, list):
     _action = _action[0] if _action else None
 
+def _forget_inventories(creds_dict, kind=None):
+    # Sitios/propiedades cacheados para esa credencial (modules/inventory_cache.py)
+    if not creds_dict:
+        return
+    try:
+        from modules import inventory_cache
+        inventory_cache.invalidate(kind, creds_dict)
+    except Exception:
+        pass
+
+def _forget_clients(creds_dict):
+    # Servicios y conexiones cacheados para esa credencial (modules/google_clients.py)
+    if not creds_dict:
+        return
+    try:
+        from modules.google_clients import clear_clients
+        clear_clients(creds_dict)
+    except Exception:
+        pass
+
 if _action == "change_personal":
+    _forget_inventories(st.session_state.get("creds_dest"))
+    _forget_clients(st.session_state.get("creds_dest"))
     for k in ("oauth_oidc","_google_identity","creds_dest"):
         st.session_state.pop(k, None)
     try:
@@ -270,6 +418,8 @@ elif _action == "change_folder":
     st.session_state.pop("dest_folder_id", None)
     clear_qp(); st.rerun()
 elif _action == "change_src":
+    _forget_inventories(st.session_state.get("creds_src"))
+    _forget_clients(st.session_state.get("creds_src"))
     for k in ("creds_src", "step3_done", "src_account_label"):
         st.session_state.pop(k, None)
     st.session_state.pop("sc_account_choice", None)
@@ -279,6 +429,8 @@ elif _action == "change_src":
         pass
     clear_qp(); st.rerun()
 elif _action == "change_ga4":
+    _forget_inventories(st.session_state.get("creds_src"), "ga4_properties")
+    _forget_clients(st.session_state.get("creds_ga4"))
     for k in ("creds_ga4","ga4_step_done","ga4_account_label","ga4_property_choice","ga4_property_id","ga4_property_label","ga4_property_name"):
         st.session_state.pop(k, None)
     clear_qp(); st.rerun()
@@ -667,7 +819,11 @@ if "ga" in selected_sources:
     props = []
     _perm_issue = False
     try:
-        props = list_account_property_summaries(ga4_admin)
+        from modules import inventory_cache
+        props = list(inventory_cache.cached(
+            inventory_cache.KIND_GA4_PROPERTIES, creds_src,
+            lambda: list_account_property_summaries(ga4_admin),
+        ))
     except PermissionError as e:
         if str(e) == "GA4_ADMIN_PERMISSION":
             _perm_issue = True
@@ -729,13 +885,20 @@ if "ga" in selected_sources:
 # ===== Sitios de GSC (solo si se seleccionó SC) =====
 if "sc" in selected_sources:
     def pick_sites(sc_service) -> list[str]:
+        from modules import inventory_cache
         st.subheader("Elige el/los sitios a analizar (Search Console)")
         try:
-            site_list = sc_service.sites().list().execute()
-            sites = site_list.get("siteEntry", [])
+            # Cacheado por credencial: no se vuelve a pedir en cada clic
+            sites = inventory_cache.cached(
+                inventory_cache.KIND_GSC_SITES, creds_src,
+                lambda: sc_service.sites().list().execute().get("siteEntry", []),
+            )
         except Exception as e:
             st.error(f"Error al obtener sitios: {e}")
             st.stop()
+        if st.button("↻ Actualizar lista de sitios", key="sites_refresh"):
+            inventory_cache.invalidate(inventory_cache.KIND_GSC_SITES, creds_src)
+            st.rerun()
         verified = [s for s in sites if s.get("permissionLevel") != "siteUnverifiedUser"]
         if not verified:
             st.error("No se encontraron sitios verificados en esta cuenta."); st.stop()
@@ -778,64 +941,144 @@ def _device_upper(x: str | None) -> str | None:
 
 def _gsc_fetch_top_urls(sc, site: str, start: date, end: date, search_type: str,
                         country: str | None, device: str | None,
-                        order_by: str, row_limit: int) -> list[dict]:
+                        order_by: str, row_limit: int,
+                        min_clicks: int = 0, min_impr: int = 0,
+                        page_filters: list[dict] | None = None) -> list[dict]:
     """
     search_type: "web" (Search) | "discover"
     order_by: "clicks" | "impressions" | "ctr" | "position"
+    Top `row_limit` sin tope de 25k: páginas en paralelo (modules/gsc.iter_query_pages) que se
+    convierten a medida que llegan. La API devuelve siempre por clics descendente: con orden por
+    clics y mínimo de clics deja de paginar cuando la última fila ya quedó por debajo; el mínimo
+    de impresiones se aplica filtrando las filas.
+    `page_filters` (modules/gsc_filters.py) se agregan al grupo de filtros de la consulta.
+    Propaga el error de la API y no toca Streamlit (se llama desde hilos).
     """
-    try:
-        body = {
-            "startDate": str(start),
-            "endDate": str(end),
-            "dimensions": ["page"],
-            "rowLimit": int(row_limit),
-            "startRow": 0,
-            "type": search_type,
-            "orderBy": [{"field": order_by, "descending": True}],
-        }
-        filters = []
-        if country:
-            filters.append({
-                "dimension": "country",
-                "operator": "equals",
-                "expression": _iso3_lower(country)
-            })
-        if device:
-            filters.append({
-                "dimension": "device",
-                "operator": "equals",
-                "expression": _device_upper(device)
-            })
-        if filters:
-            body["dimensionFilterGroups"] = [{"groupType":"and","filters":filters}]
-        resp = sc.searchanalytics().query(siteUrl=site, body=body).execute()
-        rows = resp.get("rows", []) or []
-        out = []
-        for r in rows:
+    from modules.gsc import iter_query_pages
+    from modules.gsc_filters import with_filters
+    body = {
+        "startDate": str(start),
+        "endDate": str(end),
+        "dimensions": ["page"],
+        "type": search_type,
+        "orderBy": [{"field": order_by, "descending": True}],
+    }
+    filters = []
+    if country:
+        filters.append({
+            "dimension": "country",
+            "operator": "equals",
+            "expression": _iso3_lower(country)
+        })
+    if device:
+        filters.append({
+            "dimension": "device",
+            "operator": "equals",
+            "expression": _device_upper(device)
+        })
+    if filters:
+        body["dimensionFilterGroups"] = [{"groupType":"and","filters":filters}]
+    if page_filters:
+        body = with_filters(body, page_filters)
+
+    # La API devuelve las filas por clics descendente (sin importar orderBy): solo con ese
+    # orden se puede cortar la paginación; el mínimo de impresiones se filtra acá
+    min_clicks = int(min_clicks or 0)
+    min_impr = int(min_impr or 0)
+
+    def _below_min_clicks(batch):
+        return (batch[-1].get("clicks") or 0) < min_clicks
+
+    stop = _below_min_clicks if (order_by == "clicks" and min_clicks > 0) else None
+    out = []
+    for batch in iter_query_pages(sc, site, body, max_rows=int(row_limit), stop=stop):
+        for r in batch:
+            if min_impr > 0 and (r.get("impressions") or 0) < min_impr:
+                continue
             keys = r.get("keys") or []
-            page = keys[0] if keys else ""
             out.append({
-                "page": page,
+                "page": keys[0] if keys else "",
                 "clicks": r.get("clicks", 0),
                 "impressions": r.get("impressions", 0),
                 "ctr": r.get("ctr", 0.0),
                 "position": r.get("position", 0.0),
             })
+    return out
+
+_SEED_CACHE_KEY = "_seed_cache"
+_SEED_CACHE_MAX = 24
+
+def _gsc_seed_rows(sc, site: str, start: date, end: date, search_types: list[str],
+                   country: str | None, device: str | None,
+                   order_by: str, row_limit: int,
+                   min_clicks: int = 0, min_impr: int = 0,
+                   articles_only: bool = False) -> dict[str, list[dict]]:
+    """
+    Semillas por tipo ("web"/"discover") memorizadas en la sesión por
+    (sitio, ventana, filtros, orden, límite): el preview y la ejecución comparten la consulta.
+    Con `articles_only` el filtro de artículos va en la consulta (no se gasta row_limit en tags/videos).
+    Los tipos que faltan se piden en paralelo; un error queda en _fast_error y no se cachea.
+    """
+    cache = st.session_state.setdefault(_SEED_CACHE_KEY, {})
+
+    def _key(t: str) -> tuple:
+        return (site, str(start), str(end), t, country or None, device or None, order_by, int(row_limit),
+                int(min_clicks or 0), int(min_impr or 0), bool(articles_only))
+
+    out: dict[str, list[dict]] = {}
+    missing = []
+    for t in search_types:
+        hit = cache.get(_key(t))
+        if hit is not None:
+            out[t] = [dict(r) for r in hit]
+        else:
+            missing.append(t)
+    if not missing:
         return out
-    except Exception as e:
-        st.session_state["_fast_error"] = f"GSC query error ({search_type}): {e}"
-        return []
+
+    page_filters = _article_gsc_filters() if articles_only else None
+
+    def _one(t: str):
+        try:
+            return t, _gsc_fetch_top_urls(sc, site, start, end, t, country, device, order_by, row_limit,
+                                          min_clicks, min_impr, page_filters), None
+        except Exception as e:
+            return t, [], e
+
+    if len(missing) == 1:
+        results = [_one(missing[0])]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        from modules import tracing
+        with ThreadPoolExecutor(max_workers=len(missing), thread_name_prefix="gsc-seeds") as ex:
+            results = list(ex.map(tracing.bind(_one), missing))
+
+    for t, rows, err in results:
+        if err is not None:
+            st.session_state["_fast_error"] = f"GSC query error ({t}): {err}"
+        else:
+            cache[_key(t)] = rows
+            while len(cache) > _SEED_CACHE_MAX:
+                cache.pop(next(iter(cache)))
+        out[t] = [dict(r) for r in rows]
+    return out
 
 _DROP_PATTERNS = (
     "/player/", "/tag/", "/tags/", "/etiqueta/", "/categoria/", "/category/",
     "/author/", "/autores/", "/programas/", "/hd/", "/podcast", "/videos/",
     "/video/", "/envivo", "/en-vivo", "/en_vivo", "/live", "/player-", "?"
 )
+_MEDIA_EXT = (".jpg",".jpeg",".png",".gif",".svg",".webp",".mp4",".mp3",".m3u8",".pdf",".webm",".avi",".mov")
+def _article_gsc_filters() -> list[dict]:
+    """Las mismas reglas de _is_article_url como filtros de Search Console (modules/gsc_filters.py)."""
+    from modules.gsc_filters import article_filters
+    return article_filters(_DROP_PATTERNS, _MEDIA_EXT, min_slashes=4)
+
 def _is_article_url(u: str) -> bool:
     if not u: return False
     u = u.strip().lower()
     if u in ("https://", "http://"): return False
-    if u.endswith((".jpg",".jpeg",".png",".gif",".svg",".webp",".mp4",".mp3",".m3u8",".pdf",".webm",".avi",".mov")):
+    if u.endswith(_MEDIA_EXT):
         return False
     if u.count("/") <= 3:
         return False
@@ -856,18 +1099,40 @@ def _suggest_user_agent(ua: str | None) -> str:
 
 # === Helper multi-sitio para runners GSC
 def run_for_sites(titulo: str, fn, sc_service, drive_service, gs_client, site_urls: list[str], params: dict, dest_folder_id: str | None):
+    from modules import tracing
     created: list[tuple[str, str]] = []
+    # En segundo plano: un solo trabajo para todos los sitios
+    if queue_job(titulo, fn, site_urls, params, dest_folder_id):
+        st.stop()
     n = len(site_urls)
+    # Sitios ya generados en un intento anterior del mismo lote (falló en el sitio k de n): se saltean
+    from modules import checkpoints
+    ck = checkpoints.for_run("sites:" + checkpoints.runner_kind(fn), list(site_urls), params,
+                             dest_folder_id=dest_folder_id, owner=checkpoints.owner_key(drive_service, gs_client))
+    done: dict = ck.load("sites", {})
+    if done:
+        st.info(f"♻️ Reanudando el lote anterior: {len(done)} de {n} sitio(s) ya estaban listos.")
     prog = st.progress(0.0)
-    for i, s in enumerate(site_urls, 1):
-        sid = run_with_indicator(f"{titulo} — {s}", fn, sc_service, drive_service, gs_client, s, params, dest_folder_id)
-        if sid:
-            try:
-                maybe_prefix_sheet_name_with_medio(drive_service, sid, s)
-            except Exception:
-                pass
-            created.append((s, sid))
-        prog.progress(i / n)
+    # Una traza para todo el lote: cada sitio queda como span "runner" dentro
+    with tracing.trace(titulo, kind="sites", sink=st.session_state, sitios=n):
+        for i, s in enumerate(site_urls, 1):
+            if s in done:
+                if done[s]:
+                    created.append((s, done[s]))
+                prog.progress(i / n)
+                continue
+            sid = run_with_indicator(f"{titulo} — {s}", fn, sc_service, drive_service, gs_client, s, params, dest_folder_id)
+            if sid:
+                try:
+                    with tracing.span("Drive: renombrar", "drive"):
+                        maybe_prefix_sheet_name_with_medio(drive_service, sid, s)
+                except Exception:
+                    pass
+                created.append((s, sid))
+            done[s] = sid
+            ck.save("sites", done)
+            prog.progress(i / n)
+    ck.finish()
     prog.empty()
     return created
 
@@ -943,477 +1208,30 @@ def ensure_spacy(preferred_models=("es_core_news_sm","xx_ent_wiki_sm","en_core_w
     raise RuntimeError(f"No pude cargar ni instalar modelos spaCy. Intentos: {preferred_models}. Último error: {last_err}")
 
 # -------------------------
-# Scraping rápido (async) + parsing
+# Scraping rápido (async) + parsing  →  modules/content_scrape.py
 # -------------------------
-def _parse_html_for_meta(html: str, wants: dict, xpaths: dict, joiner: str = " | ") -> dict:
-    """
-    Extrae campos en función de 'wants' (dict de booleans) y 'xpaths' (opcional).
-    Campos soportados:
-      h1, title, meta_description, og_title, og_description, canonical, published_time, lang,
-      first_paragraph, article_text,
-      h2_list, h2_count, h3_list, h3_count,
-      bold_count, bold_list,
-      link_count, link_anchor_texts,
-      related_links_count, related_link_anchors,
-      tags_list
-    *IMPORTANTE*: h2/h3/bold/link(s) se buscan SOLO dentro del contenedor del artículo si se provee
-    `xpaths['article']`. Si no se provee, se usa heurística (//article | //main).
-    """
-    data = {
-        "h1": "", "title": "", "meta_description": "", "og_title": "", "og_description": "",
-        "canonical": "", "published_time": "", "lang": "",
-        "first_paragraph": "", "article_text": "",
-        "h2_list": "", "h2_count": 0, "h3_list": "", "h3_count": 0,
-        "bold_count": 0, "bold_list": "",
-        "link_count": 0, "link_anchor_texts": "",
-        "related_links_count": 0, "related_link_anchors": "",
-        "tags_list": ""
-    }
-
-    # Intentar lxml para XPath
-    doc = None
-    have_lxml = False
-    try:
-        import lxml.html as LH  # type: ignore
-        doc = LH.fromstring(html)
-        have_lxml = True
-    except Exception:
-        have_lxml = False
-
-    # BeautifulSoup
-    soup = None
-    try:
-        from bs4 import BeautifulSoup  # type: ignore
-        try:
-            soup = BeautifulSoup(html, "lxml")
-        except Exception:
-            soup = BeautifulSoup(html, "html.parser")
-    except Exception:
-        soup = None
-
-    def _meta_bs(name=None, prop=None):
-        if not soup: return ""
-        if name:
-            el = soup.find("meta", attrs={"name": name})
-            if el: return (el.get("content") or "").strip()
-        if prop:
-            el = soup.find("meta", attrs={"property": prop})
-            if el: return (el.get("content") or "").strip()
-        return ""
-
-    def _xpath_text_list(_doc_or_node, xp: str) -> list[str]:
-        if not _doc_or_node or not xp: return []
-        try:
-            nodes = _doc_or_node.xpath(xp)
-            out = []
-            for n in nodes:
-                if isinstance(n, str):
-                    txt = n.strip()
-                elif hasattr(n, "text_content"):
-                    txt = n.text_content().strip()
-                else:
-                    txt = str(n).strip()
-                if txt:
-                    out.append(txt)
-            return out
-        except Exception:
-            return []
-
-    # Determinar contenedor del artículo (scope)
-    lxml_scope_nodes = []
-    soup_scope = None
-    xp_article = (xpaths.get("article") or "").strip()
-    if have_lxml:
-        try:
-            if xp_article:
-                nodes = doc.xpath(xp_article)
-                lxml_scope_nodes = [n for n in nodes if hasattr(n, "xpath")]
-            if not lxml_scope_nodes:
-                lxml_scope_nodes = [n for n in doc.xpath("//article | //main") if hasattr(n, "xpath")]
-        except Exception:
-            lxml_scope_nodes = []
-    if soup and not lxml_scope_nodes:
-        try:
-            soup_scope = soup.select_one("article") or soup.select_one("main")
-        except Exception:
-            soup_scope = None
-
-    # --- Campos básicos (document-wide) ---
-    if wants.get("title"):
-        if soup and soup.title and soup.title.string:
-            data["title"] = soup.title.string.strip()
-        elif have_lxml:
-            try:
-                t = doc.xpath("string(//title)")
-                data["title"] = (t or "").strip()
-            except Exception:
-                pass
-
-    if wants.get("h1"):
-        if have_lxml:
-            try:
-                t = doc.xpath("string((//h1)[1])")
-                data["h1"] = (t or "").strip()
-            except Exception:
-                pass
-        if not data["h1"] and soup:
-            el = soup.find("h1")
-            if el: data["h1"] = el.get_text(strip=True)
-
-    if wants.get("meta_description"):
-        data["meta_description"] = _meta_bs(name="description") or _meta_bs(prop="description")
+from modules.content_scrape import (
+    wants_head_only as _wants_head_only,
+    remember_pubdates as _remember_pubdates,
+    scrape_async,
+)
 
-    if wants.get("og_title"):
-        data["og_title"] = _meta_bs(prop="og:title")
 
-    if wants.get("og_description"):
-        data["og_description"] = _meta_bs(prop="og:description")
+def _st_scrape_progress():
+    bar = st.progress(0.0, text="Scrapeando páginas…")
 
-    if wants.get("canonical"):
-        if have_lxml:
-            try:
-                hrefs = doc.xpath("//link[translate(@rel,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz')='canonical']/@href")
-                if hrefs: data["canonical"] = hrefs[0].strip()
-            except Exception:
-                pass
-        if not data["canonical"] and soup:
-            try:
-                link = soup.find("link", rel=lambda v: v and ("canonical" in [x.lower() for x in (v if isinstance(v, list) else [v])]))
-                if link: data["canonical"] = (link.get("href") or "").strip()
-            except Exception:
-                pass
+    def _cb(done: int, total: int) -> None:
+        bar.progress(done / total, text=f"Scrapeando páginas… {done}/{total}")
+        if done >= total:
+            bar.empty()
+    return _cb
 
-    if wants.get("published_time"):
-        val = _meta_bs(prop="article:published_time") or _meta_bs(name="pubdate") or _meta_bs(name="date")
-        if not val and have_lxml:
-            try:
-                val = (doc.xpath("string(//time/@datetime)")) or (doc.xpath("string(//time[1])"))
-            except Exception:
-                pass
-        if not val and soup:
-            try:
-                time_tag = soup.find("time")
-                if time_tag:
-                    val = (time_tag.get("datetime") or "").strip() or time_tag.get_text(strip=True)
-            except Exception:
-                pass
-        data["published_time"] = (val or "").strip()
-
-    if wants.get("lang"):
-        if have_lxml:
-            try:
-                data["lang"] = (doc.xpath("string(//html/@lang)") or "").strip()
-            except Exception:
-                pass
-        if not data["lang"] and soup:
-            try:
-                html_tag = soup.find("html")
-                if html_tag:
-                    data["lang"] = (html_tag.get("lang") or "").strip()
-            except Exception:
-                pass
-
-    # --- Avanzados (dentro del artículo cuando aplique) ---
-    # Primer párrafo
-    if wants.get("first_paragraph"):
-        xp_first = (xpaths.get("first_paragraph") or "").strip()
-        text = ""
-        if xp_first and have_lxml:
-            lst = _xpath_text_list(doc, xp_first)
-            text = next((t for t in lst if t.strip()), "")
-        if not text:
-            if have_lxml and lxml_scope_nodes:
-                for node in lxml_scope_nodes:
-                    try:
-                        t = node.xpath("string(.//p[normalize-space()][1])")
-                        if t and t.strip():
-                            text = t.strip(); break
-                    except Exception:
-                        pass
-            if not text and soup_scope:
-                p = soup_scope.find("p")
-                if p: text = p.get_text(strip=True)
-            if not text and soup:
-                p = soup.find("p")
-                if p: text = p.get_text(strip=True)
-        data["first_paragraph"] = text
-
-    # Texto completo del artículo (opcional, para entidades)
-    if wants.get("article_text"):
-        text_all = ""
-        if have_lxml and lxml_scope_nodes:
-            try:
-                chunks = []
-                for node in lxml_scope_nodes:
-                    try:
-                        t = node.xpath("string(.)")
-                        if t and t.strip():
-                            chunks.append(t.strip())
-                    except Exception:
-                        pass
-                text_all = "\n".join(chunks).strip()
-            except Exception:
-                text_all = ""
-        if not text_all and soup_scope:
-            try:
-                text_all = soup_scope.get_text(" ", strip=True)
-            except Exception:
-                text_all = ""
-        data["article_text"] = text_all
-
-    # Helper para juntar textos dentro del scope lxml
-    def _collect_scope_texts(nodeset, xpath_rel: str) -> list[str]:
-        vals: list[str] = []
-        if nodeset:
-            for node in nodeset:
-                try:
-                    parts = node.xpath(xpath_rel)
-                except Exception:
-                    parts = []
-                for p in parts:
-                    if isinstance(p, str):
-                        txt = p.strip()
-                    elif hasattr(p, "text_content"):
-                        txt = p.text_content().strip()
-                    else:
-                        txt = str(p).strip()
-                    if txt:
-                        vals.append(txt)
-        return vals
-
-    # H2
-    if wants.get("h2_list") or wants.get("h2_count"):
-        xp_h2 = (xpaths.get("h2") or "").strip()
-        h2s: list[str] = []
-        if xp_h2 and have_lxml:
-            if lxml_scope_nodes and (xp_h2.startswith(".") or not xp_h2.startswith("/")):
-                h2s = _collect_scope_texts(lxml_scope_nodes, xp_h2 if xp_h2.startswith(".") else ".//" + xp_h2.strip("./"))
-            else:
-                h2s = _xpath_text_list(doc, xp_h2)
-        elif have_lxml and lxml_scope_nodes:
-            h2s = _collect_scope_texts(lxml_scope_nodes, ".//h2")
-        elif soup_scope:
-            h2s = [el.get_text(strip=True) for el in soup_scope.find_all("h2")]
-        h2s = [t for t in (h2s or []) if t]
-        if wants.get("h2_list"):  data["h2_list"]  = (joiner.join(h2s)) if h2s else ""
-        if wants.get("h2_count"): data["h2_count"] = len(h2s)
-
-    # H3
-    if wants.get("h3_list") or wants.get("h3_count"):
-        xp_h3 = (xpaths.get("h3") or "").strip()
-        h3s: list[str] = []
-        if xp_h3 and have_lxml:
-            if lxml_scope_nodes and (xp_h3.startswith(".") or not xp_h3.startswith("/")):
-                h3s = _collect_scope_texts(lxml_scope_nodes, xp_h3 if xp_h3.startswith(".") else ".//" + xp_h3.strip("./"))
-            else:
-                h3s = _xpath_text_list(doc, xp_h3)
-        elif have_lxml and lxml_scope_nodes:
-            h3s = _collect_scope_texts(lxml_scope_nodes, ".//h3")
-        elif soup_scope:
-            h3s = [el.get_text(strip=True) for el in soup_scope.find_all("h3")]
-        h3s = [t for t in (h3s or []) if t]
-        if wants.get("h3_list"):  data["h3_list"]  = (joiner.join(h3s)) if h3s else ""
-        if wants.get("h3_count"): data["h3_count"] = len(h3s)
-
-    # Negritas — count + lista (SOLO dentro del artículo)
-    if wants.get("bold_count") or wants.get("bold_list"):
-        cnt = 0
-        blist: list[str] = []
-        if have_lxml and lxml_scope_nodes:
-            for node in lxml_scope_nodes:
-                try:
-                    bs = node.xpath(".//*[self::b or self::strong]")
-                    cnt += len(bs)
-                    if wants.get("bold_list"):
-                        for b in bs:
-                            try:
-                                t = b.text_content().strip()
-                                if t: blist.append(t)
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
-        elif soup_scope:
-            try:
-                bs = soup_scope.select("b, strong")
-                cnt = len(bs)
-                if wants.get("bold_list"):
-                    blist = [el.get_text(strip=True) for el in bs if el.get_text(strip=True)]
-            except Exception:
-                cnt = 0
-        data["bold_count"] = int(cnt or 0)
-        if wants.get("bold_list"):
-            data["bold_list"] = joiner.join([t for t in blist if t])
-
-    # Links — count + anchors (SOLO dentro del artículo)
-    if wants.get("link_count") or wants.get("link_anchor_texts"):
-        cnt = 0
-        anchors: list[str] = []
-        if have_lxml and lxml_scope_nodes:
-            for node in lxml_scope_nodes:
-                try:
-                    alist = node.xpath(".//a[@href]")
-                    cnt += len(alist)
-                    if wants.get("link_anchor_texts"):
-                        for a in alist:
-                            try:
-                                t = a.text_content().strip()
-                                if t: anchors.append(t)
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
-        elif soup_scope:
-            try:
-                alist = soup_scope.find_all("a", href=True)
-                cnt = len(alist)
-                if wants.get("link_anchor_texts"):
-                    anchors = [a.get_text(strip=True) for a in alist if a.get_text(strip=True)]
-            except Exception:
-                cnt = 0
-        data["link_count"] = int(cnt or 0)
-        if wants.get("link_anchor_texts"):
-            data["link_anchor_texts"] = joiner.join([t for t in anchors if t])
-
-    # Caja de noticias relacionadas (xpath al contenedor) → count + anchors
-    if wants.get("related_links_count") or wants.get("related_link_anchors"):
-        xp_rel = (xpaths.get("related_box") or "").strip()
-        rel_cnt = 0
-        rel_anchors: list[str] = []
-        if xp_rel and have_lxml:
-            try:
-                boxes = doc.xpath(xp_rel)
-            except Exception:
-                boxes = []
-            for bx in boxes:
-                try:
-                    alist = bx.xpath(".//a[@href]")
-                except Exception:
-                    alist = []
-                rel_cnt += len(alist)
-                if wants.get("related_link_anchors"):
-                    for a in alist:
-                        try:
-                            t = a.text_content().strip()
-                            if t: rel_anchors.append(t)
-                        except Exception:
-                            pass
-        data["related_links_count"] = int(rel_cnt or 0)
-        if wants.get("related_link_anchors"):
-            data["related_link_anchors"] = joiner.join([t for t in rel_anchors if t])
-
-    # Tags (lista)
-    if wants.get("tags_list"):
-        xp_tags = (xpaths.get("tags") or "").strip()
-        tags = []
-        if xp_tags and have_lxml:
-            if lxml_scope_nodes and (xp_tags.startswith(".") or not xp_tags.startswith("/")):
-                for node in lxml_scope_nodes:
-                    tags += _xpath_text_list(node, xp_tags if xp_tags.startswith(".") else ".//" + xp_tags.strip("./"))
-            else:
-                tags = _xpath_text_list(doc, xp_tags)
-        else:
-            mt = []
-            if have_lxml:
-                try:
-                    mt = [t for t in doc.xpath("//meta[@property='article:tag']/@content") if t and str(t).strip()]
-                except Exception:
-                    mt = []
-            if not mt and soup:
-                try:
-                    mt = [ (m.get("content") or "").strip()
-                           for m in soup.find_all("meta", attrs={"property":"article:tag"}) ]
-                    mt = [t for t in mt if t]
-                except Exception:
-                    mt = []
-            tags = mt
-        tags = [t.strip() for t in (tags or []) if t and str(t).strip()]
-        data["tags_list"] = (joiner.join(tags)) if tags else ""
-
-    return data
-
-async def _fetch_one(session, url: str, ua: str, timeout_s: int, wants: dict, xpaths: dict, joiner: str) -> dict:
-    base = {"url": url, "ok": False, "status": 0, "error": ""}
-    try:
-        async with session.get(url, headers={"User-Agent": ua}, timeout=timeout_s, allow_redirects=True) as resp:
-            base["status"] = resp.status
-            if resp.status >= 400:
-                base["error"] = f"http {resp.status}"
-                return base
-            html = await resp.text(errors="ignore")
-            meta = _parse_html_for_meta(html, wants=wants, xpaths=xpaths, joiner=joiner)
-            base.update(meta)
-            base["ok"] = True
-            return base
-    except Exception as e:
-        base["error"] = str(e)
-        return base
 
 async def _scrape_async(urls: list[str], ua: str, wants: dict, xpaths: dict, joiner: str,
-                        timeout_s: int = 12, concurrency: int = 20) -> list[dict]:
-    try:
-        import aiohttp  # type: ignore
-    except Exception:
-        return _scrape_sync(urls, ua, wants, xpaths, joiner, timeout_s, concurrency)
-
-    connector = aiohttp.TCPConnector(limit=concurrency, ssl=False)
-    timeout = aiohttp.ClientTimeout(total=max(timeout_s+2, timeout_s))
-    results: list[dict] = []
-    sem = asyncio.Semaphore(concurrency)
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout, trust_env=True) as session:
-        async def _bound(u):
-            async with sem:
-                return await _fetch_one(session, u, ua, timeout_s, wants, xpaths, joiner)
-        tasks = [_bound(u) for u in urls]
-        done = 0
-        progress = st.progress(0.0, text="Scrapeando páginas…")
-        for coro in asyncio.as_completed(tasks):
-            res = await coro
-            results.append(res)
-            done += 1
-            progress.progress(done/len(tasks), text=f"Scrapeando páginas… {done}/{len(tasks)}")
-        progress.empty()
-    order = {u:i for i,u in enumerate(urls)}
-    results.sort(key=lambda r: order.get(r.get("url",""), 1e9))
-    return results
+                        timeout_s: int = 12, concurrency: int = 20, head_only: bool = False) -> list[dict]:
+    return await scrape_async(urls, ua, wants, xpaths, joiner, timeout_s=timeout_s, concurrency=concurrency,
+                              head_only=head_only, on_progress=_st_scrape_progress())
 
-def _scrape_sync(urls: list[str], ua: str, wants: dict, xpaths: dict, joiner: str,
-                 timeout_s: int = 12, concurrency: int = 12) -> list[dict]:
-    try:
-        import requests
-    except Exception as e:
-        return [{"url": u, "ok": False, "status": 0, "error": f"requests no disponible: {e}"} for u in urls]
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    results: list[dict] = []
-    headers = {"User-Agent": ua}
-
-    def _one(u: str) -> dict:
-        base = {"url": u, "ok": False, "status": 0, "error": ""}
-        try:
-            rs = requests.get(u, headers=headers, timeout=timeout_s, allow_redirects=True)
-            base["status"] = rs.status_code
-            if rs.status_code >= 400:
-                base["error"] = f"http {rs.status_code}"
-                return base
-            meta = _parse_html_for_meta(rs.text, wants=wants, xpaths=xpaths, joiner=joiner)
-            base.update(meta)
-            base["ok"] = True
-        except Exception as e:
-            base["error"] = str(e)
-        return base
-
-    progress = st.progress(0.0, text="Scrapeando páginas…")
-    done = 0
-    with ThreadPoolExecutor(max_workers=concurrency) as ex:
-        futs = [ex.submit(_one, u) for u in urls]
-        for f in as_completed(futs):
-            results.append(f.result())
-            done += 1
-            progress.progress(done/len(futs), text=f"Scrapeando páginas… {done}/{len(futs)}")
-    progress.empty()
-    order = {u:i for i,u in enumerate(urls)}
-    results.sort(key=lambda r: order.get(r.get("url",""), 1e9))
-    return results
 
 # ============== Flujos por análisis ==============
 
@@ -2414,7 +2232,8 @@ elif analisis == "10":
 
     col0a, col0b = st.columns([1,1])
     with col0a:
-        row_limit = st.number_input("Máximo de URLs por origen", min_value=10, max_value=5000, value=500, step=10, key="fast_row_lim")
+        row_limit = st.number_input("Máximo de URLs por origen", min_value=10, max_value=200000, value=500, step=10, key="fast_row_lim",
+                                    help="Más de 25.000 se pide en páginas paralelas a Search Console.")
     with col0b:
         st.write("")  # espaciador
 
@@ -2547,21 +2366,16 @@ elif analisis == "10":
     src_map = {"Search":"web","Discover":"discover","Search + Discover":"both"}
     src = src_map.get(tipo, "both")
 
-    # Traer semillas (solo preview)
-    if src in ("web","both"):
-        seeds_search = _gsc_fetch_top_urls(
-            sc_service, preview_site, start_date, end_date, "web",
-            country or (None if country == "(TODOS)" else None),
-            device if device and device != "(Todos)" else None,
-            order_by, int(row_limit)
-        )
-    if src in ("discover","both"):
-        seeds_discover = _gsc_fetch_top_urls(
-            sc_service, preview_site, start_date, end_date, "discover",
-            country or (None if country == "(TODOS)" else None),
-            device if device and device != "(Todos)" else None,
-            order_by, int(row_limit)
-        )
+    seed_types = [t for t in ("web", "discover") if src in (t, "both")]
+    seed_country = country or (None if country == "(TODOS)" else None)
+    seed_device = device if device and device != "(Todos)" else None
+
+    # Traer semillas (memorizadas: la ejecución reutiliza las del preview)
+    fetched = _gsc_seed_rows(sc_service, preview_site, start_date, end_date, seed_types,
+                             seed_country, seed_device, order_by, int(row_limit),
+                             int(min_clicks), int(min_impr), bool(only_articles))
+    seeds_search = fetched.get("web", [])
+    seeds_discover = fetched.get("discover", [])
 
     if seeds_search:
         for r in seeds_search:
@@ -2601,22 +2415,12 @@ elif analisis == "10":
 
     # ========== Ejecutar ==========
     def _run_structure_for_site(one_site: str):
-        # Traer semillas reales para este sitio
-        seeds_s, seeds_d = [], []
-        if src in ("web","both"):
-            seeds_s = _gsc_fetch_top_urls(
-                sc_service, one_site, start_date, end_date, "web",
-                country or (None if country == "(TODOS)" else None),
-                device if device and device != "(Todos)" else None,
-                order_by, int(row_limit)
-            )
-        if src in ("discover","both"):
-            seeds_d = _gsc_fetch_top_urls(
-                sc_service, one_site, start_date, end_date, "discover",
-                country or (None if country == "(TODOS)" else None),
-                device if device and device != "(Todos)" else None,
-                order_by, int(row_limit)
-            )
+        # Semillas reales para este sitio (las del preview si es el mismo sitio/ventana/filtros)
+        fetched_site = _gsc_seed_rows(sc_service, one_site, start_date, end_date, seed_types,
+                                      seed_country, seed_device, order_by, int(row_limit),
+                                      int(min_clicks), int(min_impr), bool(only_articles))
+        seeds_s = fetched_site.get("web", [])
+        seeds_d = fetched_site.get("discover", [])
         lst = []
         if seeds_s:
             for r in seeds_s:
@@ -2676,18 +2480,38 @@ elif analisis == "10":
         if not any(wants.values()):
             st.error("Seleccioná al menos un campo para extraer."); return None
 
-        # Scraping (async si hay aiohttp)
-        try:
-            results = asyncio.run(_scrape_async(
-                urls, ua_final, wants=wants, xpaths=xpaths, joiner=st.session_state.get("joiner"," | "),
-                timeout_s=int(timeout_s), concurrency=int(concurrency)))
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            results = loop.run_until_complete(_scrape_async(
-                urls, ua_final, wants=wants, xpaths=xpaths, joiner=st.session_state.get("joiner"," | "),
-                timeout_s=int(timeout_s), concurrency=int(concurrency)))
-            loop.close()
+        # Fechas de publicación ya conocidas (índice compartido con Discover Retention).
+        # Si published_time es el único campo pedido, esas URLs ni se descargan.
+        pub_known = {}
+        if wants.get("published_time"):
+            from modules import pubdate_index
+            pub_known = pubdate_index.get_many(urls)
+        only_pub = [k for k, v in wants.items() if v] == ["published_time"]
+        urls_scrape = [u for u in urls if u not in pub_known] if only_pub else urls
+        if only_pub and pub_known:
+            st.caption(f"({one_site}) 📇 {len(pub_known)} URLs con fecha ya indexada; se scrapean {len(urls_scrape)}.")
+
+        # Scraping (async si hay aiohttp). Si solo se piden campos de <head>, modo metadatos.
+        head_only = _wants_head_only(wants)
+        if head_only and urls_scrape:
+            st.caption(f"({one_site}) Modo metadatos: se descarga solo el `<head>` de cada página.")
+        results = []
+        if urls_scrape:
+            try:
+                results = asyncio.run(_scrape_async(
+                    urls_scrape, ua_final, wants=wants, xpaths=xpaths, joiner=st.session_state.get("joiner"," | "),
+                    timeout_s=int(timeout_s), concurrency=int(concurrency), head_only=head_only))
+            except RuntimeError:
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                results = loop.run_until_complete(_scrape_async(
+                    urls_scrape, ua_final, wants=wants, xpaths=xpaths, joiner=st.session_state.get("joiner"," | "),
+                    timeout_s=int(timeout_s), concurrency=int(concurrency), head_only=head_only))
+                loop.close()
+        if wants.get("published_time"):
+            if only_pub:
+                results += [{"url": u, "ok": True, "status": 0, "error": "", "published_time": ""} for u in pub_known]
+            _remember_pubdates(results, pub_known)
 
         df_scr = pd.DataFrame(results)
 
@@ -2945,7 +2769,9 @@ def show_post_run_actions(gs_client, sheet_id: str, kind: str, site_url: str | N
         # 1) Resumen IA
         if need_summary:
             try:
-                with st.spinner("Generando resumen con Nomadic BOT…"):
+                from modules import tracing
+                with st.spinner("Generando resumen con Nomadic BOT…"), \
+                        tracing.trace("Resumen IA", kind="ai", sink=st.session_state, analisis=kind):
                     from modules.app_ai import gemini_summary
                     txt = gemini_summary(gs_client, sheet_id, kind=kind, widget_suffix=f"post_{suffix}") or ""
                 if txt.strip():
@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Benchmarks locales (no corren en la app). Ejecutar desde la raíz: python -m benchmarks.<nombre>"""
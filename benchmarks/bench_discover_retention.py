@@ -0,0 +1,119 @@
+# benchmarks/bench_discover_retention.py
+"""
+Benchmark del post-proceso de Discover Retention (modo compatibilidad diaria).
+
+Compara la versión por fila (lambdas + _status_row por URL, como era antes) con
+_dr_compat_group/_dr_compat_finalize (datetime64 + np.select) sobre filas GSC sintéticas.
+
+    python -m benchmarks.bench_discover_retention              # 10k, 50k, 200k URLs
+    python -m benchmarks.bench_discover_retention 200000 --days 3
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from modules.app_ext import (
+    _dr_compat_finalize,
+    _dr_compat_group,
+    _dr_extract_section,
+    _dr_to_date,
+)
+
+SECTIONS = ("politica", "deportes", "economia", "sociedad", "espectaculos", "mundo", "")
+
+
+def synth_rows(n_urls: int, days: int, start: date, seed: int = 7) -> Tuple[List[Dict[str, Any]], Dict[str, Tuple[str, str]]]:
+    """Filas [date, page] como las devuelve GSC + un mapa de publicación para ~80% de las URLs."""
+    rnd = random.Random(seed)
+    rows: List[Dict[str, Any]] = []
+    pub: Dict[str, Tuple[str, str]] = {}
+    for i in range(n_urls):
+        url = f"https://www.ejemplo.com/{SECTIONS[i % len(SECTIONS)]}/nota-{i}.html"
+        first = rnd.randrange(days)
+        span = rnd.randrange(1, 4)
+        for d in range(first, min(days, first + span)):
+            rows.append({
+                "keys": [(start + timedelta(days=d)).isoformat(), url],
+                "clicks": rnd.randrange(0, 500),
+                "impressions": rnd.randrange(500, 20000),
+            })
+        if rnd.random() < 0.8:
+            p = start + timedelta(days=first - rnd.randrange(0, 3))
+            pub[url] = (p.isoformat(), f"{rnd.randrange(24):02d}:{rnd.randrange(60):02d}")
+    return rows, pub
+
+
+def legacy(rows, pub_date_map, s_start, s_end):
+    """Post-proceso por fila, equivalente al que tenía el runner."""
+    import pandas as pd
+
+    df = pd.DataFrame([{
+        "date": r["keys"][0], "url": r["keys"][1],
+        "clicks": r.get("clicks", 0), "impressions": r.get("impressions", 0),
+    } for r in rows])
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    grp = df.groupby("url", as_index=False).agg(
+        clicks=("clicks", "sum"), impressions=("impressions", "sum"),
+        first_date=("date", "min"), last_date=("date", "max"),
+    )
+    grp["section"] = grp["url"].map(_dr_extract_section)
+    grp["dias_perm"] = [(l - f).days for f, l in zip(grp["first_date"], grp["last_date"])]
+    grp["fecha_pub"] = grp["url"].map(lambda u: pub_date_map.get(u, ("", ""))[0])
+    grp["hora_pub"] = grp["url"].map(lambda u: pub_date_map.get(u, ("", ""))[1])
+    grp["ultima_vis"] = grp["last_date"].astype(str)
+
+    def _status_row(first_d, last_d, fecha_pub_str):
+        pub_d = _dr_to_date(fecha_pub_str) if fecha_pub_str else None
+        if pub_d and pub_d < s_start:
+            return "Contenido publicado previo al análisis"
+        if last_d == s_end:
+            return "Contenido aún vigente"
+        if first_d >= s_start and last_d <= s_end:
+            return "Contenido dentro del período de análisis"
+        return "Revisar"
+
+    grp["status"] = [_status_row(f, l, p) for f, l, p in zip(grp["first_date"], grp["last_date"], grp["fecha_pub"])]
+    return grp
+
+
+def _time(fn, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("sizes", nargs="*", type=int, default=[10_000, 50_000, 200_000])
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    s_start = date(2025, 3, 1)
+    s_end = s_start + timedelta(days=args.days - 1)
+    print(f"{'URLs':>8} {'filas':>9} {'por fila':>10} {'vectorizado':>12} {'speedup':>8}")
+    for n in args.sizes:
+        rows, pub = synth_rows(n, args.days, s_start)
+
+        def _vectorized():
+            return _dr_compat_finalize(_dr_compat_group(rows), pub, s_start, s_end)
+
+        # Mismo resultado antes de medir
+        a = legacy(rows, pub, s_start, s_end).set_index("url")["status"]
+        b = _vectorized().set_index("URL")["Status"]
+        assert (a.sort_index() == b.sort_index()).all(), "status distinto entre implementaciones"
+
+        t_old = _time(legacy, rows, pub, s_start, s_end, repeat=args.repeat)
+        t_new = _time(_vectorized, repeat=args.repeat)
+        print(f"{n:>8} {len(rows):>9} {t_old:>9.3f}s {t_new:>11.3f}s {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# benchmarks/bench_gsc_async.py
+"""
+Cliente async de Search Console (modules/gsc_async.py) contra hilos + googleapiclient.
+
+Levanta un servidor REST local (aiohttp.web, en un subproceso) que responde con el Search Console
+simulado de benchmarks/fake_google.py, y baja sitios × días (date×page, un tramo por día):
+
+  threads   googleapiclient (un httplib2.Http por hilo) + fetch_rows_by_date_slices por sitio,
+            sitios en un ThreadPoolExecutor
+  async     AsyncSearchConsole.fetch_rows_by_date_slices de todos los sitios en un solo loop
+
+Los dos modos hablan HTTP con el mismo servidor: se compara el transporte, no el simulador.
+
+El primer token que recibe el servidor se rechaza con 401 para ejercitar el refresco.
+
+    python -m benchmarks.bench_gsc_async
+    python -m benchmarks.bench_gsc_async --sites 8 --days 30 --latency 80 250 --concurrency 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import unquote
+
+from benchmarks.fake_google import FakeConfig, make_fakes
+from modules.gsc import fetch_rows_by_date_slices
+from modules.gsc_async import AsyncSearchConsole, run
+
+
+class _FakeCreds:
+    """Credencial mínima: refresh() cambia el token (lo que verifica el servidor)."""
+
+    def __init__(self):
+        self.client_id, self.refresh_token, self.scopes = "bench", "bench-refresh", []
+        self.token, self.valid, self.refreshes = "expired", True, 0
+
+    def refresh(self, _request):
+        self.refreshes += 1
+        self.token = f"fresh-{self.refreshes}"
+
+
+def _server_main(cfg: FakeConfig, workers: int, port_q) -> None:
+    """Proceso del servidor REST: Search Console simulado detrás de aiohttp.web."""
+    from aiohttp import web
+
+    fake = make_fakes(cfg)["sc_service"]
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    async def _query(request):
+        if request.headers.get("Authorization") == "Bearer expired":
+            return web.json_response({"error": {"code": 401, "message": "expired"}}, status=401)
+        body = json.loads(await request.read())
+        site = unquote(request.match_info["site"])
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(pool, fake._query, site, body)
+        except Exception as e:
+            status = int(getattr(getattr(e, "resp", None), "status", 500) or 500)
+            return web.json_response({"error": {"code": status, "message": str(e)}}, status=status)
+        return web.json_response(data)
+
+    async def _main():
+        app = web.Application()
+        app.router.add_post("/webmasters/v3/sites/{site}/searchAnalytics/query", _query)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port_q.put(site._server.sockets[0].getsockname()[1])
+        await asyncio.Event().wait()
+
+    asyncio.run(_main())
+
+
+def _serve(cfg: FakeConfig, workers: int):
+    """Servidor en un subproceso (no compite por el GIL con el cliente). Devuelve (root_url, stop)."""
+    import multiprocessing as mp
+
+    port_q = mp.Queue()
+    proc = mp.Process(target=_server_main, args=(cfg, workers, port_q), daemon=True)
+    proc.start()
+    port = port_q.get(timeout=30)
+
+    def _stop():
+        proc.terminate()
+        proc.join(timeout=5)
+
+    return f"http://127.0.0.1:{port}/", _stop
+
+
+def _threaded_service(root: str):
+    """Servicio searchconsole apuntando al servidor local, con un httplib2.Http por hilo."""
+    import threading
+
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.http import HttpRequest
+
+    from modules.google_clients import get_discovery_doc
+
+    local = threading.local()
+
+    def _builder(_http, *args, **kwargs):
+        if not hasattr(local, "http"):
+            local.http = httplib2.Http(timeout=120)
+        return HttpRequest(local.http, *args, **kwargs)
+
+    return build_from_document(get_discovery_doc("searchconsole", "v1"), http=httplib2.Http(),
+                               requestBuilder=_builder, client_options={"api_endpoint": root})
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--days", type=int, default=14)
+    ap.add_argument("--sites", type=int, default=6)
+    ap.add_argument("--pages", type=int, default=2000, help="URLs distintas por sitio")
+    ap.add_argument("--latency", nargs=2, type=float, default=[60, 180], metavar=("MIN_MS", "MAX_MS"))
+    ap.add_argument("--threads", type=int, default=8, help="hilos por sitio en el modo threads")
+    ap.add_argument("--concurrency", type=int, default=200, help="requests en vuelo en el modo async")
+    args = ap.parse_args()
+
+    end = date(2025, 3, 31)
+    start = end - timedelta(days=args.days - 1)
+    sites = [f"https://www.sitio{i}.com/" for i in range(args.sites)]
+    body = {"dimensions": ["date", "page"], "type": "discover", "dataState": "all"}
+    cfg = FakeConfig(latency_ms=tuple(args.latency), pages=args.pages, sites=sites)
+    print(f"{args.sites} sitios × {args.days} días (date×page), latencia {args.latency} ms")
+
+    root, stop = _serve(cfg, workers=max(32, args.concurrency))
+    try:
+        service = _threaded_service(root)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sites) as ex:
+            total = sum(ex.map(lambda s: len(fetch_rows_by_date_slices(service, s, body, start, end, slice_days=1,
+                                                                       max_workers=args.threads)), sites))
+        print(f"  threads: {total:>9} filas en {time.perf_counter() - t0:6.2f}s "
+              f"({args.sites}×{args.threads} hilos)")
+
+        creds = _FakeCreds()
+
+        async def _all(gsc: AsyncSearchConsole):
+            parts = await asyncio.gather(*(gsc.fetch_rows_by_date_slices(s, body, start, end) for s in sites))
+            return sum(len(p) for p in parts), gsc.calls
+
+        t0 = time.perf_counter()
+        total, calls = run(creds, _all, concurrency=args.concurrency, root_url=root)
+        print(f"  async:   {total:>9} filas en {time.perf_counter() - t0:6.2f}s "
+              f"({calls} requests, {creds.refreshes} refresco(s) de token)")
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_gsc_fetch.py
+"""
+Carga sobre Search Console simulado (benchmarks/fake_google.py).
+
+1) Paginación por tramos de fecha: fetch_rows_by_date_slices con distintas concurrencias.
+2) Varios sitios a la vez: una consulta date×page por sitio, en paralelo + escritura a Sheets.
+
+    python -m benchmarks.bench_gsc_fetch
+    python -m benchmarks.bench_gsc_fetch --days 60 --latency 80 250 --quota-errors 0.03
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from benchmarks.fake_google import FakeConfig, fake_stats, make_fakes
+from modules.gsc import fetch_rows_by_date_slices
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--pages", type=int, default=3000, help="URLs distintas por sitio")
+    ap.add_argument("--latency", nargs=2, type=float, default=[60, 180], metavar=("MIN_MS", "MAX_MS"))
+    ap.add_argument("--quota-errors", type=float, default=0.0, help="proporción de 429 simulados")
+    ap.add_argument("--server-errors", type=float, default=0.0, help="proporción de 503 simulados")
+    ap.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8, 16])
+    ap.add_argument("--sites", type=int, default=4)
+    args = ap.parse_args()
+
+    end = date(2025, 3, 31)
+    start = end - timedelta(days=args.days - 1)
+    body = {"dimensions": ["date", "page"], "type": "discover", "dataState": "all"}
+
+    def _cfg(**kw):
+        return FakeConfig(latency_ms=tuple(args.latency), quota_error_rate=args.quota_errors,
+                          server_error_rate=args.server_errors, pages=args.pages, **kw)
+
+    print(f"1) {args.days} días × {args.pages} URLs (discover, date×page), latencia {args.latency} ms")
+    print(f"{'conc':>5} {'filas':>9} {'llamadas':>9} {'errores':>8} {'seg':>7}")
+    for conc in args.concurrency:
+        fakes = make_fakes(_cfg())
+        t0 = time.perf_counter()
+        rows = fetch_rows_by_date_slices(fakes["sc_service"], "https://www.ejemplo.com/", body, start, end,
+                                         slice_days=1, max_workers=conc)
+        dt = time.perf_counter() - t0
+        st = fake_stats(fakes)["sc_service"]
+        print(f"{conc:>5} {len(rows):>9} {sum(st['calls'].values()):>9} {sum(st['errors'].values()):>8} {dt:>7.2f}")
+
+    sites = [f"https://www.sitio{i}.com/" for i in range(args.sites)]
+    print(f"\n2) {args.sites} sitios en paralelo (8 tramos c/u) + escritura a Sheets")
+    for parallel in (1, args.sites):
+        # Errores solo en Search Console (ahí están los reintentos); Drive/Sheets solo con latencia
+        fakes = make_fakes(_cfg(sites=sites), drive_service=FakeConfig(latency_ms=tuple(args.latency)),
+                           gs_client=FakeConfig(latency_ms=tuple(args.latency)))
+
+        def _one_site(site):
+            rows = fetch_rows_by_date_slices(fakes["sc_service"], site, body, start, end, slice_days=1, max_workers=8)
+            sid = fakes["drive_service"].files().copy(fileId="template", body={"name": site}).execute()["id"]
+            ws = fakes["gs_client"].open_by_key(sid).sheet1
+            ws.update([["date", "url", "clicks"]] + [[r["keys"][0], r["keys"][1], r["clicks"]] for r in rows])
+            return len(rows)
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=parallel) as ex:
+            total = sum(ex.map(_one_site, sites))
+        print(f"   sitios en paralelo={parallel}: {total} filas en {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
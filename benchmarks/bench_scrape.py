@@ -0,0 +1,254 @@
+# benchmarks/bench_scrape.py
+"""
+Benchmark del hot path de scraping/parseo (Estructura de contenidos y Discover Retention).
+
+Levanta un servidor HTTP local (subproceso) que sirve el corpus de benchmarks/corpus.py en
+chunks, y corre cada modo en un subproceso propio para que el pico de RSS sea del modo medido.
+
+Modos:
+  parse_full    parse_html_for_meta con todos los campos (sin red)
+  parse_head    parse_html_for_meta con campos de <head> sobre el fragmento del modo metadatos
+  pub_compat    _pub_parse_like_content_structure de Discover Retention (sin red)
+  scrape_full   scrape_async descargando la página completa
+  scrape_head   scrape_async en modo metadatos (solo <head>)
+
+Métricas: páginas/s, latencia p50/p95 por página, CPU por página (proceso cliente) y pico de RSS.
+
+    python -m benchmarks.bench_scrape
+    python -m benchmarks.bench_scrape --modes scrape_full scrape_head --concurrency 1 16 64 --latency-ms 40
+    python -m benchmarks.bench_scrape --corpus ~/paginas_guardadas --json resultados.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+PARSE_MODES = ("parse_full", "parse_head", "pub_compat")
+SCRAPE_MODES = ("scrape_full", "scrape_head")
+
+WANTS_FULL = {k: True for k in (
+    "title", "h1", "meta_description", "og_title", "og_description", "canonical", "published_time", "lang",
+    "first_paragraph", "article_text", "h2_list", "h2_count", "h3_list", "h3_count", "bold_count", "bold_list",
+    "link_count", "link_anchor_texts", "related_links_count", "related_link_anchors", "tags_list",
+)}
+WANTS_HEAD = {k: True for k in ("title", "meta_description", "og_title", "canonical", "published_time")}
+
+
+# ========= Servidor local =========
+
+def serve(corpus_dir: str, n: int, latency_ms: int) -> None:
+    """Sirve /p/<i>.html en chunks de 16 KB; imprime el puerto en stdout."""
+    import http.server
+
+    from benchmarks.corpus import load
+
+    pages = [p.encode("utf-8") for p in load(corpus_dir, n)]
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            try:
+                i = int(self.path.rsplit("/", 1)[-1].split(".")[0]) % len(pages)
+            except Exception:
+                self.send_error(404)
+                return
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            body = pages[i]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                for j in range(0, len(body), 16384):
+                    self.wfile.write(body[j:j + 16384])
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # el cliente cortó (modo metadatos)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(http.server.ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass  # conexiones cortadas por el cliente: esperables
+
+    srv = Server(("127.0.0.1", 0), Handler)
+    print(srv.server_port, flush=True)
+    srv.serve_forever()
+
+
+# ========= Worker (un modo, una concurrencia) =========
+
+def _pct(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def _run_parse(mode: str, pages: List[str], rounds: int) -> List[float]:
+    from modules.content_scrape import parse_html_for_meta
+
+    if mode == "pub_compat":
+        from modules.app_ext import _pub_parse_like_content_structure as fn  # type: ignore
+        call = fn
+    else:
+        wants = WANTS_FULL if mode == "parse_full" else WANTS_HEAD
+        call = lambda html: parse_html_for_meta(html, wants=wants, xpaths={}, joiner=" | ")  # noqa: E731
+    if mode == "parse_head":
+        # Lo que realmente parsea el modo metadatos: el fragmento que deja el corte por chunks
+        from modules.content_scrape import HEAD_ONLY_MAX_BYTES, head_only_stop
+        from modules.html_stream import CHUNK_SIZE, _Reader
+
+        stop = head_only_stop(WANTS_HEAD)
+        fragments = []
+        for html in pages:
+            raw = html.encode("utf-8")
+            reader = _Reader("utf-8", HEAD_ONLY_MAX_BYTES, stop is None, stop)
+            for j in range(0, len(raw), CHUNK_SIZE):
+                if reader.feed(raw[j:j + CHUNK_SIZE]):
+                    break
+            fragments.append(reader.text())
+        pages = fragments
+    lat = []
+    for _ in range(rounds):
+        for html in pages:
+            t0 = time.perf_counter()
+            call(html)
+            lat.append(time.perf_counter() - t0)
+    return lat
+
+
+def _run_scrape(mode: str, port: int, n_pages: int, rounds: int, concurrency: int) -> List[float]:
+    from modules import content_scrape
+
+    lat: List[float] = []
+    original = content_scrape.fetch_one
+
+    async def _timed_fetch_one(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            lat.append(time.perf_counter() - t0)
+
+    content_scrape.fetch_one = _timed_fetch_one
+    urls = [f"http://127.0.0.1:{port}/p/{i}.html" for i in range(n_pages * rounds)]
+    head = mode == "scrape_head"
+    results = asyncio.run(content_scrape.scrape_async(
+        urls, "bench/1.0", WANTS_HEAD if head else WANTS_FULL, {}, " | ",
+        timeout_s=30, concurrency=concurrency, head_only=head,
+    ))
+    errors = [r for r in results if not r.get("ok")]
+    if errors:
+        raise SystemExit(f"{len(errors)} errores, p.ej. {errors[0].get('error')}")
+    return lat
+
+
+def worker(mode: str, concurrency: int, port: int, corpus_dir: str, n: int, rounds: int) -> Dict[str, Any]:
+    from benchmarks.corpus import load
+
+    pages = load(corpus_dir, n)
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    if mode in PARSE_MODES:
+        lat = _run_parse(mode, pages, rounds)
+    else:
+        lat = _run_scrape(mode, port, len(pages), rounds, concurrency)
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+    total = len(lat)
+    return {
+        "mode": mode,
+        "concurrency": concurrency if mode in SCRAPE_MODES else 1,
+        "pages": total,
+        "pages_per_s": round(total / wall, 1),
+        "p50_ms": round(_pct(lat, 50) * 1000, 2),
+        "p95_ms": round(_pct(lat, 95) * 1000, 2),
+        "cpu_ms_per_page": round(cpu / total * 1000, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+# ========= Orquestador =========
+
+def _self_cmd(*args: str) -> List[str]:
+    return [sys.executable, "-m", "benchmarks.bench_scrape", *args]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modes", nargs="+", default=list(PARSE_MODES + SCRAPE_MODES),
+                    choices=PARSE_MODES + SCRAPE_MODES)
+    ap.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    ap.add_argument("--pages", type=int, default=60, help="tamaño del corpus sintético")
+    ap.add_argument("--rounds", type=int, default=3, help="pasadas sobre el corpus por medición")
+    ap.add_argument("--corpus", default="", help="carpeta con *.html reales")
+    ap.add_argument("--latency-ms", type=int, default=0, help="latencia artificial del servidor")
+    ap.add_argument("--json", default="", help="guardar resultados en este archivo")
+    ap.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--worker", default="", help=argparse.SUPPRESS)
+    ap.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.serve:
+        serve(args.corpus, args.pages, args.latency_ms)
+        return
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.concurrency[0], args.port, args.corpus, args.pages, args.rounds)))
+        return
+
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = None
+    port = 0
+    if any(m in SCRAPE_MODES for m in args.modes):
+        server = subprocess.Popen(
+            _self_cmd("--serve", "--pages", str(args.pages), "--corpus", args.corpus,
+                      "--latency-ms", str(args.latency_ms)),
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, cwd=cwd,
+        )
+        port = int(server.stdout.readline().strip())
+
+    rows: List[Dict[str, Any]] = []
+    try:
+        print(f"{'modo':<12} {'conc':>5} {'págs':>6} {'págs/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'CPU ms/pág':>11} {'RSS MB':>8}")
+        for mode in args.modes:
+            levels = args.concurrency if mode in SCRAPE_MODES else [1]
+            for conc in levels:
+                proc = subprocess.run(
+                    _self_cmd("--worker", mode, "--concurrency", str(conc), "--port", str(port),
+                              "--pages", str(args.pages), "--rounds", str(args.rounds), "--corpus", args.corpus),
+                    capture_output=True, text=True, cwd=cwd,
+                )
+                if proc.returncode != 0:
+                    print(f"{mode:<12} {conc:>5}  ERROR: {(proc.stderr or proc.stdout).strip().splitlines()[-1:]}")
+                    continue
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                rows.append(r)
+                print(f"{r['mode']:<12} {r['concurrency']:>5} {r['pages']:>6} {r['pages_per_s']:>9} "
+                      f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['cpu_ms_per_page']:>11} {r['peak_rss_mb']:>8}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=5)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
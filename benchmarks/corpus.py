@@ -0,0 +1,83 @@
+# benchmarks/corpus.py
+"""
+Corpus de páginas de noticias para los benchmarks de scraping.
+
+Por defecto genera páginas sintéticas con la forma de una nota real (head con metas, OG,
+JSON-LD y scripts pesados; body con nav, artículo, relacionadas y footer), en tres variantes
+de fecha de publicación: meta article:published_time, solo JSON-LD y solo <time>.
+
+Para medir con HTML real, guardar páginas como *.html en una carpeta y pasar --corpus DIR.
+"""
+from __future__ import annotations
+
+import glob
+import os
+import random
+from typing import List
+
+_WORDS = (
+    "gobierno economía inflación dólar elecciones congreso ministro provincia ciudad partido "
+    "equipo torneo selección mercado empresas salarios tarifas clima lluvias alerta salud "
+    "hospital escuela docentes tecnología inteligencia artificial datos informe análisis"
+).split()
+
+
+def _text(rnd: random.Random, n: int) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _page(i: int, rnd: random.Random) -> str:
+    title = _text(rnd, 9)
+    desc = _text(rnd, 25)
+    day = 1 + i % 28
+    iso = f"2025-03-{day:02d}T{rnd.randrange(24):02d}:{rnd.randrange(60):02d}:00-03:00"
+    variant = i % 3
+    meta_pub = f'<meta property="article:published_time" content="{iso}">' if variant == 0 else ""
+    jsonld_pub = f'"datePublished":"{iso}",' if variant in (0, 1) else ""
+    time_tag = f'<time datetime="{iso}">{day} de marzo de 2025</time>' if variant == 2 else ""
+    # Scripts inline grandes: lo que hace pesadas a las notas reales
+    blob = "var __STATE__=" + "{" + ",".join(f'"k{j}":"{_text(rnd, 6)}"' for j in range(rnd.randrange(400, 1400))) + "};"
+    paragraphs = "".join(f"<p>{_text(rnd, rnd.randrange(30, 90))} <b>{_text(rnd, 3)}</b> "
+                         f'<a href="/nota-{rnd.randrange(10**6)}.html">{_text(rnd, 4)}</a></p>'
+                         for _ in range(rnd.randrange(8, 25)))
+    h2s = "".join(f"<h2>{_text(rnd, 6)}</h2><p>{_text(rnd, 40)}</p><h3>{_text(rnd, 5)}</h3>" for _ in range(rnd.randrange(1, 5)))
+    related = "".join(f'<li><a href="/rel-{j}.html">{_text(rnd, 7)}</a></li>' for j in range(6))
+    nav = "".join(f'<a href="/{w}">{w}</a>' for w in _WORDS[:20])
+    return f"""<!DOCTYPE html>
+<html lang="es"><head>
+<meta charset="utf-8"><title>{title}</title>
+<meta name="description" content="{desc}">
+<meta property="og:title" content="{title}"><meta property="og:description" content="{desc}">
+<link rel="canonical" href="https://www.ejemplo.com/seccion/nota-{i}.html">
+{meta_pub}
+<script type="application/ld+json">{{"@context":"https://schema.org","@type":"NewsArticle","headline":"{title}",{jsonld_pub}"author":{{"@type":"Person","name":"Redacción"}},"articleSection":"Sociedad"}}</script>
+<script>{blob}</script>
+<style>{"body{margin:0}" * 200}</style>
+</head><body>
+<header><nav>{nav}</nav></header>
+<main><article><h1>{title}</h1>{time_tag}
+<div class="body">{paragraphs}{h2s}</div>
+<div class="tags"><a rel="tag" href="/tag/a">{_WORDS[i % len(_WORDS)]}</a><a rel="tag" href="/tag/b">{_WORDS[(i + 7) % len(_WORDS)]}</a></div>
+<aside class="related"><ul>{related}</ul></aside>
+</article></main>
+<footer>{_text(rnd, 60)}</footer>
+<script>{blob}</script>
+</body></html>"""
+
+
+def generate(n: int = 60, seed: int = 42) -> List[str]:
+    rnd = random.Random(seed)
+    return [_page(i, rnd) for i in range(n)]
+
+
+def load(corpus_dir: str = "", n: int = 60) -> List[str]:
+    """Páginas de `corpus_dir/*.html` si se indica; si no, el corpus sintético."""
+    if corpus_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(corpus_dir, "*.html"))):
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                pages.append(f.read())
+        if not pages:
+            raise SystemExit(f"No hay *.html en {corpus_dir}")
+        return pages
+    return generate(n)
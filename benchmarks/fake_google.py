@@ -0,0 +1,620 @@
+# benchmarks/fake_google.py
+"""
+Servicios de Google simulados (en memoria) para pruebas de carga de los runners.
+
+Reemplazan a los objetos que reciben los runners, con la misma forma de uso:
+  sc_service     .searchanalytics().query(siteUrl=, body=).execute()   (startRow/rowLimit ≤ 25000)
+                 .sites().list().execute()
+  ga4_data       .run_report(request=)                                 (limit/offset, row_count)
+  drive_service  .files().create/copy/get/update/list(...).execute(), .permissions().create(...)
+  gs_client      .open_by_key(id) → spreadsheet/worksheets con update/clear/resize/append_rows/...
+                 (compatible con gspread_dataframe.set_with_dataframe)
+
+Cada servicio tiene latencia configurable y tasas de error:
+  quota_error_rate   → 429 (HttpError / ResourceExhausted / gspread APIError)
+  server_error_rate  → 503
+
+Los datos de Search Console son sintéticos pero consistentes: cada dimensión reparte el total
+diario con pesos Zipf, así la suma por fecha/página coincide (salvo redondeo) con los totales.
+
+    from benchmarks.fake_google import FakeConfig, make_fakes
+    fakes = make_fakes(FakeConfig(latency_ms=(40, 120), quota_error_rate=0.02))
+    run_discover_retention(fakes["sc_service"], fakes["drive_service"], fakes["gs_client"], site, params, None)
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FakeConfig:
+    """Latencia (ms, rango uniforme), tasas de error y tamaño de los datos sintéticos."""
+
+    def __init__(self, latency_ms: Tuple[float, float] = (0.0, 0.0), quota_error_rate: float = 0.0,
+                 server_error_rate: float = 0.0, seed: int = 1234, sites: Optional[List[str]] = None,
+                 daily_clicks: int = 50_000, ctr: float = 0.06, pages: int = 3000, queries: int = 500,
+                 max_rows: int = 250_000):
+        self.latency_ms = latency_ms
+        self.quota_error_rate = quota_error_rate
+        self.server_error_rate = server_error_rate
+        self.seed = seed
+        self.sites = sites or ["https://www.ejemplo.com/", "sc-domain:ejemplo.net"]
+        self.daily_clicks = daily_clicks
+        self.ctr = ctr
+        self.pages = pages
+        self.queries = queries
+        self.max_rows = max_rows
+
+
+class _Chaos:
+    """Latencia + inyección de errores + contadores, compartido por un servicio falso."""
+
+    def __init__(self, cfg: FakeConfig, name: str):
+        self.cfg = cfg
+        self.name = name
+        self._rnd = random.Random(f"{cfg.seed}:{name}")
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def hit(self, op: str) -> Optional[int]:
+        """Registra la llamada, duerme la latencia y devuelve el status de error a simular (o None)."""
+        with self._lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+            lo, hi = self.cfg.latency_ms
+            delay = self._rnd.uniform(lo, hi) / 1000 if hi else 0.0
+            r = self._rnd.random()
+        if delay:
+            time.sleep(delay)
+        status = None
+        if r < self.cfg.quota_error_rate:
+            status = 429
+        elif r < self.cfg.quota_error_rate + self.cfg.server_error_rate:
+            status = 503
+        if status:
+            with self._lock:
+                self.errors[op] = self.errors.get(op, 0) + 1
+        return status
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"calls": dict(self.calls), "errors": dict(self.errors)}
+
+
+class _Call:
+    """Equivalente a HttpRequest: .execute() corre la operación."""
+
+    def __init__(self, fn, *args, **kwargs):
+        self._fn, self._args, self._kwargs = fn, args, kwargs
+
+    def execute(self, num_retries: int = 0):
+        return self._fn(*self._args, **self._kwargs)
+
+
+def _http_error(status: int, message: str):
+    try:
+        import httplib2
+        from googleapiclient.errors import HttpError
+        body = json.dumps({"error": {"code": status, "message": message}}).encode("utf-8")
+        return HttpError(httplib2.Response({"status": status}), body)
+    except Exception:
+        err = RuntimeError(f"HTTP {status}: {message}")
+        err.resp = SimpleNamespace(status=status)  # type: ignore[attr-defined]
+        return err
+
+
+# ========= Search Console =========
+
+_COUNTRIES = ("arg", "mex", "esp", "col", "chl", "per", "usa", "ury", "ven", "ecu")
+_DEVICES = ("MOBILE", "DESKTOP", "TABLET")
+_TYPE_FACTOR = {"web": 1.0, "discover": 0.6, "googleNews": 0.15, "news": 0.2, "image": 0.1, "video": 0.05}
+
+
+def _zipf(n: int, s: float = 1.05) -> List[float]:
+    w = [1.0 / (i + 1) ** s for i in range(n)]
+    tot = sum(w)
+    return [x / tot for x in w]
+
+
+def _h(*parts: Any) -> float:
+    """Pseudo-aleatorio estable en [0, 1) a partir de las claves."""
+    d = hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(d, "big") / 2 ** 64
+
+
+class _GscData:
+    """
+    Filas sintéticas aditivas: cada valor de dimensión tiene un peso para clics y otro para
+    impresiones (Zipf con ruido estable, normalizados), y cada día un factor propio.
+    Métrica de una fila = total diario × factor de los días × producto de pesos de sus valores,
+    así agregar por cualquier dimensión reproduce (salvo redondeo) la consulta sin esa dimensión.
+    """
+
+    def __init__(self, cfg: FakeConfig):
+        self.cfg = cfg
+        self._lock = threading.Lock()
+        self._cache: Dict[Any, List[Dict[str, Any]]] = {}
+
+    def _values(self, site: str, dim: str, start: date, end: date) -> List[Tuple[str, float, float]]:
+        """[(valor, peso_clics, peso_impresiones)]."""
+        if dim == "date":
+            days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+            return [(d, 0.8 + 0.4 * _h(site, "c", d), 0.8 + 0.4 * _h(site, "i", d)) for d in days]
+        base = site.replace("sc-domain:", "https://www.").rstrip("/")
+        if dim == "page":
+            secs = ("politica", "deportes", "economia", "sociedad", "espectaculos", "mundo")
+            vals = [f"{base}/{secs[i % len(secs)]}/nota-{i}.html" for i in range(self.cfg.pages)]
+        elif dim == "query":
+            vals = [f"consulta {i}" for i in range(self.cfg.queries)]
+        elif dim == "country":
+            vals = list(_COUNTRIES)
+        elif dim == "device":
+            vals = list(_DEVICES)
+        else:
+            raise _http_error(400, f"Unsupported dimension: {dim}")
+        z = _zipf(len(vals))
+        wc = [zi * (0.8 + 0.4 * _h(site, "c", v)) for v, zi in zip(vals, z)]
+        wi = [zi * (0.8 + 0.4 * _h(site, "i", v)) for v, zi in zip(vals, z)]
+        sc, si = sum(wc), sum(wi)
+        return [(v, c / sc, i / si) for v, c, i in zip(vals, wc, wi)]
+
+    def rows(self, site: str, dims: List[str], start: date, end: date, search_type: str) -> List[Dict[str, Any]]:
+        key = (site, tuple(dims), start, end, search_type)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        factor = _TYPE_FACTOR.get(search_type, 1.0)
+        daily_c = self.cfg.daily_clicks * factor
+        daily_i = daily_c / self.cfg.ctr
+        if "date" not in dims:
+            # Sin dimensión date, el total del período es la suma de los factores diarios
+            day_w = self._values(site, "date", start, end)
+            daily_c *= sum(c for _, c, _ in day_w)
+            daily_i *= sum(i for _, _, i in day_w)
+        per_dim = [self._values(site, d, start, end) for d in dims]
+        out: List[Dict[str, Any]] = []
+        for combo in itertools.islice(itertools.product(*per_dim), self.cfg.max_rows):
+            wc = wi = 1.0
+            for _, c, i in combo:
+                wc *= c
+                wi *= i
+            keys = [v for v, _, _ in combo]
+            clicks = int(round(daily_c * wc))
+            impressions = max(clicks, int(round(daily_i * wi)))
+            if impressions == 0:
+                continue
+            row = {
+                "clicks": clicks,
+                "impressions": impressions,
+                "ctr": clicks / impressions,
+                "position": round(1 + 20 * _h("p", *keys), 2),
+            }
+            if dims:
+                row = {"keys": keys, **row}
+            out.append(row)
+        if "date" not in dims:
+            out.sort(key=lambda r: (-r["clicks"], -r["impressions"]))
+        with self._lock:
+            self._cache[key] = out
+        return out
+
+
+def _match(op: str, expr: str, value: str) -> bool:
+    import re
+    if op == "equals":
+        return value == expr
+    if op == "notEquals":
+        return value != expr
+    if op == "contains":
+        return expr in value
+    if op == "notContains":
+        return expr not in value
+    if op == "includingRegex":
+        return re.search(expr, value) is not None
+    if op == "excludingRegex":
+        return re.search(expr, value) is None
+    raise _http_error(400, f"Unsupported operator: {op}")
+
+
+def _apply_filters(rows: List[Dict[str, Any]], dims: List[str], groups: List[Dict[str, Any]], site: str, data: _GscData,
+                   start: date, end: date) -> List[Dict[str, Any]]:
+    out = rows
+    for g in groups or []:
+        for f in g.get("filters", []):
+            dim, op, expr = f.get("dimension"), f.get("operator", "equals"), str(f.get("expression", ""))
+            if dim in dims:
+                idx = dims.index(dim)
+                out = [r for r in out if _match(op, expr, str(r["keys"][idx]))]
+            else:
+                # Filtro por dimensión no pedida: escala por el peso de los valores que pasan
+                vals = data._values(site, dim, start, end)
+                share_c = sum(c for v, c, _ in vals if _match(op, expr, v))
+                share_i = sum(i for v, _, i in vals if _match(op, expr, v))
+                out = [dict(r, clicks=int(round(r["clicks"] * share_c)),
+                            impressions=int(round(r["impressions"] * share_i))) for r in out]
+                out = [dict(r, ctr=(r["clicks"] / r["impressions"]) if r["impressions"] else 0.0)
+                       for r in out if r["impressions"] > 0]
+    return out
+
+
+class FakeSearchConsole:
+    def __init__(self, cfg: Optional[FakeConfig] = None):
+        self.cfg = cfg or FakeConfig()
+        self.chaos = _Chaos(self.cfg, "searchconsole")
+        self._data = _GscData(self.cfg)
+
+    # --- API estilo googleapiclient ---
+    def searchanalytics(self):
+        return SimpleNamespace(query=lambda siteUrl, body: _Call(self._query, siteUrl, body))
+
+    def sites(self):
+        return SimpleNamespace(list=lambda: _Call(self._sites_list))
+
+    # --- implementación ---
+    def _sites_list(self) -> Dict[str, Any]:
+        status = self.chaos.hit("sites.list")
+        if status:
+            raise _http_error(status, "simulated error")
+        return {"siteEntry": [{"siteUrl": s, "permissionLevel": "siteOwner"} for s in self.cfg.sites]}
+
+    def _query(self, site_url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        status = self.chaos.hit("searchanalytics.query")
+        if status == 429:
+            raise _http_error(429, "Search Analytics load quota exceeded (simulated).")
+        if status:
+            raise _http_error(status, "Backend Error (simulated).")
+        row_limit = int(body.get("rowLimit", 1000))
+        if row_limit > 25000:
+            raise _http_error(400, "rowLimit must be <= 25000")
+        start_row = int(body.get("startRow", 0))
+        start = date.fromisoformat(body["startDate"])
+        end = date.fromisoformat(body["endDate"])
+        dims = list(body.get("dimensions") or [])
+        search_type = body.get("type") or body.get("searchType") or "web"
+        if search_type == "discover" and "query" in dims:
+            raise _http_error(400, "Discover does not support the query dimension")
+        rows = self._data.rows(site_url, dims, start, end, search_type)
+        rows = _apply_filters(rows, dims, body.get("dimensionFilterGroups") or [], site_url, self._data, start, end)
+        page = rows[start_row:start_row + row_limit]
+        return {"rows": page, "responseAggregationType": "byPage" if "page" in dims else "byProperty"} if page else {}
+
+
+# ========= GA4 Data =========
+
+_GA4_VALUES = {
+    "country": ["Argentina", "Mexico", "Spain", "Colombia", "Chile", "United States"],
+    "deviceCategory": ["mobile", "desktop", "tablet"],
+    "sessionDefaultChannelGroup": ["Organic Search", "Direct", "Organic Social", "Referral", "Email"],
+    "sessionSource": ["google", "(direct)", "facebook.com", "t.co", "bing"],
+}
+
+
+class FakeGa4Data:
+    def __init__(self, cfg: Optional[FakeConfig] = None):
+        self.cfg = cfg or FakeConfig()
+        self.chaos = _Chaos(self.cfg, "ga4_data")
+
+    def _dim_values(self, name: str, start: date, end: date) -> List[str]:
+        if name == "date":
+            return [(start + timedelta(days=i)).strftime("%Y%m%d") for i in range((end - start).days + 1)]
+        if name in _GA4_VALUES:
+            return _GA4_VALUES[name]
+        if name in ("pagePath", "landingPage", "pagePathPlusQueryString"):
+            return [f"/seccion/nota-{i}.html" for i in range(min(self.cfg.pages, 2000))]
+        return [f"{name}_{i}" for i in range(20)]
+
+    def run_report(self, request: Any = None, **kwargs) -> Any:
+        status = self.chaos.hit("run_report")
+        if status:
+            try:
+                from google.api_core import exceptions as gexc
+                raise (gexc.ResourceExhausted if status == 429 else gexc.ServiceUnavailable)("simulated")
+            except ImportError:
+                raise RuntimeError(f"GA4 {status} (simulated)")
+        req = request if isinstance(request, dict) else _proto_to_dict(request)
+        dr = (req.get("date_ranges") or [{}])[0]
+        start = date.fromisoformat(str(dr.get("start_date")))
+        end = date.fromisoformat(str(dr.get("end_date")))
+        dims = [d["name"] if isinstance(d, dict) else d for d in req.get("dimensions", [])]
+        mets = [m["name"] if isinstance(m, dict) else m for m in req.get("metrics", [])]
+        combos = list(itertools.islice(
+            itertools.product(*[self._dim_values(d, start, end) for d in dims]), self.cfg.max_rows))
+        rows = []
+        for combo in combos:
+            base = 1 + int(5000 * _h(req.get("property"), *combo) ** 3)
+            rows.append(SimpleNamespace(
+                dimension_values=[SimpleNamespace(value=v) for v in combo],
+                metric_values=[SimpleNamespace(value=str(int(base * (0.4 + _h(m, *combo))))) for m in mets],
+            ))
+        offset = int(req.get("offset") or 0)
+        limit = int(req.get("limit") or 10000)
+        return SimpleNamespace(
+            dimension_headers=[SimpleNamespace(name=d) for d in dims],
+            metric_headers=[SimpleNamespace(name=m) for m in mets],
+            rows=rows[offset:offset + limit],
+            row_count=len(rows),
+        )
+
+
+def _proto_to_dict(request: Any) -> Dict[str, Any]:
+    try:
+        from google.protobuf.json_format import MessageToDict
+        d = MessageToDict(request._pb, preserving_proto_field_name=True)
+        return d
+    except Exception:
+        return dict(request or {})
+
+
+# ========= Drive =========
+
+class FakeDrive:
+    def __init__(self, cfg: Optional[FakeConfig] = None, sheets: Optional["FakeGspreadClient"] = None):
+        self.cfg = cfg or FakeConfig()
+        self.chaos = _Chaos(self.cfg, "drive")
+        self.sheets = sheets
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.store: Dict[str, Dict[str, Any]] = {}
+
+    def files(self):
+        return SimpleNamespace(
+            create=lambda **kw: _Call(self._create, **kw),
+            copy=lambda **kw: _Call(self._copy, **kw),
+            get=lambda **kw: _Call(self._get, **kw),
+            update=lambda **kw: _Call(self._update, **kw),
+            list=lambda **kw: _Call(self._list, **kw),
+        )
+
+    def permissions(self):
+        return SimpleNamespace(create=lambda **kw: _Call(self._perm, **kw))
+
+    def _check(self, op: str) -> None:
+        status = self.chaos.hit(op)
+        if status:
+            raise _http_error(status, "User rate limit exceeded (simulated)." if status == 429 else "Backend Error")
+
+    def _new(self, name: str, mime: str, parents: List[str]) -> Dict[str, Any]:
+        fid = f"fake{next(self._seq):06d}"
+        meta = {"id": fid, "name": name, "mimeType": mime, "parents": list(parents or []),
+                "webViewLink": f"https://docs.google.com/spreadsheets/d/{fid}/edit"}
+        with self._lock:
+            self.store[fid] = meta
+        if self.sheets is not None and mime.endswith("spreadsheet"):
+            self.sheets._ensure(fid, name)
+        return meta
+
+    def _create(self, body=None, fields=None, media_body=None, **_):
+        self._check("files.create")
+        body = body or {}
+        return dict(self._new(body.get("name", "Sin título"), body.get("mimeType", "application/octet-stream"),
+                              body.get("parents")))
+
+    def _copy(self, fileId, body=None, fields=None, **_):
+        self._check("files.copy")
+        body = body or {}
+        src = self.store.get(fileId, {"mimeType": "application/vnd.google-apps.spreadsheet"})
+        return dict(self._new(body.get("name", f"Copia de {fileId}"), src["mimeType"], body.get("parents")))
+
+    def _get(self, fileId, fields=None, **_):
+        self._check("files.get")
+        with self._lock:
+            meta = self.store.get(fileId)
+        if meta is None:
+            raise _http_error(404, f"File not found: {fileId}")
+        return dict(meta)
+
+    def _update(self, fileId, addParents=None, removeParents=None, body=None, fields=None, **_):
+        self._check("files.update")
+        with self._lock:
+            meta = self.store.setdefault(fileId, {"id": fileId, "name": fileId, "parents": []})
+            if removeParents:
+                meta["parents"] = [p for p in meta["parents"] if p not in removeParents.split(",")]
+            if addParents:
+                meta["parents"] += addParents.split(",")
+            meta.update(body or {})
+            return dict(meta)
+
+    def _list(self, q=None, fields=None, pageSize=100, **_):
+        self._check("files.list")
+        with self._lock:
+            return {"files": [dict(m) for m in list(self.store.values())[:pageSize]]}
+
+    def _perm(self, fileId, body=None, **_):
+        self._check("permissions.create")
+        return {"id": f"perm-{fileId}"}
+
+
+# ========= gspread =========
+
+def _gspread_api_error(status: int):
+    try:
+        import requests
+        from gspread.exceptions import APIError
+        resp = requests.Response()
+        resp.status_code = status
+        resp._content = json.dumps({"error": {"code": status, "message": "simulated", "status":
+                                              "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"}}).encode()
+        return APIError(resp)
+    except Exception:
+        return RuntimeError(f"Sheets API {status} (simulated)")
+
+
+def _not_found(title: str):
+    try:
+        from gspread.exceptions import WorksheetNotFound
+        return WorksheetNotFound(title)
+    except Exception:
+        return KeyError(title)
+
+
+def _a1_to_rc(label: str) -> Tuple[int, int]:
+    col = 0
+    i = 0
+    while i < len(label) and label[i].isalpha():
+        col = col * 26 + (ord(label[i].upper()) - 64)
+        i += 1
+    return int(label[i:] or 1), col or 1
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet: "FakeSpreadsheet", title: str, ws_id: int, rows: int = 1000, cols: int = 26):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = ws_id
+        self.row_count = rows
+        self.col_count = cols
+        self._cells: Dict[Tuple[int, int], Any] = {}
+
+    def _hit(self, op: str) -> None:
+        status = self.spreadsheet.client.chaos.hit(op)
+        if status:
+            raise _gspread_api_error(status)
+
+    def _write(self, r0: int, c0: int, values: List[List[Any]]) -> None:
+        for i, row in enumerate(values):
+            for j, v in enumerate(row):
+                self._cells[(r0 + i, c0 + j)] = v
+        self.row_count = max(self.row_count, r0 + len(values) - 1)
+        self.col_count = max(self.col_count, c0 + max((len(r) for r in values), default=0) - 1)
+
+    def update(self, range_name: Any = None, values: Any = None, **kwargs):
+        self._hit("worksheet.update")
+        # gspread 5: update(range, values) / gspread 6: update(values, range_name)
+        if isinstance(range_name, list):
+            range_name, values = values, range_name
+        r0, c0 = _a1_to_rc(str(range_name).split(":")[0].split("!")[-1]) if range_name else (1, 1)
+        self._write(r0, c0, values or [])
+        return {"updatedRows": len(values or [])}
+
+    def update_cells(self, cells, value_input_option=None):
+        self._hit("worksheet.update_cells")
+        for c in cells:
+            self._cells[(c.row, c.col)] = c.value
+
+    def clear(self):
+        self._hit("worksheet.clear")
+        self._cells.clear()
+
+    def resize(self, rows: Optional[int] = None, cols: Optional[int] = None):
+        self.row_count = rows or self.row_count
+        self.col_count = cols or self.col_count
+
+    def update_title(self, title: str):
+        self.title = title
+
+    def append_row(self, values: List[Any], **kwargs):
+        self.append_rows([values])
+
+    def append_rows(self, values: List[List[Any]], **kwargs):
+        self._hit("worksheet.append_rows")
+        last = max((r for r, _ in self._cells), default=0)
+        self._write(last + 1, 1, values)
+
+    def get_all_values(self) -> List[List[Any]]:
+        if not self._cells:
+            return []
+        nr = max(r for r, _ in self._cells)
+        nc = max(c for _, c in self._cells)
+        return [[str(self._cells.get((r, c), "")) for c in range(1, nc + 1)] for r in range(1, nr + 1)]
+
+    def acell(self, label: str):
+        r, c = _a1_to_rc(label)
+        return SimpleNamespace(row=r, col=c, value=self._cells.get((r, c)))
+
+    def format(self, *args, **kwargs):
+        return None
+
+    def freeze(self, *args, **kwargs):
+        return None
+
+
+class FakeSpreadsheet:
+    def __init__(self, client: "FakeGspreadClient", key: str, title: str):
+        self.client = client
+        self.id = key
+        self.title = title
+        self.url = f"https://docs.google.com/spreadsheets/d/{key}"
+        self._ids = itertools.count(0)
+        self._sheets: List[FakeWorksheet] = [FakeWorksheet(self, "Hoja 1", next(self._ids))]
+
+    @property
+    def sheet1(self) -> FakeWorksheet:
+        return self._sheets[0]
+
+    def worksheets(self) -> List[FakeWorksheet]:
+        return list(self._sheets)
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        for ws in self._sheets:
+            if ws.title == title:
+                return ws
+        raise _not_found(title)
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26, index: Optional[int] = None):
+        status = self.client.chaos.hit("spreadsheet.add_worksheet")
+        if status:
+            raise _gspread_api_error(status)
+        ws = FakeWorksheet(self, title, next(self._ids), int(rows), int(cols))
+        self._sheets.append(ws)
+        return ws
+
+    def del_worksheet(self, ws: FakeWorksheet):
+        self._sheets = [w for w in self._sheets if w is not ws]
+
+    def batch_update(self, body: Dict[str, Any]):
+        self.client.chaos.hit("spreadsheet.batch_update")
+        return {"replies": [{} for _ in body.get("requests", [])]}
+
+
+class FakeGspreadClient:
+    def __init__(self, cfg: Optional[FakeConfig] = None):
+        self.cfg = cfg or FakeConfig()
+        self.chaos = _Chaos(self.cfg, "sheets")
+        self._lock = threading.Lock()
+        self.spreadsheets: Dict[str, FakeSpreadsheet] = {}
+
+    def _ensure(self, key: str, title: str = "") -> FakeSpreadsheet:
+        with self._lock:
+            sh = self.spreadsheets.get(key)
+            if sh is None:
+                sh = self.spreadsheets[key] = FakeSpreadsheet(self, key, title or key)
+            return sh
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        status = self.chaos.hit("open_by_key")
+        if status:
+            raise _gspread_api_error(status)
+        return self._ensure(key)
+
+    def create(self, title: str, folder_id: Optional[str] = None) -> FakeSpreadsheet:
+        return self._ensure(f"sheet-{len(self.spreadsheets) + 1:06d}", title)
+
+
+# ========= Fábrica =========
+
+def make_fakes(cfg: Optional[FakeConfig] = None, **per_service: FakeConfig) -> Dict[str, Any]:
+    """
+    {"sc_service", "ga4_data", "drive_service", "gs_client"} con la configuración `cfg`;
+    se puede pisar por servicio, p.ej. make_fakes(cfg, gs_client=FakeConfig()) para Sheets sin errores.
+    """
+    cfg = cfg or FakeConfig()
+    gs = FakeGspreadClient(per_service.get("gs_client", cfg))
+    return {
+        "sc_service": FakeSearchConsole(per_service.get("sc_service", cfg)),
+        "ga4_data": FakeGa4Data(per_service.get("ga4_data", cfg)),
+        "drive_service": FakeDrive(per_service.get("drive_service", cfg), sheets=gs),
+        "gs_client": gs,
+    }
+
+
+def fake_stats(fakes: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: obj.chaos.stats() for name, obj in fakes.items()}
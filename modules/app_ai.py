@@ -77,7 +77,12 @@ def prompts_map():
     return _PROMPTS
 
 
-def gemini_healthcheck():
+def gemini_healthcheck(import_sdk: bool = True):
+    """
+    Verifica API key y (si import_sdk) que el SDK importe e instancie el modelo.
+    Con import_sdk=False solo mira la key: sirve para el aviso de cada rerun sin
+    pagar el import de google-generativeai.
+    """
     ok = True
     msgs = []
     try:
@@ -88,6 +93,8 @@ def gemini_healthcheck():
     except Exception:
         has_key = False
     msgs.append(f"API key presente: {has_key}")
+    if not import_sdk:
+        return has_key, msgs
 
     try:
         import google.generativeai as genai  # noqa
@@ -205,6 +205,14 @@ def logout_screen(app_home_url: str = "?"):
             except Exception: pass
             try: st.cache_resource.clear()
             except Exception: pass
+            # Servicios/conexiones de Google cacheados en el proceso para estas credenciales
+            try:
+                from modules.google_clients import clear_clients
+                for key in ("creds_dest", "creds_src", "creds_ga4"):
+                    if isinstance(st.session_state.get(key), dict):
+                        clear_clients(st.session_state[key])
+            except Exception:
+                pass
 
             if wipe_pkg:
                 import shutil
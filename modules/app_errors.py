@@ -1,5 +1,6 @@
 import json
 import streamlit as st
+from modules import tracing
 from gspread.exceptions import APIError as GspreadAPIError
 try:
     from googleapiclient.errors import HttpError
@@ -54,12 +55,73 @@ def show_google_error(e, where: str = ""):
         st.error(f"Google API error{f' en {where}' if where else ''}:")
         st.code(raw)
 
+def job_owner() -> str:
+    """
+    Email del usuario para la cola de trabajos: el de Drive (emailAddress) o, si esa consulta
+    falló, el del userinfo del Paso 0 (email). "" si no se conoce.
+    """
+    me = st.session_state.get("_google_identity") or {}
+    email = str(me.get("emailAddress") or me.get("email") or "").strip()
+    return email if "@" in email else ""
+
+def queue_job(titulo: str, fn, site_urls, params, dest_folder_id=None):
+    """
+    Si está activo "Ejecutar en segundo plano" y `fn` es encolable (modules/jobs.py), encola
+    el análisis para `site_urls`, avisa en la UI y devuelve el ID del trabajo. Si no, None.
+    Sin email del usuario no se encola (los trabajos se listan y cancelan por dueño).
+    """
+    if not st.session_state.get("bg_jobs"):
+        return None
+    from modules import jobs
+    runner = jobs.runner_name_for(fn)
+    creds_dest = st.session_state.get("creds_dest")
+    if not runner or not creds_dest:
+        return None
+    owner = job_owner()
+    if not owner:
+        st.caption("ℹ️ No pude identificar tu email de Google: el análisis corre en primer plano.")
+        return None
+    kind = titulo
+    for prefix in ("Procesando ", "Generando "):
+        if kind.startswith(prefix):
+            kind = kind[len(prefix):]
+    job_id = jobs.submit(
+        runner, list(site_urls), params, dest_folder_id,
+        st.session_state.get("creds_src"), creds_dest,
+        title=titulo, owner=owner,
+        activity={"user_email": owner, "analysis_kind": kind,
+                  "gsc_account": st.session_state.get("src_account_label") or ""},
+    )
+    st.success(f"📥 {titulo}: quedó en cola como trabajo `{job_id}`. "
+               "Seguí el progreso en **Trabajos en segundo plano** (barra lateral); podés seguir usando la app.")
+    return job_id
+
+def _traced_call(titulo: str, fn, *args, **kwargs):
+    # Traza por ejecución (panel "⏱️ Tiempos por etapa" en DEBUG); anidada si ya hay una activa
+    with tracing.trace(titulo, sink=st.session_state):
+        # Runners (sc, drive, gs, site_url, params, dest): checkpoint para reanudar si falla
+        if len(args) >= 5 and isinstance(args[3], str):
+            from modules import checkpoints
+
+            def _on_resume(ck):
+                st.info(f"♻️ Reanudando la ejecución anterior que no terminó ({ck.count()} etapas guardadas: "
+                        "no se repiten las consultas ni los pasos ya completados).")
+
+            return checkpoints.run_resumable(checkpoints.runner_kind(fn), fn, *args,
+                                             on_resume=_on_resume, **kwargs)
+        return fn(*args, **kwargs)
+
 def run_with_indicator(titulo: str, fn, *args, **kwargs):
+    # Runners (sc, drive, gs, site_url, params, dest): en segundo plano si el usuario lo eligió
+    if len(args) >= 5 and isinstance(args[3], str):
+        dest = args[5] if len(args) > 5 else kwargs.get("dest_folder_id")
+        if queue_job(titulo, fn, [args[3]], args[4], dest):
+            st.stop()
     mensaje = f"⏳ {titulo}… Esto puede tardar varios minutos."
     if hasattr(st, "status"):
         with st.status(mensaje, expanded=True) as status:
             try:
-                res = fn(*args, **kwargs)
+                res = _traced_call(titulo, fn, *args, **kwargs)
                 status.update(label="✅ Informe generado", state="complete")
                 return res
             except GspreadAPIError as e:
@@ -77,7 +139,7 @@ def run_with_indicator(titulo: str, fn, *args, **kwargs):
     else:
         with st.spinner(mensaje):
             try:
-                return fn(*args, **kwargs)
+                return _traced_call(titulo, fn, *args, **kwargs)
             except GspreadAPIError as e:
                 show_google_error(e, where=titulo)
                 st.stop()
@@ -251,6 +251,62 @@ if run_report_results is None:
             ws.clear()
             ws.update([df.columns.tolist()] + df.fillna("").astype(str).values.tolist())
 
+        def _rr__top_pages(df: _pd.DataFrame, top_n: int) -> _pd.DataFrame:
+            if df is None or df.empty:
+                return df
+            df = (df.sort_values("clicks", ascending=False)
+                    .groupby("page", as_index=False)
+                    .first()
+                    .sort_values("clicks", ascending=False))
+            return df.head(top_n) if top_n > 0 else df
+
+        def _rr__top_by_country(sc, site, start, end, search_type, filters, countries, top_n):
+            """
+            Top de páginas por país con una sola consulta page×country (filtro includingRegex con
+            los países) partida localmente. Un país que no llega a top_n porque la respuesta vino
+            en el tope de filas se vuelve a pedir solo; si la consulta conjunta falla, una por país.
+            """
+            codes = list(dict.fromkeys(str(c).strip().lower() for c in countries if str(c).strip()))
+            if not codes:
+                return {}
+            per_country = max(1000, top_n if top_n > 0 else 1000)
+            out = {}
+            pending = list(codes)
+            if len(codes) > 1:
+                try:
+                    from modules.gsc_filters import countries_filter  # type: ignore
+                    limit = min(25000, per_country * len(codes))
+                    df_all = _rr__gsc_query(
+                        sc, site, start, end, search_type,
+                        dimensions=["page", "country"],
+                        filters=list(filters or []) + [countries_filter(codes)],
+                        row_limit=limit,
+                        order_by=[{"field": "clicks", "descending": True}],
+                    )
+                    saturated = len(df_all) >= limit
+                    pending = []
+                    for iso in codes:
+                        part = df_all[df_all["country"].str.lower() == iso] if not df_all.empty else df_all
+                        if saturated and len(part) < (top_n if top_n > 0 else per_country):
+                            pending.append(iso)
+                            continue
+                        out[iso] = _rr__top_pages(part, top_n)
+                except Exception:
+                    pending = [iso for iso in codes if iso not in out]
+            for iso in pending:
+                try:
+                    df_ctry = _rr__gsc_query(
+                        sc, site, start, end, search_type,
+                        dimensions=["page", "country"],
+                        filters=list(filters or []) + [{"dimension": "country", "operator": "equals", "expression": iso}],
+                        row_limit=per_country,
+                        order_by=[{"field": "clicks", "descending": True}],
+                    )
+                    out[iso] = _rr__top_pages(df_ctry, top_n)
+                except Exception:
+                    out[iso] = _pd.DataFrame()
+            return out
+
         def run_report_results(sc_service, drive_service, gs_client, site_url: str, params: dict, dest_folder_id: str | None = None) -> str | None:  # type: ignore[override]
             start = _rr__as_date(params.get("start"))
             end   = _rr__as_date(params.get("end"))
@@ -322,25 +378,12 @@ if run_report_results is None:
                     df_top_global = _pd.DataFrame()
                 _rr__write_ws(_ensure(f"Top Global ({label})"), df_top_global)
 
+                by_country = _rr__top_by_country(sc_service, site_url, start, end, src, filters, countries, top_n)
                 for iso3 in countries:
                     iso = str(iso3).strip().lower()
-                    filters_iso = list(filters) if filters else []
-                    filters_iso.append({"dimension": "country", "operator": "equals", "expression": iso})
+                    df_top_ctry = by_country.get(iso)
                     try:
-                        df_top_ctry = _rr__gsc_query(
-                            sc_service, site_url, start, end, src,
-                            dimensions=["page", "country"],
-                            filters=filters_iso,
-                            row_limit=max(1000, top_n if top_n > 0 else 1000),
-                            order_by=[{"field": "clicks", "descending": True}],
-                        )
-                        if not df_top_ctry.empty:
-                            df_top_ctry = (df_top_ctry
-                                           .sort_values("clicks", ascending=False)
-                                           .groupby("page", as_index=False)
-                                           .first())
-                            if top_n > 0:
-                                df_top_ctry = df_top_ctry.head(top_n)
+                        if df_top_ctry is not None and not df_top_ctry.empty:
                             df_top_ctry = _rr__apply_metrics(df_top_ctry, metrics)
                             df_top_ctry = df_top_ctry.rename(columns={"page": "URL", "country": "País"})
                     except Exception:
@@ -422,6 +465,18 @@ def _resolve_discover_retention():
 
 from typing import Any, Optional, Tuple, Dict, List
 
+try:
+    from modules import tracing as _tracing  # type: ignore
+except Exception:
+    _tracing = None  # type: ignore
+
+def _tr_span(name: str, kind: str):
+    """Span de modules/tracing.py (no-op si el módulo no está)."""
+    if _tracing is None:
+        import contextlib
+        return contextlib.nullcontext()
+    return _tracing.span(name, kind)
+
 def _dr_try_import_streamlit():
     try:
         import streamlit as st  # type: ignore
@@ -464,6 +519,96 @@ def _dr_extract_section(url: str) -> str:
     except Exception:
         return ""
 
+# Primer segmento del path (equivalente vectorizado de _dr_extract_section)
+_DR_SECTION_RE = r"^(?:[^:/?#]+:)?(?://[^/?#]*)?/([^/?#]*)"
+
+_DR_STATUS_PREVIO = "Contenido publicado previo al análisis"
+_DR_STATUS_VIGENTE = "Contenido aún vigente"
+_DR_STATUS_PERIODO = "Contenido dentro del período de análisis"
+_DR_STATUS_REVISAR = "Revisar"
+
+
+def _dr_compat_group(rows: List[Dict[str, Any]]):
+    """
+    Filas GSC [date, page] -> una fila por URL con clics/impresiones, primer/último día
+    (datetime64), sección y días de permanencia. Todo vectorizado.
+    """
+    import pandas as pd  # type: ignore
+
+    df = pd.DataFrame({
+        "date": pd.to_datetime([r["keys"][0] for r in rows], format="%Y-%m-%d"),
+        "url": [r["keys"][1] for r in rows],
+        "clicks": [r.get("clicks", 0) for r in rows],
+        "impressions": [r.get("impressions", 0) for r in rows],
+    })
+    grp = df.groupby("url", as_index=False, sort=True).agg(
+        clicks=("clicks", "sum"),
+        impressions=("impressions", "sum"),
+        first_date=("date", "min"),
+        last_date=("date", "max"),
+    )
+    grp["section"] = grp["url"].str.extract(_DR_SECTION_RE, expand=False).fillna("")
+    grp["dias_perm"] = (grp["last_date"] - grp["first_date"]).dt.days
+    return grp
+
+
+def _dr_compat_finalize(grp, pub_date_map: Dict[str, Tuple[str, str]], start_dt, end_dt):
+    """
+    Agrega fecha/hora de publicación y Status (np.select) y devuelve la tabla final
+    con las columnas del template, fechas como YYYY-MM-DD.
+    """
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    pub = pd.DataFrame.from_dict(pub_date_map, orient="index", columns=["fecha_pub", "hora_pub"]) \
+        if pub_date_map else pd.DataFrame(columns=["fecha_pub", "hora_pub"])
+    grp = grp.copy()
+    grp["fecha_pub"] = grp["url"].map(pub["fecha_pub"]).fillna("")
+    grp["hora_pub"] = grp["url"].map(pub["hora_pub"]).fillna("")
+    grp["hora_ingreso"] = ""  # no hay horas en modo compat
+
+    s_start = pd.Timestamp(start_dt)
+    s_end = pd.Timestamp(end_dt)
+    pub_d = pd.to_datetime(grp["fecha_pub"].str.slice(0, 10), format="%Y-%m-%d", errors="coerce")
+    first_d, last_d = grp["first_date"], grp["last_date"]
+    grp["status"] = np.select(
+        [
+            (pub_d < s_start).to_numpy(),
+            (last_d == s_end).to_numpy(),
+            ((first_d >= s_start) & (last_d <= s_end)).to_numpy(),
+        ],
+        [_DR_STATUS_PREVIO, _DR_STATUS_VIGENTE, _DR_STATUS_PERIODO],
+        default=_DR_STATUS_REVISAR,
+    )
+    grp["ultima_vis"] = last_d.dt.strftime("%Y-%m-%d")
+    grp["first_date"] = first_d.dt.strftime("%Y-%m-%d")
+
+    return grp[[
+        "url",
+        "clicks",
+        "impressions",
+        "section",
+        "fecha_pub",
+        "hora_pub",
+        "first_date",
+        "hora_ingreso",
+        "dias_perm",
+        "ultima_vis",
+        "status",
+    ]].rename(columns={
+        "url": "URL",
+        "clicks": "Clics del período",
+        "impressions": "Impresiones del período",
+        "section": "Sección",
+        "fecha_pub": "Fecha de publicación",
+        "hora_pub": "Hora de publicación",
+        "first_date": "Fecha de ingreso a Discover",
+        "hora_ingreso": "Hora de ingreso a Discover",
+        "dias_perm": "Días de permanencia",
+        "ultima_vis": "Última visualización en Discover",
+        "status": "Status",
+    })
+
 def _dr_drive_copy_from_template(drive_service, template_id: str, title: str, dest_folder_id: Optional[str]) -> str:
     body = {"name": title}
     if dest_folder_id:
@@ -478,6 +623,10 @@ def _dr_ws_ensure(sh, title: str):
         return sh.add_worksheet(title=title, rows=500, cols=26)
 
 def _dr_write_ws(ws, values_or_df):
+    with _tr_span("Sheets: escribir pestaña", "sheets"):
+        _dr_write_ws_values(ws, values_or_df)
+
+def _dr_write_ws_values(ws, values_or_df):
     try:
         import pandas as pd  # type: ignore
         if isinstance(values_or_df, pd.DataFrame):
@@ -621,81 +770,23 @@ def _pub_parse_like_content_structure(html_text: str) -> Dict[str, Any]:
         if val:
             out["updated_raw"] = val
 
-    # 4) JSON-LD (solo si nada)
+    # 4) JSON-LD (solo si nada): extractor compartido con content_structure
     if not out["published_raw"]:
-        import re, html as _html, json
         try:
-            blocks = re.findall(r'<script\b[^>]*type\s*=\s*["\']application/ld\+json["\'][^>]*>(.*?)</script>', html_text, flags=re.I|re.S)
-            for block in blocks:
-                raw = _html.unescape(block)
-                try:
-                    data = json.loads(raw)
-                except Exception:
-                    # fallback: regex directa
-                    m = re.search(r'"datePublished"\s*:\s*"([^"]+)"', raw)
-                    if m:
-                        out["published_raw"] = m.group(1).strip()
-                        out["method"] = "jsonld"
-                        break
-                else:
-                    # recorrido buscando datePublished/Created/Modified
-                    def _walk(o):
-                        if isinstance(o, dict):
-                            if "@type" in o and str(o["@type"]).lower() in ("newsarticle","article","report","blogposting"):
-                                for k in ("datePublished","dateCreated","dateModified"):
-                                    v = o.get(k)
-                                    if isinstance(v, str) and v.strip():
-                                        return v.strip()
-                            for v in o.values():
-                                got = _walk(v)
-                                if got: return got
-                        elif isinstance(o, list):
-                            for it in o:
-                                got = _walk(it)
-                                if got: return got
-                        return None
-                    got = _walk(data)
-                    if got:
-                        out["published_raw"] = got
-                        out["method"] = "jsonld"
-                        break
+            from modules.structured_data import date_published
+            val = date_published(html_text)
+            if val:
+                out["published_raw"] = val
+                out["method"] = "jsonld"
         except Exception:
             pass
 
     return out
 
-def _try_parse_dt_flexible(s: str):
-    from datetime import datetime
-    import re
-    s = (s or "").strip()
-    if not s:
-        return None
-    # dateutil
-    try:
-        from dateutil import parser as dp  # type: ignore
-        return dp.parse(s)
-    except Exception:
-        pass
-    # ISO
-    try:
-        return datetime.fromisoformat(s.replace("Z", "+00:00"))
-    except Exception:
-        pass
-    # yyyy-mm-dd hh:mm[:ss]
-    m = re.search(r"(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}(?::\d{2})?)", s)
-    if m:
-        try:
-            return datetime.fromisoformat(m.group(1) + "T" + m.group(2))
-        except Exception:
-            return None
-    # yyyy-mm-dd
-    m = re.search(r"(\d{4}-\d{2}-\d{2})", s)
-    if m:
-        try:
-            return datetime.fromisoformat(m.group(1))
-        except Exception:
-            return None
-    return None
+def _try_parse_dt_flexible(s: str, host: str = ""):
+    # Memoizado y con formato aprendido por host (modules/date_parse.py)
+    from modules.date_parse import parse_datetime
+    return parse_datetime(s, host)
 
 # ---- Fallback Diario (con aviso en UI) ---------------------------------------
 
@@ -711,18 +802,25 @@ def _run_discover_retention_daily_compat(
     Modo compatibilidad (sin HOUR/HOURLY_ALL):
       - Arma Sheets desde template
       - Completa Configuración
-      - Serie diaria Discover por URL (GSC)
-      - Scraping concurrente para Fecha/Hora de publicación (lógica replicada de content_structure)
+      - Serie diaria Discover por URL (GSC, motor de completitud; cobertura en Configuración)
+      - Fetch async parcial (head/primeros KB, corte temprano) para Fecha/Hora de publicación
+        (lógica de parseo replicada de content_structure). Las URLs con fecha ya guardada en
+        modules.pubdate_index no se scrapean (desactivable con pubdate_index=False)
       - Si debug_pubdate=True, crea pestaña "Debug Publicación" con info por URL
+      - Dentro de una ejecución con checkpoint (modules/checkpoints.py) guarda filas GSC, el
+        Sheets creado, Configuración y el scraping parcial: un reintento retoma desde ahí
     """
     import pandas as pd  # type: ignore
     from datetime import date, datetime, timedelta
+    from modules import checkpoints
+    from modules.jobs import report as job_report
 
     # ---------------- Flags y setup ----------------
     st = _dr_try_import_streamlit()
+    ck = checkpoints.current()
     debug_pub = bool(params.get("debug_pubdate", False))
     # opcionales tuning
-    CONCURRENCY = int(params.get("pubdate_concurrency", 10))
+    CONCURRENCY = int(params.get("pubdate_concurrency", 50))
     TIMEOUT = float(params.get("pubdate_timeout", 8.0))
     UA = params.get("ua") or (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -768,6 +866,7 @@ def _run_discover_retention_daily_compat(
         filters.append({"dimension": "country", "operator": "equals", "expression": country})
 
     # ---------------- Query GSC (Discover diario por URL) ----------------
+    # Un tramo por día (o gsc_slice_days), cada tramo paginado completo, tramos en paralelo
     body = {
         "startDate": _dr_iso(start_dt),
         "endDate": _dr_iso(end_dt),
@@ -777,15 +876,39 @@ def _run_discover_retention_daily_compat(
     }
     if filters:
         body["dimensionFilterGroups"] = [{"groupType": "and", "filters": filters}]
-    resp = _dr_gsc_query(sc_service, site_url, body)
-    rows = resp.get("rows", []) or []
+    # Motor de completitud: los días que llegan al tope de filas se parten por país
+    coverage = None
+    try:
+        from modules.gsc_complete import fetch_complete
+    except Exception:
+        fetch_complete = None
+
+    def _fetch_gsc():
+        if fetch_complete is not None:
+            return fetch_complete(
+                sc_service, site_url, body, start_dt, end_dt,
+                slice_days=int(params.get("gsc_slice_days", 1)),
+                max_workers=int(params.get("gsc_concurrency", 8)),
+            )
+        resp = _dr_gsc_query(sc_service, site_url, body)
+        return resp.get("rows", []) or [], None
+
+    rows, coverage = ck.stage("dr:gsc", _fetch_gsc) if ck is not None else _fetch_gsc()
+    job_report(0.2, f"GSC: {len(rows):,} filas")
+    if st is not None and coverage is not None and coverage.clicks_pct is not None and coverage.clicks_pct < 99:
+        st.caption(f"ℹ️ {coverage.summary()}")
 
     # Crear el Sheets (aun si no hay filas, para poder escribir debug/meta)
     template_id = params.get("template_id") or "1SB9wFHWyDfd5P-24VBP7-dE1f1t7YvVYjnsc2XjqU8M"
     site_name = _dr_domain(site_url)
     today_str = _dr_iso(date.today())
     title = f"{site_name} - Discover Retention - {today_str}"
-    sid = _dr_drive_copy_from_template(drive_service, template_id, title, dest_folder_id)
+
+    # Al reanudar se completa el mismo Sheets (no queda una copia a medias por intento)
+    def _copy():
+        return _dr_drive_copy_from_template(drive_service, template_id, title, dest_folder_id)
+
+    sid = ck.stage("dr:sheet", _copy) if ck is not None else _copy()
     sh = gs_client.open_by_key(sid)
 
     # Configuración
@@ -800,7 +923,13 @@ def _run_discover_retention_daily_compat(
         cfg_rows.append(["Sección", str(path_filter)])
     if country:
         cfg_rows.append(["País", str(country).upper()])
-    _dr_write_ws(ws_cfg, cfg_rows)
+    if coverage is not None:
+        cfg_rows.append(["Cobertura estimada (clics)", f"{coverage.clicks_pct}%" if coverage.clicks_pct is not None else "s/d"])
+        cfg_rows.append(["Cobertura estimada (impresiones)", f"{coverage.impressions_pct}%" if coverage.impressions_pct is not None else "s/d"])
+    if ck is None or not ck.has("dr:tab:Configuración"):
+        _dr_write_ws(ws_cfg, cfg_rows)
+        if ck is not None:
+            ck.save("dr:tab:Configuración", True)
 
     # Análisis
     ws_an = _dr_ws_ensure(sh, "Análisis")
@@ -817,143 +946,122 @@ def _run_discover_retention_daily_compat(
         _dr_write_ws(ws_an, headers)
         return sid
 
-    import pandas as pd
-    df = pd.DataFrame([{
-        "date": r["keys"][0],
-        "url":  r["keys"][1],
-        "clicks": r.get("clicks", 0),
-        "impressions": r.get("impressions", 0),
-    } for r in rows])
-    df["date"] = pd.to_datetime(df["date"]).dt.date
-
-    grp = df.groupby("url", as_index=False).agg(
-        clicks=("clicks", "sum"),
-        impressions=("impressions", "sum"),
-        first_date=("date", "min"),
-        last_date=("date", "max"),
-    )
-    grp["section"] = grp["url"].map(_dr_extract_section)
-    grp["dias_perm"] = (grp["last_date"] - grp["first_date"]).dt.days
+    grp = _dr_compat_group(rows)
 
     # =================== SCRAPING PUBLICACIÓN (replica content_structure) ===================
 
     TOTAL = len(grp)
-    TOP_N = min(TOTAL, int(params.get("max_pubdate_fetch", 2000)))  # por defecto todas (hasta 2000)
+    TOP_N = min(TOTAL, int(params.get("max_pubdate_fetch", 10000)))  # por defecto todas (hasta 10k)
     urls_ranked = grp.sort_values("clicks", ascending=False)["url"].tolist()
     urls_fetch = urls_ranked[:TOP_N]
 
-    # ---- Fetchers (requests->lxml/bs4 fallback) con debug
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
-    def _fetch_html(url: str) -> Dict[str, Any]:
-        info = {"url": url, "status": 0, "error": "", "used": "", "length": 0, "html": ""}
-        # requests
-        try:
-            import requests  # type: ignore
-            rs = requests.get(url, headers={"User-Agent": UA}, timeout=TIMEOUT, allow_redirects=True)
-            info["status"] = rs.status_code
-            info["used"] = "requests"
-            if rs.status_code >= 400:
-                info["error"] = f"http {rs.status_code}"
-                return info
-            text = rs.text if rs.text else rs.content.decode(rs.encoding or "utf-8", errors="ignore")
-            info["html"] = text
-            info["length"] = len(text or "")
-            return info
-        except Exception as e:
-            info["error"] = str(e)
-
-        # urllib fallback
-        try:
-            import gzip
-            from urllib.request import Request, urlopen  # type: ignore
-            req = Request(url, headers={"User-Agent": UA, "Accept-Encoding": "gzip, deflate"})
-            with urlopen(req, timeout=TIMEOUT) as resp2:
-                data = resp2.read()
-                enc_hdr = (resp2.headers.get("Content-Encoding") or "").lower()
-                if "gzip" in enc_hdr:
-                    try:
-                        data = gzip.decompress(data)
-                    except Exception:
-                        pass
-                try:
-                    text = data.decode("utf-8")
-                except Exception:
-                    try:
-                        text = data.decode("latin-1", errors="ignore")
-                    except Exception:
-                        text = ""
-                info["status"] = getattr(resp2, "status", 200) or 200
-                info["used"] = "urllib"
-                info["html"] = text
-                info["length"] = len(text or "")
-                info["error"] = ""
-                return info
-        except Exception as e:
-            info["error"] = str(e)
-            return info
+    # ---- Fetch parcial async: solo <head>/primeros KB, corta al encontrar la fecha
+    from modules.html_stream import fetch_many_partial, has_pubdate_signal
 
-    # Ejecutar concurrencia
     if st is not None and urls_fetch:
         st.caption(f"⏳ Extrayendo fecha/hora de publicación en {len(urls_fetch)} URLs (máx={TOP_N})…")
 
     debug_rows: List[Dict[str, Any]] = []
     pub_date_map: dict[str, tuple[str, str]] = {}
+    found_rows: List[Dict[str, Any]] = []
+
+    # ---- Índice local: las URLs con fecha ya conocida no se vuelven a scrapear
+    from modules import pubdate_index
+    use_index = bool(params.get("pubdate_index", True))
+    known = pubdate_index.get_many(urls_fetch) if (use_index and urls_fetch) else {}
+    for u, entry in known.items():
+        pub_date_map[u] = (entry["pub_date"], entry["pub_time"])
+        debug_rows.append({
+            "URL": u, "HTTP": "", "Origen_fetch": "índice", "Len_HTML": 0, "Error_fetch": "",
+            "Method_detect": entry["method"], "published_raw": entry["raw"], "time_tag": "",
+            "updated_raw": "", "Fecha_elegida": entry["pub_date"], "Hora_elegida": entry["pub_time"],
+        })
+    if known:
+        urls_fetch = [u for u in urls_fetch if u not in known]
+        if st is not None:
+            st.caption(f"📇 {len(known)} URLs con fecha ya indexada; se scrapean {len(urls_fetch)} nuevas.")
 
-    def _process_one(u: str) -> Tuple[str, Dict[str, Any]]:
-        finfo = _fetch_html(u)
+    def _process_one(u: str, finfo: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        # Solo parseo del HTML; las fechas se interpretan después, en bloque
         html_text = finfo.get("html", "")
-        method = ""
-        chosen_date = ""
-        chosen_time = ""
         pub = {"published_raw": "", "updated_raw": "", "time_tag": "", "method": ""}
         if html_text:
             pub = _pub_parse_like_content_structure(html_text)
-            method = pub.get("method") or ""
-            raw = pub.get("published_raw") or ""
-            dt = _try_parse_dt_flexible(raw)
-            if dt:
-                chosen_date = dt.date().isoformat()
-                chosen_time = dt.strftime("%H:%M")
-            else:
-                # si time_tag trae una hora parseable, usar
-                raw2 = pub.get("time_tag") or ""
-                dt2 = _try_parse_dt_flexible(raw2)
-                if dt2:
-                    chosen_date = dt2.date().isoformat()
-                    chosen_time = dt2.strftime("%H:%M")
-        if chosen_date or chosen_time:
-            pub_date_map[u] = (chosen_date, chosen_time)
-        else:
-            pub_date_map[u] = ("", "")
         dbg = {
             "URL": u,
             "HTTP": finfo.get("status", 0),
             "Origen_fetch": finfo.get("used", ""),
             "Len_HTML": finfo.get("length", 0),
             "Error_fetch": finfo.get("error", ""),
-            "Method_detect": method,
+            "Method_detect": pub.get("method") or "",
             "published_raw": pub.get("published_raw",""),
             "time_tag": pub.get("time_tag",""),
             "updated_raw": pub.get("updated_raw",""),
-            "Fecha_elegida": chosen_date,
-            "Hora_elegida": chosen_time,
+            "Fecha_elegida": "",
+            "Hora_elegida": "",
         }
         return u, dbg
 
-    if urls_fetch:
-        with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
-            futs = [ex.submit(_process_one, u) for u in urls_fetch]
-            ok = 0
-            for f in as_completed(futs):
-                _, dbg = f.result()
-                if dbg.get("Fecha_elegida") or dbg.get("Hora_elegida"):
-                    ok += 1
-                debug_rows.append(dbg)
+    # ---- Scraping de un intento anterior (checkpoint): solo se bajan las URLs que faltan
+    scraped: List[Dict[str, Any]] = ck.load("dr:scrape", []) if ck is not None else []
+    if scraped:
+        urls_all = urls_fetch
+        pending = set(urls_all) - {r["URL"] for r in scraped}
+        urls_fetch = [u for u in urls_all if u in pending]
         if st is not None:
-            st.caption(f"✅ Publicación detectada en {sum(1 for v in pub_date_map.values() if v[0])}/{len(urls_fetch)} URLs.")
-    else:
-        pub_date_map = {}
+            st.caption(f"♻️ {len(urls_all) - len(urls_fetch)} URLs ya scrapeadas en el intento anterior; "
+                       f"faltan {len(urls_fetch)}.")
+
+    if urls_fetch or scraped:
+        prog = st.progress(0.0) if st is not None else None
+        done = [0]
+        fetched_rows: List[Dict[str, Any]] = list(scraped)
+        CK_EVERY = int(params.get("checkpoint_every", 200))
+
+        def _on_result(finfo: Dict[str, Any]) -> None:
+            # Se parsea a medida que llegan (el fragmento es chico: head + pocos KB)
+            _, dbg = _process_one(finfo["url"], finfo)
+            fetched_rows.append(dbg)
+            done[0] += 1
+            if done[0] % 25 == 0 or done[0] == len(urls_fetch):
+                if prog is not None:
+                    prog.progress(done[0] / len(urls_fetch))
+                job_report(0.2 + 0.7 * done[0] / len(urls_fetch), f"Fecha de publicación: {done[0]}/{len(urls_fetch)} URLs")
+            if ck is not None and done[0] % CK_EVERY == 0:
+                # Las que fallaron por red no se guardan: se reintentan al reanudar
+                ck.save("dr:scrape", [r for r in fetched_rows if not r["Error_fetch"]])
+
+        if urls_fetch:
+            fetch_many_partial(
+                urls_fetch,
+                ua=UA,
+                concurrency=CONCURRENCY,
+                timeout_s=TIMEOUT,
+                max_bytes=int(params.get("pubdate_max_kb", 128)) * 1024,
+                stop=has_pubdate_signal,
+                on_result=_on_result,
+            )
+        if ck is not None:
+            ck.save("dr:scrape", [r for r in fetched_rows if not r["Error_fetch"]])
+
+        # Fechas en bloque: published_raw y, si no parsea, el <time> (formato aprendido por host)
+        from modules.date_parse import parse_many, split_date_time
+        f_urls = [r["URL"] for r in fetched_rows]
+        dts = parse_many([r["published_raw"] for r in fetched_rows], f_urls)
+        dts_time = parse_many([r["time_tag"] if dt is None else "" for r, dt in zip(fetched_rows, dts)], f_urls)
+        for r, dt, dt2 in zip(fetched_rows, dts, dts_time):
+            chosen_date, chosen_time = split_date_time(dt or dt2)
+            r["Fecha_elegida"], r["Hora_elegida"] = chosen_date, chosen_time
+            pub_date_map[r["URL"]] = (chosen_date, chosen_time)
+            if chosen_date:
+                found_rows.append({"url": r["URL"], "pub_date": chosen_date, "pub_time": chosen_time,
+                                   "raw": r["published_raw"] or r["time_tag"], "method": r["Method_detect"]})
+        debug_rows.extend(fetched_rows)
+
+        if use_index:
+            pubdate_index.put_many(found_rows, source="discover_retention")
+        if st is not None:
+            st.caption(f"✅ Publicación detectada en {len(found_rows)}/{len(fetched_rows)} URLs nuevas.")
 
     if debug_pub:
         import pandas as pd  # type: ignore
@@ -964,57 +1072,8 @@ def _run_discover_retention_daily_compat(
         else:
             _dr_write_ws(ws_dbg, [["(sin URLs para depurar)"]])
 
-    grp["fecha_pub"] = grp["url"].map(lambda u: pub_date_map.get(u, ("", ""))[0])
-    grp["hora_pub"]  = grp["url"].map(lambda u: pub_date_map.get(u, ("", ""))[1])
-
-    # =================== Resto de columnas ===================
-    grp["hora_ingreso"] = ""  # no hay horas en modo compat
-    grp["ultima_vis"] = grp["last_date"].astype(str)
-
-    s_start, s_end = start_dt, end_dt
-    def _status_row(first_d, last_d, fecha_pub_str: str):
-        pub_d = None
-        if fecha_pub_str:
-            try:
-                pub_d = _dr_to_date(fecha_pub_str)
-            except Exception:
-                pub_d = None
-        if pub_d and pub_d < s_start:
-            return "Contenido publicado previo al análisis"
-        if (first_d is not None) and (last_d is not None):
-            if last_d == s_end:
-                return "Contenido aún vigente"
-            if (first_d >= s_start) and (last_d <= s_end):
-                return "Contenido dentro del período de análisis"
-        return "Revisar"
-
-    grp["status"] = [ _status_row(fd, ld, fp) for fd, ld, fp in zip(grp["first_date"], grp["last_date"], grp["fecha_pub"]) ]
-
-    out = grp[[
-        "url",
-        "clicks",
-        "impressions",
-        "section",
-        "fecha_pub",
-        "hora_pub",
-        "first_date",
-        "hora_ingreso",
-        "dias_perm",
-        "ultima_vis",
-        "status",
-    ]].rename(columns={
-        "url": "URL",
-        "clicks": "Clics del período",
-        "impressions": "Impresiones del período",
-        "section": "Sección",
-        "fecha_pub": "Fecha de publicación",
-        "hora_pub": "Hora de publicación",
-        "first_date": "Fecha de ingreso a Discover",
-        "hora_ingreso": "Hora de ingreso a Discover",
-        "dias_perm": "Días de permanencia",
-        "ultima_vis": "Última visualización en Discover",
-        "status": "Status",
-    })
+    # =================== Columnas finales + Status (vectorizado) ===================
+    out = _dr_compat_finalize(grp, pub_date_map, start_dt, end_dt)
 
     _dr_write_ws(ws_an, out)
     return sid
@@ -1264,6 +1323,14 @@ if run_content_analysis is not None:
         except Exception:
             st = None
         norm_params = _rca_normalize_params(dict(params or {}))
+        # Secciones/subsecciones como filtros de la API (el runner igual filtra en el cliente)
+        try:
+            from modules.gsc_filters import FilteredSearchConsole, section_filters  # type: ignore
+            sec_filters = section_filters((norm_params.get("filters") or {}).get("sections_payload"))
+            if sec_filters and sc_service is not None:
+                sc_service = FilteredSearchConsole(sc_service, sec_filters)
+        except Exception:
+            pass
         try:
             return _ext_rca_fn(sc_service, drive_service, gs_client, site_url, norm_params, dest_folder_id, *args, **kwargs)
         except Exception as e:
@@ -1374,6 +1441,42 @@ if run_content_structure is not None:
 
     run_content_structure = _rcs_wrapper
 
+# =============================================================================
+# Planificador multi-período: ventanas solapadas se piden una sola vez
+# =============================================================================
+def _with_period_planner(fn):
+    """Envuelve un runner para que sus consultas de totales pasen por un PeriodPlanner propio."""
+    import functools
+
+    @functools.wraps(fn)
+    def _planned(sc_service, drive_service, gs_client, site_url, params, dest_folder_id=None, *args, **kwargs):
+        try:
+            from modules.gsc_periods import PlannedSearchConsole  # type: ignore
+            if sc_service is not None and not isinstance(sc_service, PlannedSearchConsole):
+                countries = (params or {}).get("countries") if isinstance(params, dict) else None
+                sc_service = PlannedSearchConsole(sc_service, countries=countries)
+        except Exception:
+            pass
+        try:
+            return fn(sc_service, drive_service, gs_client, site_url, params, dest_folder_id, *args, **kwargs)
+        finally:
+            planner = getattr(sc_service, "planner", None)
+            if planner is not None and (planner.queries or planner.served):
+                try:
+                    from modules.utils import debug_log  # type: ignore
+                    debug_log("Planificador GSC", {"series_pedidas": planner.queries, "respuestas_locales": planner.served})
+                except Exception:
+                    pass
+
+    return _planned
+
+if run_core_update is not None:
+    run_core_update = _with_period_planner(run_core_update)
+if run_traffic_audit is not None:
+    run_traffic_audit = _with_period_planner(run_traffic_audit)
+if run_report_results is not None:
+    run_report_results = _with_period_planner(run_report_results)
+
 # =============================================================================
 # Parche de serialización segura al escribir a Sheets desde módulos externos
 # =============================================================================
@@ -1437,6 +1540,10 @@ def _patch_write_ws_if_present(module_name: str) -> None:
         return out
 
     def _write_ws_patched(gs_client, spreadsheet, title, df_or_values):
+        with _tr_span(f"Sheets: escribir {title}", "sheets"):
+            return _write_ws_safe(gs_client, spreadsheet, title, df_or_values)
+
+    def _write_ws_safe(gs_client, spreadsheet, title, df_or_values):
         try:
             if pd is not None and isinstance(df_or_values, pd.DataFrame):
                 safe_df = _coerce_df_for_json(df_or_values)
@@ -0,0 +1,291 @@
+# modules/checkpoints.py
+from __future__ import annotations
+
+"""
+Checkpoints locales para reanudar ejecuciones largas.
+
+Cada ejecución tiene un run ID estable (hash de tipo + sitio(s) + parámetros): si falla y se
+vuelve a lanzar con lo mismo, retoma desde la última etapa completa en vez de empezar de cero.
+
+- `.checkpoints/<run_id>/<etapa>.pkl` (o SEO_CHECKPOINT_DIR), escritura atómica (tmp + replace).
+- Al terminar bien se borra el directorio; lo que queda de ejecuciones fallidas vence a las
+  TTL_S (prune() corre al abrir una ejecución).
+- El run ID incluye la carpeta destino y la cuenta de Drive: un reintento con otro destino o de
+  otro usuario no reutiliza el Sheets ni los resultados de otra ejecución.
+- CheckpointedSearchConsole: proxy del servicio que guarda las respuestas de
+  searchanalytics.query de Discover (hasta MAX_CACHED_ROWS filas por ejecución); al reanudar
+  se reutilizan sin gastar cuota (sirve también para runners externos).
+- Etapas propias de cada runner (filas GSC, scraping parcial, sheet creado, pestañas
+  escritas) con current() dentro de la ejecución activa.
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+ROOT = os.environ.get("SEO_CHECKPOINT_DIR") or ".checkpoints"
+TTL_S = 2 * 24 * 60 * 60
+# Filas de respuestas GSC que se guardan por ejecución (el resto se vuelve a pedir al reanudar)
+MAX_CACHED_ROWS = int(os.environ.get("SEO_CHECKPOINT_MAX_ROWS") or 500_000)
+CACHED_TYPES = ("discover", "googleNews")
+
+_CURRENT: contextvars.ContextVar[Optional["Checkpoint"]] = contextvars.ContextVar("seo_checkpoint", default=None)
+_MISSING = object()
+
+
+def _digest(value: Any, n: int = 16) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:n]
+
+
+def _params_for_key(params: Any) -> Any:
+    """Parámetros sin flags de UI/depuración (no cambian el resultado)."""
+    if isinstance(params, dict):
+        return {k: v for k, v in params.items() if not str(k).startswith("debug") and k != "resume"}
+    return params
+
+
+def run_id_for(kind: str, *parts: Any) -> str:
+    return f"{re.sub(r'[^a-z0-9]+', '-', kind.lower()).strip('-')[:40]}-{_digest([kind, *parts])}"
+
+
+class Checkpoint:
+    """Etapas guardadas de una ejecución (un directorio por run ID)."""
+
+    def __init__(self, run_id: str, root: Optional[str] = None):
+        self.run_id = run_id
+        self.path = os.path.join(root or ROOT, run_id)
+
+    def _file(self, stage: str) -> str:
+        safe = re.sub(r"[^\w.-]+", "_", stage)[:60]
+        return os.path.join(self.path, f"{safe}-{_digest(stage, 8)}.pkl")
+
+    def has(self, stage: str) -> bool:
+        return os.path.exists(self._file(stage))
+
+    def load(self, stage: str, default: Any = None) -> Any:
+        try:
+            with open(self._file(stage), "rb") as fh:
+                return pickle.load(fh)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # Archivo corrupto (p.ej. disco lleno a mitad de escritura): se recalcula
+            return default
+
+    def save(self, stage: str, value: Any) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._file(stage))
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+
+    def forget(self, stage: str) -> None:
+        with contextlib.suppress(OSError):
+            os.unlink(self._file(stage))
+
+    def stage(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Valor guardado de `name` o compute() (que se guarda)."""
+        value = self.load(name, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.save(name, value)
+        return value
+
+    def count(self) -> int:
+        try:
+            return sum(1 for f in os.listdir(self.path) if f.endswith(".pkl"))
+        except OSError:
+            return 0
+
+    def finish(self) -> None:
+        """Ejecución completa: se borran sus checkpoints."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def runner_kind(fn: Any) -> str:
+    """Nombre estable del runner (el de modules/app_ext si es encolable: UI y workers comparten run ID)."""
+    try:
+        from modules.jobs import runner_name_for
+        name = runner_name_for(fn)
+    except Exception:
+        name = None
+    return name or getattr(fn, "__name__", None) or "runner"
+
+
+def owner_key(drive_service: Any = None, gs_client: Any = None) -> str:
+    """Huella de la cuenta de Drive/Sheets (credentials_key de sus credenciales)."""
+    from modules.google_clients import credentials_key
+    candidates = (
+        getattr(getattr(gs_client, "http_client", None), "auth", None),   # gspread ≥ 6
+        getattr(gs_client, "auth", None),                                  # gspread 5
+        getattr(getattr(drive_service, "_http", None), "credentials", None),
+    )
+    for creds in candidates:
+        if creds is not None:
+            return credentials_key(creds)
+    # Sin credenciales reconocibles (mocks): por objeto, nunca compartido entre usuarios
+    return f"id:{id(gs_client if gs_client is not None else drive_service)}"
+
+
+def for_run(kind: str, target: Any, params: Any, *, dest_folder_id: Optional[str] = None,
+            owner: str = "", root: Optional[str] = None) -> Checkpoint:
+    """Checkpoint de (tipo de análisis, sitio o lista de sitios, parámetros, destino, cuenta)."""
+    prune(root=root)
+    return Checkpoint(run_id_for(kind, target, _params_for_key(params), dest_folder_id or "", owner), root=root)
+
+
+@contextlib.contextmanager
+def active(ck: Checkpoint) -> Iterator[Checkpoint]:
+    token = _CURRENT.set(ck)
+    try:
+        yield ck
+    finally:
+        _CURRENT.reset(token)
+
+
+def current() -> Optional[Checkpoint]:
+    """Checkpoint de la ejecución en curso (None fuera de una)."""
+    return _CURRENT.get()
+
+
+_LAST_PRUNE = [0.0]
+
+
+def prune(max_age_s: float = TTL_S, root: Optional[str] = None) -> int:
+    """Borra ejecuciones sin tocar hace más de `max_age_s` (como mucho una vez por hora)."""
+    now = time.time()
+    if now - _LAST_PRUNE[0] < 3600:
+        return 0
+    _LAST_PRUNE[0] = now
+    base = root or ROOT
+    removed = 0
+    try:
+        entries = os.listdir(base)
+    except OSError:
+        return 0
+    for name in entries:
+        p = os.path.join(base, name)
+        try:
+            if os.path.isdir(p) and now - os.path.getmtime(p) > max_age_s:
+                shutil.rmtree(p, ignore_errors=True)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def stats(root: Optional[str] = None) -> Dict[str, Any]:
+    base = root or ROOT
+    runs: List[Dict[str, Any]] = []
+    try:
+        for name in sorted(os.listdir(base)):
+            p = os.path.join(base, name)
+            if not os.path.isdir(p):
+                continue
+            files = [os.path.join(p, f) for f in os.listdir(p) if f.endswith(".pkl")]
+            runs.append({"run_id": name, "etapas": len(files),
+                         "MB": round(sum(os.path.getsize(f) for f in files) / 1e6, 2),
+                         "modificado": time.strftime("%Y-%m-%d %H:%M", time.localtime(os.path.getmtime(p)))})
+    except OSError:
+        pass
+    return {"dir": os.path.abspath(base), "runs": runs}
+
+
+def clear_all(root: Optional[str] = None) -> None:
+    shutil.rmtree(root or ROOT, ignore_errors=True)
+
+
+# ========= Respuestas de Search Console =========
+
+class _CheckpointedQuery:
+    def __init__(self, owner: "CheckpointedSearchConsole", inner: Any, site_url: str, body: Dict[str, Any], kwargs):
+        self._owner, self._inner = owner, inner
+        self._site_url, self._body, self._kwargs = site_url, body, kwargs
+
+    def execute(self, *args, **kwargs):
+        def _call():
+            return self._inner.query(siteUrl=self._site_url, body=self._body, **self._kwargs).execute(*args, **kwargs)
+
+        # Solo Discover/News (las etapas caras de reanudar); Search/Evergreen van directo a la API
+        if (self._body.get("type") or self._body.get("searchType")) not in CACHED_TYPES:
+            return _call()
+        ck = self._owner.checkpoint
+        stage = "gsc:" + _digest([self._site_url, self._body], 24)
+        resp = ck.load(stage, _MISSING)
+        if resp is not _MISSING:
+            return resp
+        resp = _call()
+        n = len((resp or {}).get("rows") or [])
+        with self._owner.lock:
+            if self._owner.cached_rows + n > MAX_CACHED_ROWS:
+                return resp
+            self._owner.cached_rows += n
+        try:
+            ck.save(stage, resp)
+        except Exception:
+            pass
+        return resp
+
+
+class _CheckpointedSearchAnalytics:
+    def __init__(self, inner: Any, owner: "CheckpointedSearchConsole"):
+        self._inner = inner
+        self._owner = owner
+
+    def query(self, siteUrl=None, body=None, **kwargs):
+        return _CheckpointedQuery(self._owner, self._inner, siteUrl, dict(body or {}), kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class CheckpointedSearchConsole:
+    """Proxy de un servicio searchconsole que guarda/reutiliza las respuestas Discover de la ejecución."""
+
+    def __init__(self, service: Any, ck: Checkpoint):
+        self._service = service
+        self.checkpoint = ck
+        self.cached_rows = 0
+        self.lock = threading.Lock()
+
+    def searchanalytics(self):
+        return _CheckpointedSearchAnalytics(self._service.searchanalytics(), self)
+
+    def __getattr__(self, name):
+        return getattr(self._service, name)
+
+
+def run_resumable(kind: str, fn: Callable[..., Any], sc_service: Any, drive_service: Any, gs_client: Any,
+                  site_url: str, params: Any, dest_folder_id: Optional[str] = None, *args: Any,
+                  on_resume: Optional[Callable[[Checkpoint], None]] = None, **kwargs: Any) -> Any:
+    """
+    Corre un runner (sc, drive, gs, site_url, params, dest) con checkpoint activo y las consultas
+    GSC de Discover guardadas. Si termina bien borra el checkpoint; si falla queda para la próxima vez.
+    `params["resume"] = False` descarta lo guardado.
+    """
+    ck = for_run(kind, site_url, params, dest_folder_id=dest_folder_id, owner=owner_key(drive_service, gs_client))
+    if isinstance(params, dict) and params.get("resume") is False:
+        ck.finish()
+    elif ck.count() and on_resume is not None:
+        on_resume(ck)
+    if sc_service is not None and not isinstance(sc_service, CheckpointedSearchConsole):
+        sc_service = CheckpointedSearchConsole(sc_service, ck)
+    with active(ck):
+        result = fn(sc_service, drive_service, gs_client, site_url, params, dest_folder_id, *args, **kwargs)
+    ck.finish()
+    return result
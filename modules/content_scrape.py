@@ -0,0 +1,572 @@
+# modules/content_scrape.py
+from __future__ import annotations
+
+"""
+Scraping de Estructura de contenidos: descarga (aiohttp o requests) + parseo de campos.
+
+Vive fuera de app.py para poder importarlo sin Streamlit (benchmarks/bench_scrape.py).
+El progreso se informa con `on_progress(hechas, total)`; la UI decide cómo mostrarlo.
+
+- parse_html_for_meta(html, wants, xpaths, joiner): campos pedidos en `wants`.
+- scrape_async / scrape_sync: muchas URLs, resultados en el orden de entrada.
+- Modo metadatos (head_only): solo se descarga hasta </head> (ver wants_head_only).
+"""
+
+import asyncio
+from typing import Callable, Optional
+
+def parse_html_for_meta(html: str, wants: dict, xpaths: dict, joiner: str = " | ") -> dict:
+    """
+    Extrae campos en función de 'wants' (dict de booleans) y 'xpaths' (opcional).
+    Campos soportados:
+      h1, title, meta_description, og_title, og_description, canonical, published_time, lang,
+      first_paragraph, article_text,
+      h2_list, h2_count, h3_list, h3_count,
+      bold_count, bold_list,
+      link_count, link_anchor_texts,
+      related_links_count, related_link_anchors,
+      tags_list
+    *IMPORTANTE*: h2/h3/bold/link(s) se buscan SOLO dentro del contenedor del artículo si se provee
+    `xpaths['article']`. Si no se provee, se usa heurística (//article | //main).
+    """
+    data = {
+        "h1": "", "title": "", "meta_description": "", "og_title": "", "og_description": "",
+        "canonical": "", "published_time": "", "lang": "",
+        "first_paragraph": "", "article_text": "",
+        "h2_list": "", "h2_count": 0, "h3_list": "", "h3_count": 0,
+        "bold_count": 0, "bold_list": "",
+        "link_count": 0, "link_anchor_texts": "",
+        "related_links_count": 0, "related_link_anchors": "",
+        "tags_list": ""
+    }
+
+    # Intentar lxml para XPath
+    doc = None
+    have_lxml = False
+    try:
+        import lxml.html as LH  # type: ignore
+        doc = LH.fromstring(html)
+        have_lxml = True
+    except Exception:
+        have_lxml = False
+
+    # BeautifulSoup
+    soup = None
+    try:
+        from bs4 import BeautifulSoup  # type: ignore
+        try:
+            soup = BeautifulSoup(html, "lxml")
+        except Exception:
+            soup = BeautifulSoup(html, "html.parser")
+    except Exception:
+        soup = None
+
+    def _meta_bs(name=None, prop=None):
+        if not soup: return ""
+        if name:
+            el = soup.find("meta", attrs={"name": name})
+            if el: return (el.get("content") or "").strip()
+        if prop:
+            el = soup.find("meta", attrs={"property": prop})
+            if el: return (el.get("content") or "").strip()
+        return ""
+
+    def _xpath_text_list(_doc_or_node, xp: str) -> list[str]:
+        if not _doc_or_node or not xp: return []
+        try:
+            nodes = _doc_or_node.xpath(xp)
+            out = []
+            for n in nodes:
+                if isinstance(n, str):
+                    txt = n.strip()
+                elif hasattr(n, "text_content"):
+                    txt = n.text_content().strip()
+                else:
+                    txt = str(n).strip()
+                if txt:
+                    out.append(txt)
+            return out
+        except Exception:
+            return []
+
+    # Determinar contenedor del artículo (scope)
+    lxml_scope_nodes = []
+    soup_scope = None
+    xp_article = (xpaths.get("article") or "").strip()
+    if have_lxml:
+        try:
+            if xp_article:
+                nodes = doc.xpath(xp_article)
+                lxml_scope_nodes = [n for n in nodes if hasattr(n, "xpath")]
+            if not lxml_scope_nodes:
+                lxml_scope_nodes = [n for n in doc.xpath("//article | //main") if hasattr(n, "xpath")]
+        except Exception:
+            lxml_scope_nodes = []
+    if soup and not lxml_scope_nodes:
+        try:
+            soup_scope = soup.select_one("article") or soup.select_one("main")
+        except Exception:
+            soup_scope = None
+
+    # --- Campos básicos (document-wide) ---
+    if wants.get("title"):
+        if soup and soup.title and soup.title.string:
+            data["title"] = soup.title.string.strip()
+        elif have_lxml:
+            try:
+                t = doc.xpath("string(//title)")
+                data["title"] = (t or "").strip()
+            except Exception:
+                pass
+
+    if wants.get("h1"):
+        if have_lxml:
+            try:
+                t = doc.xpath("string((//h1)[1])")
+                data["h1"] = (t or "").strip()
+            except Exception:
+                pass
+        if not data["h1"] and soup:
+            el = soup.find("h1")
+            if el: data["h1"] = el.get_text(strip=True)
+
+    if wants.get("meta_description"):
+        data["meta_description"] = _meta_bs(name="description") or _meta_bs(prop="description")
+
+    if wants.get("og_title"):
+        data["og_title"] = _meta_bs(prop="og:title")
+
+    if wants.get("og_description"):
+        data["og_description"] = _meta_bs(prop="og:description")
+
+    if wants.get("canonical"):
+        if have_lxml:
+            try:
+                hrefs = doc.xpath("//link[translate(@rel,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz')='canonical']/@href")
+                if hrefs: data["canonical"] = hrefs[0].strip()
+            except Exception:
+                pass
+        if not data["canonical"] and soup:
+            try:
+                link = soup.find("link", rel=lambda v: v and ("canonical" in [x.lower() for x in (v if isinstance(v, list) else [v])]))
+                if link: data["canonical"] = (link.get("href") or "").strip()
+            except Exception:
+                pass
+
+    if wants.get("published_time"):
+        val = _meta_bs(prop="article:published_time") or _meta_bs(name="pubdate") or _meta_bs(name="date")
+        if not val:
+            # JSON-LD schema.org (NewsArticle/Article...), antes del respaldo por <time>
+            try:
+                from modules.structured_data import date_published
+                val = date_published(html)
+            except Exception:
+                val = ""
+        if not val and have_lxml:
+            try:
+                val = (doc.xpath("string(//time/@datetime)")) or (doc.xpath("string(//time[1])"))
+            except Exception:
+                pass
+        if not val and soup:
+            try:
+                time_tag = soup.find("time")
+                if time_tag:
+                    val = (time_tag.get("datetime") or "").strip() or time_tag.get_text(strip=True)
+            except Exception:
+                pass
+        data["published_time"] = (val or "").strip()
+
+    if wants.get("lang"):
+        if have_lxml:
+            try:
+                data["lang"] = (doc.xpath("string(//html/@lang)") or "").strip()
+            except Exception:
+                pass
+        if not data["lang"] and soup:
+            try:
+                html_tag = soup.find("html")
+                if html_tag:
+                    data["lang"] = (html_tag.get("lang") or "").strip()
+            except Exception:
+                pass
+
+    # --- Avanzados (dentro del artículo cuando aplique) ---
+    # Primer párrafo
+    if wants.get("first_paragraph"):
+        xp_first = (xpaths.get("first_paragraph") or "").strip()
+        text = ""
+        if xp_first and have_lxml:
+            lst = _xpath_text_list(doc, xp_first)
+            text = next((t for t in lst if t.strip()), "")
+        if not text:
+            if have_lxml and lxml_scope_nodes:
+                for node in lxml_scope_nodes:
+                    try:
+                        t = node.xpath("string(.//p[normalize-space()][1])")
+                        if t and t.strip():
+                            text = t.strip(); break
+                    except Exception:
+                        pass
+            if not text and soup_scope:
+                p = soup_scope.find("p")
+                if p: text = p.get_text(strip=True)
+            if not text and soup:
+                p = soup.find("p")
+                if p: text = p.get_text(strip=True)
+        data["first_paragraph"] = text
+
+    # Texto completo del artículo (opcional, para entidades)
+    if wants.get("article_text"):
+        text_all = ""
+        if have_lxml and lxml_scope_nodes:
+            try:
+                chunks = []
+                for node in lxml_scope_nodes:
+                    try:
+                        t = node.xpath("string(.)")
+                        if t and t.strip():
+                            chunks.append(t.strip())
+                    except Exception:
+                        pass
+                text_all = "\n".join(chunks).strip()
+            except Exception:
+                text_all = ""
+        if not text_all and soup_scope:
+            try:
+                text_all = soup_scope.get_text(" ", strip=True)
+            except Exception:
+                text_all = ""
+        data["article_text"] = text_all
+
+    # Helper para juntar textos dentro del scope lxml
+    def _collect_scope_texts(nodeset, xpath_rel: str) -> list[str]:
+        vals: list[str] = []
+        if nodeset:
+            for node in nodeset:
+                try:
+                    parts = node.xpath(xpath_rel)
+                except Exception:
+                    parts = []
+                for p in parts:
+                    if isinstance(p, str):
+                        txt = p.strip()
+                    elif hasattr(p, "text_content"):
+                        txt = p.text_content().strip()
+                    else:
+                        txt = str(p).strip()
+                    if txt:
+                        vals.append(txt)
+        return vals
+
+    # H2
+    if wants.get("h2_list") or wants.get("h2_count"):
+        xp_h2 = (xpaths.get("h2") or "").strip()
+        h2s: list[str] = []
+        if xp_h2 and have_lxml:
+            if lxml_scope_nodes and (xp_h2.startswith(".") or not xp_h2.startswith("/")):
+                h2s = _collect_scope_texts(lxml_scope_nodes, xp_h2 if xp_h2.startswith(".") else ".//" + xp_h2.strip("./"))
+            else:
+                h2s = _xpath_text_list(doc, xp_h2)
+        elif have_lxml and lxml_scope_nodes:
+            h2s = _collect_scope_texts(lxml_scope_nodes, ".//h2")
+        elif soup_scope:
+            h2s = [el.get_text(strip=True) for el in soup_scope.find_all("h2")]
+        h2s = [t for t in (h2s or []) if t]
+        if wants.get("h2_list"):  data["h2_list"]  = (joiner.join(h2s)) if h2s else ""
+        if wants.get("h2_count"): data["h2_count"] = len(h2s)
+
+    # H3
+    if wants.get("h3_list") or wants.get("h3_count"):
+        xp_h3 = (xpaths.get("h3") or "").strip()
+        h3s: list[str] = []
+        if xp_h3 and have_lxml:
+            if lxml_scope_nodes and (xp_h3.startswith(".") or not xp_h3.startswith("/")):
+                h3s = _collect_scope_texts(lxml_scope_nodes, xp_h3 if xp_h3.startswith(".") else ".//" + xp_h3.strip("./"))
+            else:
+                h3s = _xpath_text_list(doc, xp_h3)
+        elif have_lxml and lxml_scope_nodes:
+            h3s = _collect_scope_texts(lxml_scope_nodes, ".//h3")
+        elif soup_scope:
+            h3s = [el.get_text(strip=True) for el in soup_scope.find_all("h3")]
+        h3s = [t for t in (h3s or []) if t]
+        if wants.get("h3_list"):  data["h3_list"]  = (joiner.join(h3s)) if h3s else ""
+        if wants.get("h3_count"): data["h3_count"] = len(h3s)
+
+    # Negritas — count + lista (SOLO dentro del artículo)
+    if wants.get("bold_count") or wants.get("bold_list"):
+        cnt = 0
+        blist: list[str] = []
+        if have_lxml and lxml_scope_nodes:
+            for node in lxml_scope_nodes:
+                try:
+                    bs = node.xpath(".//*[self::b or self::strong]")
+                    cnt += len(bs)
+                    if wants.get("bold_list"):
+                        for b in bs:
+                            try:
+                                t = b.text_content().strip()
+                                if t: blist.append(t)
+                            except Exception:
+                                pass
+                except Exception:
+                    pass
+        elif soup_scope:
+            try:
+                bs = soup_scope.select("b, strong")
+                cnt = len(bs)
+                if wants.get("bold_list"):
+                    blist = [el.get_text(strip=True) for el in bs if el.get_text(strip=True)]
+            except Exception:
+                cnt = 0
+        data["bold_count"] = int(cnt or 0)
+        if wants.get("bold_list"):
+            data["bold_list"] = joiner.join([t for t in blist if t])
+
+    # Links — count + anchors (SOLO dentro del artículo)
+    if wants.get("link_count") or wants.get("link_anchor_texts"):
+        cnt = 0
+        anchors: list[str] = []
+        if have_lxml and lxml_scope_nodes:
+            for node in lxml_scope_nodes:
+                try:
+                    alist = node.xpath(".//a[@href]")
+                    cnt += len(alist)
+                    if wants.get("link_anchor_texts"):
+                        for a in alist:
+                            try:
+                                t = a.text_content().strip()
+                                if t: anchors.append(t)
+                            except Exception:
+                                pass
+                except Exception:
+                    pass
+        elif soup_scope:
+            try:
+                alist = soup_scope.find_all("a", href=True)
+                cnt = len(alist)
+                if wants.get("link_anchor_texts"):
+                    anchors = [a.get_text(strip=True) for a in alist if a.get_text(strip=True)]
+            except Exception:
+                cnt = 0
+        data["link_count"] = int(cnt or 0)
+        if wants.get("link_anchor_texts"):
+            data["link_anchor_texts"] = joiner.join([t for t in anchors if t])
+
+    # Caja de noticias relacionadas (xpath al contenedor) → count + anchors
+    if wants.get("related_links_count") or wants.get("related_link_anchors"):
+        xp_rel = (xpaths.get("related_box") or "").strip()
+        rel_cnt = 0
+        rel_anchors: list[str] = []
+        if xp_rel and have_lxml:
+            try:
+                boxes = doc.xpath(xp_rel)
+            except Exception:
+                boxes = []
+            for bx in boxes:
+                try:
+                    alist = bx.xpath(".//a[@href]")
+                except Exception:
+                    alist = []
+                rel_cnt += len(alist)
+                if wants.get("related_link_anchors"):
+                    for a in alist:
+                        try:
+                            t = a.text_content().strip()
+                            if t: rel_anchors.append(t)
+                        except Exception:
+                            pass
+        data["related_links_count"] = int(rel_cnt or 0)
+        if wants.get("related_link_anchors"):
+            data["related_link_anchors"] = joiner.join([t for t in rel_anchors if t])
+
+    # Tags (lista)
+    if wants.get("tags_list"):
+        xp_tags = (xpaths.get("tags") or "").strip()
+        tags = []
+        if xp_tags and have_lxml:
+            if lxml_scope_nodes and (xp_tags.startswith(".") or not xp_tags.startswith("/")):
+                for node in lxml_scope_nodes:
+                    tags += _xpath_text_list(node, xp_tags if xp_tags.startswith(".") else ".//" + xp_tags.strip("./"))
+            else:
+                tags = _xpath_text_list(doc, xp_tags)
+        else:
+            mt = []
+            if have_lxml:
+                try:
+                    mt = [t for t in doc.xpath("//meta[@property='article:tag']/@content") if t and str(t).strip()]
+                except Exception:
+                    mt = []
+            if not mt and soup:
+                try:
+                    mt = [ (m.get("content") or "").strip()
+                           for m in soup.find_all("meta", attrs={"property":"article:tag"}) ]
+                    mt = [t for t in mt if t]
+                except Exception:
+                    mt = []
+            tags = mt
+        tags = [t.strip() for t in (tags or []) if t and str(t).strip()]
+        data["tags_list"] = (joiner.join(tags)) if tags else ""
+
+    return data
+
+# Campos que viven en <head>: si solo se piden estos, alcanza con leer hasta </head>
+HEAD_ONLY_FIELDS = {"title", "meta_description", "og_title", "og_description", "canonical", "published_time", "lang"}
+HEAD_ONLY_MAX_BYTES = 192 * 1024
+
+
+def wants_head_only(wants: dict) -> bool:
+    chosen = {k for k, v in (wants or {}).items() if v}
+    return bool(chosen) and chosen <= HEAD_ONLY_FIELDS
+
+
+def head_only_stop(wants: dict):
+    """
+    Condición de corte del modo metadatos. Sin published_time alcanza con </head>;
+    con published_time se sigue leyendo (dentro del presupuesto) hasta ver la fecha en
+    meta/JSON-LD o el primer <time> completo, que es el respaldo de parse_html_for_meta.
+    """
+    import re
+    from modules.html_stream import has_pubdate_signal
+    re_head = re.compile(r"</head\s*>", re.I)
+    re_time = re.compile(r"<time\b[^>]*>.*?</time\s*>", re.I | re.S)
+    if not wants.get("published_time"):
+        return None
+    return lambda t: bool(re_head.search(t)) and (has_pubdate_signal(t) or bool(re_time.search(t)))
+
+
+def remember_pubdates(results: list[dict], known: dict) -> None:
+    """
+    Cruza los resultados con el índice de fechas de publicación (modules.pubdate_index):
+    completa published_time desde el índice y guarda las fechas nuevas que se detectaron.
+    """
+    from modules import pubdate_index
+    from modules.date_parse import parse_many, split_date_time
+    pending = []
+    for r in results:
+        raw = str(r.get("published_time") or "").strip()
+        entry = known.get(r.get("url"))
+        if not raw and entry:
+            r["published_time"] = entry["raw"] or entry["pub_date"]
+        elif raw and not entry:
+            pending.append((r["url"], raw))
+    fresh = []
+    dts = parse_many([raw for _, raw in pending], [u for u, _ in pending])
+    for (url, raw), dt in zip(pending, dts):
+        pub_date, pub_time = split_date_time(dt)
+        if pub_date:
+            fresh.append({"url": url, "pub_date": pub_date, "pub_time": pub_time, "raw": raw,
+                          "method": "content_structure"})
+    pubdate_index.put_many(fresh, source="content_structure")
+
+
+async def fetch_one(session, url: str, ua: str, timeout_s: int, wants: dict, xpaths: dict, joiner: str,
+                     head_only: bool = False) -> dict:
+    base = {"url": url, "ok": False, "status": 0, "error": ""}
+    if head_only:
+        # Modo metadatos: stream hasta </head> (o presupuesto de bytes) y parsear solo ese fragmento
+        from modules.html_stream import fetch_partial
+        stop = head_only_stop(wants)
+        part = await fetch_partial(
+            session, url, timeout_s=timeout_s, max_bytes=HEAD_ONLY_MAX_BYTES,
+            stop_at_head=stop is None, stop=stop, headers={"User-Agent": ua},
+        )
+        base["status"] = part["status"]
+        if part["error"]:
+            base["error"] = part["error"]
+            return base
+        base.update(parse_html_for_meta(part["html"], wants=wants, xpaths=xpaths, joiner=joiner))
+        base["ok"] = True
+        return base
+    try:
+        async with session.get(url, headers={"User-Agent": ua}, timeout=timeout_s, allow_redirects=True) as resp:
+            base["status"] = resp.status
+            if resp.status >= 400:
+                base["error"] = f"http {resp.status}"
+                return base
+            html = await resp.text(errors="ignore")
+            meta = parse_html_for_meta(html, wants=wants, xpaths=xpaths, joiner=joiner)
+            base.update(meta)
+            base["ok"] = True
+            return base
+    except Exception as e:
+        base["error"] = str(e)
+        return base
+
+async def scrape_async(urls: list[str], ua: str, wants: dict, xpaths: dict, joiner: str,
+                        timeout_s: int = 12, concurrency: int = 20, head_only: bool = False,
+                       on_progress: Optional[Callable[[int, int], None]] = None) -> list[dict]:
+    try:
+        import aiohttp  # type: ignore
+    except Exception:
+        return scrape_sync(urls, ua, wants, xpaths, joiner, timeout_s, concurrency, head_only=head_only,
+                           on_progress=on_progress)
+
+    connector = aiohttp.TCPConnector(limit=concurrency, ssl=False)
+    timeout = aiohttp.ClientTimeout(total=max(timeout_s+2, timeout_s))
+    results: list[dict] = []
+    sem = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, trust_env=True) as session:
+        async def _bound(u):
+            async with sem:
+                return await fetch_one(session, u, ua, timeout_s, wants, xpaths, joiner, head_only=head_only)
+        tasks = [_bound(u) for u in urls]
+        done = 0
+        for coro in asyncio.as_completed(tasks):
+            res = await coro
+            results.append(res)
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(tasks))
+    order = {u:i for i,u in enumerate(urls)}
+    results.sort(key=lambda r: order.get(r.get("url",""), 1e9))
+    return results
+
+def scrape_sync(urls: list[str], ua: str, wants: dict, xpaths: dict, joiner: str,
+                 timeout_s: int = 12, concurrency: int = 12, head_only: bool = False,
+                on_progress: Optional[Callable[[int, int], None]] = None) -> list[dict]:
+    try:
+        import requests
+    except Exception as e:
+        return [{"url": u, "ok": False, "status": 0, "error": f"requests no disponible: {e}"} for u in urls]
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    results: list[dict] = []
+    headers = {"User-Agent": ua}
+
+    def _one(u: str) -> dict:
+        base = {"url": u, "ok": False, "status": 0, "error": ""}
+        if head_only:
+            from modules.html_stream import fetch_partial_sync
+            stop = head_only_stop(wants)
+            part = fetch_partial_sync(u, ua, timeout_s=timeout_s, max_bytes=HEAD_ONLY_MAX_BYTES,
+                                      stop_at_head=stop is None, stop=stop)
+            base["status"] = part["status"]
+            if part["error"]:
+                base["error"] = part["error"]
+                return base
+            base.update(parse_html_for_meta(part["html"], wants=wants, xpaths=xpaths, joiner=joiner))
+            base["ok"] = True
+            return base
+        try:
+            rs = requests.get(u, headers=headers, timeout=timeout_s, allow_redirects=True)
+            base["status"] = rs.status_code
+            if rs.status_code >= 400:
+                base["error"] = f"http {rs.status_code}"
+                return base
+            meta = parse_html_for_meta(rs.text, wants=wants, xpaths=xpaths, joiner=joiner)
+            base.update(meta)
+            base["ok"] = True
+        except Exception as e:
+            base["error"] = str(e)
+        return base
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        futs = [ex.submit(_one, u) for u in urls]
+        for f in as_completed(futs):
+            results.append(f.result())
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(futs))
+    order = {u:i for i,u in enumerate(urls)}
+    results.sort(key=lambda r: order.get(r.get("url",""), 1e9))
+    return results
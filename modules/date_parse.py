@@ -0,0 +1,186 @@
+# modules/date_parse.py
+from __future__ import annotations
+
+"""
+Parseo flexible de fechas de publicación con memoria.
+
+Los medios publican con un puñado de formatos que se repiten en todas sus notas, así que:
+  1) por host se aprende el formato que funcionó (patrón strptime o "iso") y se prueba primero,
+     solo si el resultado no es ambiguo (día > 12 en formatos dd/mm o mm/dd): así el resultado
+     es siempre el de dateutil y no depende del orden en que llegan las URLs;
+  2) cada string crudo se parsea una sola vez por proceso (LRU);
+  3) parse_many() deduplica una columna entera (valor, host) antes de parsear.
+
+Orden de estrategias para un string nuevo (el del parser histórico):
+  dateutil → datetime.fromisoformat → regex yyyy-mm-dd[ hh:mm[:ss]].
+Cuando gana dateutil, se busca el patrón strptime que reproduce exactamente ese resultado
+para poder aprenderlo.
+"""
+
+import re
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+ISO = "iso"
+
+# Patrones candidatos a aprender (se verifican contra dateutil antes de guardarlos)
+CANDIDATE_FORMATS: Tuple[str, ...] = (
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%dT%H:%M%z",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+    "%d-%m-%Y %H:%M",
+    "%d-%m-%Y",
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%a, %d %b %Y %H:%M:%S GMT",
+    "%d %b %Y %H:%M",
+    "%d %b %Y",
+    "%B %d, %Y %H:%M",
+    "%B %d, %Y",
+    "%Y%m%d",
+)
+
+_RE_YMD_HM = re.compile(r"(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}(?::\d{2})?)")
+_RE_YMD = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+_LOCK = threading.Lock()
+_HOST_FORMATS: Dict[str, str] = {}
+_HOST_FORMATS_MAX = 5000
+_DATEUTIL = None
+
+
+def _dateutil_parse():
+    global _DATEUTIL
+    if _DATEUTIL is None:
+        try:
+            from dateutil import parser as dp  # type: ignore
+            _DATEUTIL = dp.parse
+        except Exception:
+            _DATEUTIL = False
+    return _DATEUTIL or None
+
+
+def _apply_format(s: str, fmt: str) -> Optional[datetime]:
+    try:
+        if fmt == ISO:
+            return datetime.fromisoformat(s.replace("Z", "+00:00"))
+        return datetime.strptime(s, fmt)
+    except Exception:
+        return None
+
+
+def _same(a: datetime, b: datetime) -> bool:
+    return a.replace(tzinfo=None) == b.replace(tzinfo=None) and a.utcoffset() == b.utcoffset()
+
+
+def _learnable_format(s: str, dt: datetime) -> str:
+    got = _apply_format(s, ISO)
+    if got is not None and _same(got, dt):
+        return ISO
+    for fmt in CANDIDATE_FORMATS:
+        got = _apply_format(s, fmt)
+        if got is not None and _same(got, dt):
+            return fmt
+    return ""
+
+
+@lru_cache(maxsize=50000)
+def _parse_raw(s: str) -> Tuple[Optional[datetime], str]:
+    """(datetime | None, formato aprendible | "") para un string ya normalizado."""
+    parse = _dateutil_parse()
+    if parse is not None:
+        try:
+            dt = parse(s)
+            return dt, _learnable_format(s, dt)
+        except Exception:
+            pass
+    dt = _apply_format(s, ISO)
+    if dt is not None:
+        return dt, ISO
+    m = _RE_YMD_HM.search(s)
+    if m:
+        return _apply_format(m.group(1) + "T" + m.group(2), ISO), ""
+    m = _RE_YMD.search(s)
+    if m:
+        return _apply_format(m.group(1), ISO), ""
+    return None, ""
+
+
+def _unambiguous(fmt: str, dt: datetime) -> bool:
+    """El formato aprendido da lo mismo que dateutil: ISO/año primero, mes con nombre o día > 12."""
+    if "%d" in fmt and "%m" in fmt and not fmt.startswith("%Y"):
+        return dt.day > 12 or dt.day == dt.month
+    return True
+
+
+def host_of(url: str) -> str:
+    try:
+        return urlsplit(url or "").netloc.lower()
+    except Exception:
+        return ""
+
+
+def parse_datetime(raw: Optional[str], host: str = "") -> Optional[datetime]:
+    """
+    Fecha/hora de un string de publicación, o None.
+    `host` (p.ej. "www.clarin.com") habilita el formato aprendido para ese sitio.
+    """
+    s = (raw or "").strip()
+    if not s:
+        return None
+    if host:
+        fmt = _HOST_FORMATS.get(host)
+        if fmt:
+            dt = _apply_format(s, fmt)
+            if dt is not None and _unambiguous(fmt, dt):
+                return dt
+    dt, fmt = _parse_raw(s)
+    if host and fmt and dt is not None and _HOST_FORMATS.get(host) != fmt:
+        with _LOCK:
+            if host not in _HOST_FORMATS and len(_HOST_FORMATS) >= _HOST_FORMATS_MAX:
+                _HOST_FORMATS.pop(next(iter(_HOST_FORMATS)))
+            _HOST_FORMATS[host] = fmt
+    return dt
+
+
+def parse_many(values: Sequence[Optional[str]], urls: Optional[Sequence[str]] = None) -> List[Optional[datetime]]:
+    """
+    Versión columna de parse_datetime: parsea cada (valor, host) distinto una sola vez.
+    `urls` (misma longitud que `values`) aporta el host de cada fila.
+    """
+    hosts = [host_of(u) for u in urls] if urls is not None else [""] * len(values)
+    memo: Dict[Tuple[str, str], Optional[datetime]] = {}
+    out: List[Optional[datetime]] = []
+    for raw, host in zip(values, hosts):
+        key = ((raw or "").strip(), host)
+        if key not in memo:
+            memo[key] = parse_datetime(key[0], host)
+        out.append(memo[key])
+    return out
+
+
+def split_date_time(dt: Optional[datetime]) -> Tuple[str, str]:
+    """("YYYY-MM-DD", "HH:MM") o ("", "")."""
+    if dt is None:
+        return "", ""
+    return dt.date().isoformat(), dt.strftime("%H:%M")
+
+
+def learned_formats() -> Dict[str, str]:
+    with _LOCK:
+        return dict(_HOST_FORMATS)
+
+
+def cache_info():
+    return _parse_raw.cache_info()
+
@@ -0,0 +1,138 @@
+# modules/discovery_bundle.py
+from __future__ import annotations
+
+"""
+Documentos de discovery empaquetados con la app (modules/discovery_docs/*.json).
+
+Se usan con build_from_document para no depender de la red en el primer render.
+Chequeo de versión:
+  - el JSON debe declarar la misma "version" pedida y su sha256 coincidir con el manifest;
+  - si google-api-python-client trae una revisión más nueva del mismo documento, gana esa.
+
+Para refrescar el bundle desde la API pública:
+    python -m modules.discovery_bundle --update
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+BUNDLE_DIR = os.path.join(os.path.dirname(__file__), "discovery_docs")
+MANIFEST_PATH = os.path.join(BUNDLE_DIR, "manifest.json")
+
+# APIs que usa la app vía googleapiclient
+BUNDLED_APIS: Tuple[Tuple[str, str], ...] = (
+    ("searchconsole", "v1"),
+    ("drive", "v3"),
+    ("docs", "v1"),
+)
+
+
+def _doc_name(api: str, version: str) -> str:
+    return f"{api}.{version}"
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _read_manifest() -> Dict[str, Dict[str, str]]:
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f) or {}
+    except Exception:
+        return {}
+
+
+def _revision(doc: Optional[str]) -> str:
+    # Las revisiones de Google son YYYYMMDD: comparables como string
+    if not doc:
+        return ""
+    try:
+        return str(json.loads(doc).get("revision") or "")
+    except Exception:
+        return ""
+
+
+def _installed_static_doc(api: str, version: str) -> Optional[str]:
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+        return get_static_doc(api, version)
+    except Exception:
+        return None
+
+
+def load_bundled_doc(api: str, version: str) -> Optional[str]:
+    """Documento empaquetado si existe y pasa el chequeo de versión/integridad; si no, None."""
+    name = _doc_name(api, version)
+    path = os.path.join(BUNDLE_DIR, f"{name}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            doc = f.read()
+    except Exception:
+        return None
+
+    entry = _read_manifest().get(name) or {}
+    if entry.get("sha256") and entry["sha256"] != _sha256(doc):
+        return None
+    try:
+        meta = json.loads(doc)
+    except Exception:
+        return None
+    if str(meta.get("version") or "") != version:
+        return None
+    return doc
+
+
+def resolve_discovery_doc(api: str, version: str) -> Optional[str]:
+    """
+    Mejor documento offline disponible: bundle o estático de googleapiclient,
+    el de revisión más nueva. None si no hay ninguno (habrá que ir a la red).
+    """
+    bundled = load_bundled_doc(api, version)
+    installed = _installed_static_doc(api, version)
+    if bundled and installed:
+        return installed if _revision(installed) > _revision(bundled) else bundled
+    return bundled or installed
+
+
+def bundle_status() -> Dict[str, Dict[str, str]]:
+    """Resumen para diagnóstico: revisión empaquetada vs. instalada por API."""
+    out: Dict[str, Dict[str, str]] = {}
+    for api, version in BUNDLED_APIS:
+        out[_doc_name(api, version)] = {
+            "bundled": _revision(load_bundled_doc(api, version)) or "—",
+            "installed": _revision(_installed_static_doc(api, version)) or "—",
+        }
+    return out
+
+
+def update_bundle(timeout_s: int = 60) -> Dict[str, Dict[str, str]]:
+    """Descarga los documentos vigentes y reescribe bundle + manifest."""
+    import urllib.request
+
+    manifest: Dict[str, Dict[str, str]] = {}
+    os.makedirs(BUNDLE_DIR, exist_ok=True)
+    for api, version in BUNDLED_APIS:
+        name = _doc_name(api, version)
+        url = f"https://{api}.googleapis.com/$discovery/rest?version={version}"
+        with urllib.request.urlopen(url, timeout=timeout_s) as resp:
+            doc = resp.read().decode("utf-8")
+        json.loads(doc)  # validar antes de pisar el archivo
+        with open(os.path.join(BUNDLE_DIR, f"{name}.json"), "w", encoding="utf-8") as f:
+            f.write(doc)
+        manifest[name] = {"version": version, "revision": _revision(doc), "sha256": _sha256(doc)}
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return manifest
+
+
+if __name__ == "__main__":
+    import sys
+    if "--update" in sys.argv[1:]:
+        print(json.dumps(update_bundle(), indent=2))
+    else:
+        print(json.dumps(bundle_status(), indent=2))
@@ -7,6 +7,7 @@ from typing import List
 import streamlit as st
 
 from .utils import debug_log
+from . import tracing
 
 
 # ========= Clientes y utilidades =========
@@ -30,8 +31,9 @@ def ensure_drive_clients(creds):
         st.caption("Agregá `gspread` a requirements.txt y redeploy.")
         raise
 
-    drive = build("drive", "v3", credentials=creds)
-    gs = gspread.authorize(creds)
+    from .google_clients import get_service, get_gspread_client
+    drive = get_service("drive", "v3", creds)
+    gs = get_gspread_client(creds)
     return drive, gs
 
 
@@ -213,6 +215,7 @@ def copy_template_and_open(drive, gsclient, template_id: str, title: str, dest_f
 
 # ========= Helpers de escritura =========
 
+@tracing.traced("Sheets: escribir DataFrame", kind="sheets")
 def safe_set_df(ws, df, include_header=True):
     """
     Escribe el DataFrame manejando nulos y **redimensionando** la worksheet
@@ -15,5 +15,5 @@ def ensure_data_client(creds):
             "Falta 'google-analytics-data'. Instalalo con: pip install google-analytics-data"
         ) from e
 
-    client = BetaAnalyticsDataClient(credentials=creds)
-    return client
+    from .google_clients import get_ga4_data_client
+    return get_ga4_data_client(creds)
@@ -7,7 +7,8 @@ from google.api_core.exceptions import PermissionDenied, GoogleAPICallError
 
 
 def build_admin_client(credentials) -> AnalyticsAdminServiceClient:
-    return AnalyticsAdminServiceClient(credentials=credentials)
+    from .google_clients import get_ga4_admin_client
+    return get_ga4_admin_client(credentials)
 
 
 def list_account_property_summaries(admin_client: AnalyticsAdminServiceClient) -> List[Dict]:
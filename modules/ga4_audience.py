@@ -18,6 +18,7 @@ Opciones (en params):
   - include_video_metrics: bool = False
   - video_event_names: list[str] = ["video_start","video_complete"]
   - custom_event_names: list[str] = []   # <- NUEVO: lista de eventName GA4 a sumar (crea columnas ev_<evento>)
+  - max_workers: int = 4                 # consultas GA4 concurrentes (las pestañas independientes van en paralelo)
 """
 
 from typing import Any, Tuple, Optional, List, Dict
@@ -25,6 +26,8 @@ from datetime import date, datetime, timedelta
 import pandas as pd
 import re
 
+from . import tracing
+
 
 # ----------------------------
 # Utilidades
@@ -79,6 +82,7 @@ def _pick_win(params: dict) -> Tuple[date, date, int]:
     return _as_date(start), _as_date(end), lag
 
 
+@tracing.traced("GA4: run_report", kind="ga4")
 def _ga4_run_report(
     ga4_client: Any,
     property_id: str,
@@ -126,6 +130,7 @@ def _ga4_run_report(
     return pd.DataFrame(rows)
 
 
+@tracing.traced("Sheets: escribir pestaña", kind="sheets")
 def _gspread_write_df(ws, df: pd.DataFrame) -> None:
     if df is None or df.empty:
         ws.clear()
@@ -322,153 +327,147 @@ def run_ga4_audience_report(
             pass
         return sid
 
-    # 3) Datos GA4
-    try:
-        # --- (1) País + Device
-        dims_1 = ["country", "deviceCategory"]
-        mets_1 = ["activeUsers", "newUsers", "sessions"]
-        df1 = _ga4_run_report(ga4_data, property_id, dims_1, mets_1, start, end)
-        if not df1.empty:
-            df1 = df1.groupby(dims_1, as_index=False).agg(
+    # 3) Datos GA4 — grafo de dependencias:
+    #    nivel 0: (1) país+device, (2) serie diaria y la base de (3) URLs Top, en paralelo
+    #    nivel 1: extras de (3) y las pestañas (4)/(5), que dependen de la lista Top N
+    #    Las escrituras a Sheets van a un único hilo escritor y se solapan con los fetch pendientes.
+    max_workers = max(1, int(params.get("max_workers", 4)))
+    dims_1 = ["country", "deviceCategory"]
+    dims_2 = ["date"]
+    dims_u = [url_dimension]
+    dims_ud = [url_dimension, "country", "deviceCategory"]
+    dims_us = ["date", url_dimension]
+    mets_u = ["activeUsers", "newUsers", "sessions"]
+
+    def _q_country_device() -> pd.DataFrame:
+        df = _ga4_run_report(ga4_data, property_id, dims_1, ["activeUsers", "newUsers", "sessions"], start, end)
+        if not df.empty:
+            df = df.groupby(dims_1, as_index=False).agg(
                 activeUsers=("activeUsers", "sum"),
                 newUsers=("newUsers", "sum"),
                 sessions=("sessions", "sum"),
             ).sort_values(["activeUsers"], ascending=False)
+        return df
 
-        if include_video_metrics:
-            v1 = _video_counts_by(ga4_data, property_id, start, end, dims=dims_1, event_names=video_event_names)
-            df1 = df1.merge(v1, on=dims_1, how="left") if not df1.empty else v1
-
-        if custom_event_names:
-            c1 = _event_counts_by(ga4_data, property_id, start, end, dims=dims_1, event_names=custom_event_names)
-            df1 = df1.merge(c1, on=dims_1, how="left") if not df1.empty else c1
-
-        _gspread_write_df(ws_main, df1)
+    def _q_series() -> pd.DataFrame:
+        df = _ga4_run_report(ga4_data, property_id, dims_2, ["activeUsers", "sessions"], start, end)
+        if not df.empty:
+            df["date"] = df["date"].map(_fmt_date8)
+            df = df.sort_values("date")
+        return df
 
-        # --- (2) Serie diaria
-        dims_2 = ["date"]
-        mets_2 = ["activeUsers", "sessions"]
-        df2 = _ga4_run_report(ga4_data, property_id, dims_2, mets_2, start, end)
-        if not df2.empty:
-            df2["date"] = df2["date"].map(_fmt_date8)
-            df2 = df2.sort_values("date")
+    def _q_urls() -> pd.DataFrame:
+        df_all = _ga4_run_report(
+            ga4_data, property_id, dims_u, mets_u, start, end,
+            order_bys=[{"metric": {"metric_name": "sessions"}, "desc": True}]
+        )
+        if df_all.empty:
+            return pd.DataFrame(columns=dims_u + mets_u)
+        df_top = (
+            df_all.groupby(dims_u, as_index=False)
+            .agg(activeUsers=("activeUsers", "sum"),
+                 newUsers=("newUsers", "sum"),
+                 sessions=("sessions", "sum"))
+            .sort_values("sessions", ascending=False)
+        )
+        if urls_top_n > 0:
+            df_top = df_top.head(urls_top_n)
+        return df_top
+
+    def _q_url_country_device(top_values: List[str]) -> pd.DataFrame:
+        df = _ga4_run_report(
+            ga4_data, property_id, dims_ud, mets_u, start, end,
+            dimension_filter=_in_list_filter(url_dimension, top_values)
+        )
+        if not df.empty:
+            df = df.groupby(dims_ud, as_index=False).agg(
+                activeUsers=("activeUsers", "sum"),
+                newUsers=("newUsers", "sum"),
+                sessions=("sessions", "sum"),
+            ).sort_values([url_dimension, "sessions"], ascending=[True, False])
+        return df
 
+    def _q_url_series(top_values: List[str]) -> pd.DataFrame:
+        df = _ga4_run_report(
+            ga4_data, property_id, dims_us, ["activeUsers", "sessions"], start, end,
+            dimension_filter=_in_list_filter(url_dimension, top_values)
+        )
+        if not df.empty:
+            df["date"] = df["date"].map(_fmt_date8)
+            df = df.sort_values(["date", url_dimension])
+        return df
+
+    def _extras(dims: List[str], top_values: Optional[List[str]] = None) -> List[Any]:
+        # Consultas de video/eventos de una pestaña (independientes entre sí)
+        url_kw = {"url_dim": url_dimension, "url_values": top_values} if top_values else {}
+        out = []
         if include_video_metrics:
-            v2 = _video_counts_by(ga4_data, property_id, start, end, dims=dims_2, event_names=video_event_names)
-            df2 = df2.merge(v2, on=dims_2, how="left") if not df2.empty else v2
-
+            out.append(lambda: _video_counts_by(ga4_data, property_id, start, end,
+                                                dims=dims, event_names=video_event_names, **url_kw))
         if custom_event_names:
-            c2 = _event_counts_by(ga4_data, property_id, start, end, dims=dims_2, event_names=custom_event_names)
-            df2 = df2.merge(c2, on=dims_2, how="left") if not df2.empty else c2
+            out.append(lambda: _event_counts_by(ga4_data, property_id, start, end,
+                                                dims=dims, event_names=custom_event_names, **url_kw))
+        return out
 
-        _gspread_write_df(ws_series, df2)
+    def _merge_parts(dims: List[str], parts: List[pd.DataFrame]) -> pd.DataFrame:
+        df = parts[0]
+        for extra in parts[1:]:
+            df = df.merge(extra, on=dims, how="left") if not df.empty else extra
+        return df
 
-        # --- (3) URLs (Top)
-        dims_u = [url_dimension]
-        mets_u = ["activeUsers", "newUsers", "sessions"]
-        df_urls_all = _ga4_run_report(
-            ga4_data, property_id, dims_u, mets_u, start, end,
-            order_bys=[{"metric": {"metric_name": "sessions"}, "desc": True}]
-        )
-        if not df_urls_all.empty:
-            df_urls_top = (
-                df_urls_all.groupby(dims_u, as_index=False)
-                .agg(activeUsers=("activeUsers", "sum"),
-                     newUsers=("newUsers", "sum"),
-                     sessions=("sessions", "sum"))
-                .sort_values("sessions", ascending=False)
-            )
-            if urls_top_n > 0:
-                df_urls_top = df_urls_top.head(urls_top_n)
-        else:
-            df_urls_top = pd.DataFrame(columns=dims_u + mets_u)
-
-        top_values = df_urls_top[url_dimension].astype(str).tolist() if not df_urls_top.empty else []
-
-        if include_video_metrics and top_values:
-            v_urls = _video_counts_by(
-                ga4_data, property_id, start, end,
-                dims=dims_u, event_names=video_event_names,
-                url_dim=url_dimension, url_values=top_values
-            )
-            df_urls_top = df_urls_top.merge(v_urls, on=dims_u, how="left")
-
-        if custom_event_names and top_values:
-            c_urls = _event_counts_by(
-                ga4_data, property_id, start, end,
-                dims=dims_u, event_names=custom_event_names,
-                url_dim=url_dimension, url_values=top_values
-            )
-            df_urls_top = df_urls_top.merge(c_urls, on=dims_u, how="left")
-
-        _gspread_write_df(ws_urls, df_urls_top)
-
-        # --- (4) URL × País+Device
-        if include_url_country_device and top_values:
-            dims_ud = [url_dimension, "country", "deviceCategory"]
-            mets_ud = ["activeUsers", "newUsers", "sessions"]
-            df_ud = _ga4_run_report(
-                ga4_data, property_id, dims_ud, mets_ud, start, end,
-                dimension_filter=_in_list_filter(url_dimension, top_values)
-            )
-            if not df_ud.empty:
-                df_ud = df_ud.groupby(dims_ud, as_index=False).agg(
-                    activeUsers=("activeUsers", "sum"),
-                    newUsers=("newUsers", "sum"),
-                    sessions=("sessions", "sum"),
-                ).sort_values([url_dimension, "sessions"], ascending=[True, False])
-
-            if include_video_metrics:
-                v_ud = _video_counts_by(
-                    ga4_data, property_id, start, end,
-                    dims=dims_ud, event_names=video_event_names,
-                    url_dim=url_dimension, url_values=top_values
-                )
-                df_ud = df_ud.merge(v_ud, on=dims_ud, how="left") if not df_ud.empty else v_ud
-
-            if custom_event_names:
-                c_ud = _event_counts_by(
-                    ga4_data, property_id, start, end,
-                    dims=dims_ud, event_names=custom_event_names,
-                    url_dim=url_dimension, url_values=top_values
-                )
-                df_ud = df_ud.merge(c_ud, on=dims_ud, how="left") if not df_ud.empty else c_ud
-
-            _gspread_write_df(ws_ud, df_ud)
-        else:
-            _gspread_write_df(ws_ud, pd.DataFrame())
-
-        # --- (5) Serie diaria por URL (Top N)
-        if include_url_series and top_values:
-            dims_us = ["date", url_dimension]
-            mets_us = ["activeUsers", "sessions"]
-            df_us = _ga4_run_report(
-                ga4_data, property_id, dims_us, mets_us, start, end,
-                dimension_filter=_in_list_filter(url_dimension, top_values)
-            )
-            if not df_us.empty:
-                df_us["date"] = df_us["date"].map(_fmt_date8)
-                df_us = df_us.sort_values(["date", url_dimension])
-
-            if include_video_metrics:
-                v_us = _video_counts_by(
-                    ga4_data, property_id, start, end,
-                    dims=dims_us, event_names=video_event_names,
-                    url_dim=url_dimension, url_values=top_values
-                )
-                df_us = df_us.merge(v_us, on=dims_us, how="left") if not df_us.empty else v_us
-
-            if custom_event_names:
-                c_us = _event_counts_by(
-                    ga4_data, property_id, start, end,
-                    dims=dims_us, event_names=custom_event_names,
-                    url_dim=url_dimension, url_values=top_values
-                )
-                df_us = df_us.merge(c_us, on=dims_us, how="left") if not df_us.empty else c_us
-
-            _gspread_write_df(ws_us, df_us)
-        else:
-            _gspread_write_df(ws_us, pd.DataFrame())
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    fetch_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ga4aud")
+    write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ga4aud-ws")
+    try:
+        # tab -> (worksheet, dims, [futures]); la base siempre es la primera parte
+        tabs: Dict[str, Tuple[Any, List[str], List[Any]]] = {}
+
+        def _submit_tab(key: str, ws, dims: List[str], base, extras: List[Any]) -> None:
+            futs = [fetch_pool.submit(tracing.bind(fn)) for fn in [base] + list(extras)]
+            tabs[key] = (ws, dims, futs)
+
+        _submit_tab("country_device", ws_main, dims_1, _q_country_device, _extras(dims_1))
+        _submit_tab("series", ws_series, dims_2, _q_series, _extras(dims_2))
+        f_urls = fetch_pool.submit(tracing.bind(_q_urls))
+
+        writes: List[Any] = []
+        top_values: Optional[List[str]] = None
+        while True:
+            if top_values is None and f_urls.done():
+                df_urls_top = f_urls.result()
+                top_values = df_urls_top[url_dimension].astype(str).tolist() if not df_urls_top.empty else []
+                if top_values:
+                    tabs["urls"] = (ws_urls, dims_u, [f_urls] + [fetch_pool.submit(tracing.bind(fn)) for fn in _extras(dims_u, top_values)])
+                    if include_url_country_device:
+                        _submit_tab("url_country_device", ws_ud, dims_ud,
+                                    lambda: _q_url_country_device(top_values), _extras(dims_ud, top_values))
+                    if include_url_series:
+                        _submit_tab("url_series", ws_us, dims_us,
+                                    lambda: _q_url_series(top_values), _extras(dims_us, top_values))
+                else:
+                    tabs["urls"] = (ws_urls, dims_u, [f_urls])
+                if "url_country_device" not in tabs:
+                    writes.append(write_pool.submit(tracing.bind(_gspread_write_df), ws_ud, pd.DataFrame()))
+                if "url_series" not in tabs:
+                    writes.append(write_pool.submit(tracing.bind(_gspread_write_df), ws_us, pd.DataFrame()))
+
+            # Pestañas completas → merge en este hilo y escritura en segundo plano
+            for key in [k for k, (_, _, futs) in tabs.items() if all(f.done() for f in futs)]:
+                ws, dims, futs = tabs.pop(key)
+                df_tab = _merge_parts(dims, [f.result() for f in futs])
+                writes.append(write_pool.submit(tracing.bind(_gspread_write_df), ws, df_tab))
+
+            if top_values is not None and not tabs:
+                break
+            pending = [f for (_, _, futs) in tabs.values() for f in futs if not f.done()]
+            if top_values is None:
+                pending.append(f_urls)
+            if pending:
+                wait(pending, return_when=FIRST_COMPLETED)
+
+        for w in writes:
+            w.result()
 
         # Meta
         try:
@@ -494,10 +493,16 @@ def run_ga4_audience_report(
             pass
 
     except Exception as e:
+        for fut in [f for (_, _, futs) in tabs.values() for f in futs]:
+            fut.cancel()
         try:
+            write_pool.shutdown(wait=True)
             ws_main.clear()
             ws_main.update([["Error"], [f"❌ Error al consultar/armar GA4: {e}"]])
         except Exception:
             pass
+    finally:
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        write_pool.shutdown(wait=True)
 
     return sid
@@ -4,4 +4,5 @@ from google.analytics.data_v1beta import BetaAnalyticsDataClient
 
 
 def build_data_client(credentials) -> BetaAnalyticsDataClient:
-    return BetaAnalyticsDataClient(credentials=credentials)
\ No newline at end of file
+    from .google_clients import get_ga4_data_client
+    return get_ga4_data_client(credentials)
\ No newline at end of file
@@ -0,0 +1,311 @@
+# modules/google_clients.py
+from __future__ import annotations
+
+"""
+Fábrica de clientes de Google reutilizables entre reruns y entre hilos.
+
+- Documentos de discovery offline (modules/discovery_bundle.py), cacheados en memoria.
+- Un servicio por (api, versión, credencial): no se reconstruye el Resource en cada rerun.
+- Sesiones HTTP autorizadas con keep-alive, una por hilo y por credencial
+  (httplib2.Http no es thread-safe), para que runners en paralelo compartan el servicio.
+- gspread y los clientes GA4 (gRPC, ya thread-safe) también se reutilizan por credencial.
+- Como mucho MAX_CREDENTIALS credenciales con clientes vivos (LRU): al pasarse, o con
+  clear_clients() al cambiar de cuenta/cerrar sesión, se sueltan sus servicios y se cierran
+  sus conexiones en todos los hilos.
+- Cada request (googleapiclient, gspread, GA4 Data) se registra en la traza activa
+  (modules/tracing.py): llamadas, bytes y filas por tipo de API.
+"""
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_LOCK = threading.RLock()
+_LOCAL = threading.local()
+
+_DISCOVERY_DOCS: Dict[Tuple[str, str], str] = {}
+_SERVICES: Dict[Tuple[str, str, str], Any] = {}
+_OTHER_CLIENTS: Dict[Tuple[str, str], Any] = {}
+# Credenciales con clientes cacheados, de la menos a la más reciente
+_RECENT: "OrderedDict[str, None]" = OrderedDict()
+
+HTTP_TIMEOUT_S = 120
+MAX_CREDENTIALS = 16
+
+
+class _HttpPool(dict):
+    """ckey → AuthorizedHttp de un hilo (dict con weakref para poder limpiarlo desde otro hilo)."""
+
+    __hash__ = object.__hash__
+    __eq__ = object.__eq__
+
+
+_HTTP_POOLS: "weakref.WeakSet[_HttpPool]" = weakref.WeakSet()
+
+
+# ========= Identidad de credenciales =========
+
+def credentials_key(creds: Any) -> str:
+    """
+    Huella estable de una credencial OAuth. No usa el access token (cambia al refrescar)
+    sino client_id + refresh_token + scopes, así el mismo usuario reutiliza sus clientes.
+    """
+    parts = [
+        str(getattr(creds, "client_id", "") or ""),
+        str(getattr(creds, "refresh_token", "") or getattr(creds, "token", "") or ""),
+        ",".join(sorted(getattr(creds, "scopes", None) or [])),
+    ]
+    if not any(parts[:2]):
+        # Credencial sin identidad reconocible (p.ej. service account o mock): usar el objeto
+        parts.append(f"id:{id(creds)}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:24]
+
+
+# ========= Discovery =========
+
+def get_discovery_doc(api: str, version: str) -> str:
+    """Devuelve el documento de discovery (JSON string), cacheado en memoria."""
+    key = (api, version)
+    with _LOCK:
+        doc = _DISCOVERY_DOCS.get(key)
+    if doc is not None:
+        return doc
+
+    doc = None
+    try:
+        # Bundle de la app o estáticos de google-api-python-client (el más nuevo)
+        from .discovery_bundle import resolve_discovery_doc
+        doc = resolve_discovery_doc(api, version)
+    except Exception:
+        doc = None
+    if not doc:
+        import httplib2
+        url = f"https://{api}.googleapis.com/$discovery/rest?version={version}"
+        resp, content = httplib2.Http(timeout=HTTP_TIMEOUT_S).request(url, "GET")
+        if int(getattr(resp, "status", 0) or 0) >= 400:
+            raise RuntimeError(f"No pude descargar el discovery de {api} {version} (HTTP {resp.status}).")
+        doc = content.decode("utf-8") if isinstance(content, bytes) else str(content)
+
+    with _LOCK:
+        _DISCOVERY_DOCS[key] = doc
+    return doc
+
+
+# ========= HTTP por hilo =========
+
+def _thread_http(creds: Any, ckey: str):
+    """AuthorizedHttp propio del hilo actual para esa credencial (reutiliza conexiones)."""
+    pool = getattr(_LOCAL, "http", None)
+    if pool is None:
+        pool = _LOCAL.http = _HttpPool()
+        with _LOCK:
+            _HTTP_POOLS.add(pool)
+    http = pool.get(ckey)
+    if http is None:
+        import httplib2
+        import google_auth_httplib2
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT_S))
+        pool[ckey] = http
+    return http
+
+
+# Tipo de etapa (modules/tracing.py) según la API
+_TRACE_KIND = {"searchconsole": "gsc", "webmasters": "gsc", "drive": "drive", "docs": "docs", "sheets": "sheets"}
+_TRACED_REQUEST_CLS: Optional[type] = None
+
+
+def _traced_request_cls() -> type:
+    """HttpRequest cuyo execute() abre un span con llamadas, bytes y filas."""
+    global _TRACED_REQUEST_CLS
+    if _TRACED_REQUEST_CLS is not None:
+        return _TRACED_REQUEST_CLS
+    from googleapiclient.http import HttpRequest
+    from . import tracing
+
+    class _TracedHttpRequest(HttpRequest):
+        trace_kind = "google"
+
+        def execute(self, *args, **kwargs):
+            if tracing.current_span() is None:
+                return super().execute(*args, **kwargs)
+            with tracing.span(self.methodId or "request", self.trace_kind):
+                res = super().execute(*args, **kwargs)
+                rows = res.get("rows") if isinstance(res, dict) else None
+                tracing.add(api_calls=1, rows=len(rows) if isinstance(rows, list) else 0,
+                            bytes=len(self.body or ""))
+                return res
+
+    _TRACED_REQUEST_CLS = _TracedHttpRequest
+    return _TRACED_REQUEST_CLS
+
+
+def _request_builder_for(creds: Any, ckey: str, api: str = "") -> Callable[..., Any]:
+    from . import tracing
+
+    cls = _traced_request_cls()
+    kind = _TRACE_KIND.get(api, api or "google")
+
+    def _builder(_http, postproc, *args, **kwargs):
+        def _postproc(resp, content):
+            tracing.add(bytes=len(content or b""))
+            return postproc(resp, content)
+        # Ignora el http compartido del servicio: cada hilo usa su propia sesión.
+        req = cls(_thread_http(creds, ckey), _postproc, *args, **kwargs)
+        req.trace_kind = kind
+        return req
+
+    return _builder
+
+
+# ========= Servicios =========
+
+def get_service(api: str, version: str, credentials: Any) -> Any:
+    """
+    Servicio googleapiclient reutilizable y seguro entre hilos.
+    Equivale a build(api, version, credentials=credentials).
+    """
+    ckey = credentials_key(credentials)
+    skey = (api, version, ckey)
+    with _LOCK:
+        _touch(ckey)
+        svc = _SERVICES.get(skey)
+        if svc is not None:
+            return svc
+
+        from googleapiclient.discovery import build_from_document
+        svc = build_from_document(
+            get_discovery_doc(api, version),
+            http=_thread_http(credentials, ckey),
+            requestBuilder=_request_builder_for(credentials, ckey, api),
+        )
+        _SERVICES[skey] = svc
+        return svc
+
+
+def _get_or_create(kind: str, credentials: Any, factory: Callable[[], Any]) -> Any:
+    key = (kind, credentials_key(credentials))
+    with _LOCK:
+        _touch(key[1])
+        client = _OTHER_CLIENTS.get(key)
+        if client is None:
+            client = factory()
+            _OTHER_CLIENTS[key] = client
+        return client
+
+
+def _traced_gspread_http_client() -> type:
+    """HTTPClient de gspread que registra cada request de Sheets en la traza activa."""
+    from gspread.http_client import HTTPClient
+    from . import tracing
+
+    class _TracedHTTPClient(HTTPClient):
+        def request(self, method, endpoint, *args, **kwargs):
+            if tracing.current_span() is None:
+                return super().request(method, endpoint, *args, **kwargs)
+            with tracing.span(f"sheets {method.upper()}", "sheets"):
+                resp = super().request(method, endpoint, *args, **kwargs)
+                body = kwargs.get("json") if isinstance(kwargs.get("json"), dict) else {}
+                values = body.get("values")
+                tracing.add(api_calls=1, rows=len(values) if isinstance(values, list) else 0,
+                            bytes=len(getattr(resp, "content", b"") or b""))
+                return resp
+
+    return _TracedHTTPClient
+
+
+def get_gspread_client(credentials: Any) -> Any:
+    import gspread
+
+    def _factory():
+        try:
+            return gspread.authorize(credentials, http_client=_traced_gspread_http_client())
+        except TypeError:
+            # gspread < 6 no acepta http_client
+            return gspread.authorize(credentials)
+
+    return _get_or_create("gspread", credentials, _factory)
+
+
+def _traced_ga4_data_cls() -> type:
+    """BetaAnalyticsDataClient cuyos reportes quedan en la traza activa (kind "ga4")."""
+    from google.analytics.data_v1beta import BetaAnalyticsDataClient
+    from . import tracing
+
+    def _wrap(method: str):
+        def _call(self, *args, **kwargs):
+            if tracing.current_span() is None:
+                return getattr(super(_TracedDataClient, self), method)(*args, **kwargs)
+            with tracing.span(f"ga4 {method}", "ga4"):
+                resp = getattr(super(_TracedDataClient, self), method)(*args, **kwargs)
+                try:
+                    size = type(resp).pb(resp).ByteSize()
+                except Exception:
+                    size = 0
+                tracing.add(api_calls=1, rows=len(getattr(resp, "rows", None) or []), bytes=size)
+                return resp
+        return _call
+
+    class _TracedDataClient(BetaAnalyticsDataClient):
+        run_report = _wrap("run_report")
+        run_pivot_report = _wrap("run_pivot_report")
+        run_realtime_report = _wrap("run_realtime_report")
+
+    return _TracedDataClient
+
+
+def get_ga4_data_client(credentials: Any) -> Any:
+    return _get_or_create("ga4_data", credentials, lambda: _traced_ga4_data_cls()(credentials=credentials))
+
+
+def get_ga4_admin_client(credentials: Any) -> Any:
+    from google.analytics.admin_v1beta import AnalyticsAdminServiceClient
+    return _get_or_create("ga4_admin", credentials, lambda: AnalyticsAdminServiceClient(credentials=credentials))
+
+
+def _close_http(http: Any) -> None:
+    for conn in list(getattr(getattr(http, "http", None), "connections", {}).values()):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _forget_key(ckey: str) -> None:
+    """Suelta servicios, clientes y conexiones HTTP (de todos los hilos) de una credencial. Con _LOCK."""
+    _RECENT.pop(ckey, None)
+    for k in [k for k in _SERVICES if k[2] == ckey]:
+        _SERVICES.pop(k, None)
+    for k in [k for k in _OTHER_CLIENTS if k[1] == ckey]:
+        _OTHER_CLIENTS.pop(k, None)
+    for pool in list(_HTTP_POOLS):
+        http = pool.pop(ckey, None)
+        if http is not None:
+            _close_http(http)
+
+
+def _touch(ckey: str) -> None:
+    """Marca la credencial como recién usada y desaloja las más viejas (LRU). Con _LOCK."""
+    _RECENT[ckey] = None
+    _RECENT.move_to_end(ckey)
+    while len(_RECENT) > MAX_CREDENTIALS:
+        _forget_key(next(iter(_RECENT)))
+
+
+def clear_clients(credentials: Optional[Any] = None) -> None:
+    """
+    Olvida los clientes cacheados (todos, o solo los de una credencial). Acepta el objeto
+    Credentials o el dict que guarda la sesión (token, refresh_token, client_id, scopes…).
+    """
+    with _LOCK:
+        if credentials is None:
+            for ckey in list(_RECENT):
+                _forget_key(ckey)
+            _SERVICES.clear()
+            _OTHER_CLIENTS.clear()
+            return
+        if isinstance(credentials, dict):
+            credentials = SimpleNamespace(**credentials)
+        _forget_key(credentials_key(credentials))
@@ -4,20 +4,23 @@ from __future__ import annotations
 from typing import Iterable, Tuple, Optional
 import pandas as pd
 import streamlit as st
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from .utils import debug_log
+from . import tracing
 
 
 # ========= Cliente SC =========
 
 def ensure_sc_client(creds):
-    return build("searchconsole", "v1", credentials=creds)
+    # Servicio reutilizable por credencial y seguro entre hilos (ver modules/google_clients.py)
+    from .google_clients import get_service
+    return get_service("searchconsole", "v1", creds)
 
 
 # ========= Helpers de consulta =========
 
+@tracing.traced("GSC: consulta paginada", kind="gsc")
 def _fetch_all_rows(service, site_url, body, page_size=25000):
     """Paginación segura con manejo de errores."""
     all_rows, start = [], 0
@@ -45,8 +48,147 @@ def _fetch_all_rows(service, site_url, body, page_size=25000):
     return all_rows
 
 
-def consultar_datos(service, site_url, fecha_inicio, fecha_fin, tipo_dato, pais=None, seccion_filtro=None):
-    """Devuelve métricas por página para el rango dado."""
+# ========= Fetch paralelo por tramos de fecha =========
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def _http_status(err: Exception) -> int:
+    try:
+        return int(getattr(getattr(err, "resp", None), "status", 0) or getattr(err, "status_code", 0) or 0)
+    except Exception:
+        return 0
+
+
+def _query_page(service, site_url, body, start_row=0, page_size=25000, retries=4):
+    """Una página de searchanalytics.query con reintentos (429/5xx). Propaga el error final."""
+    import time
+    page_body = dict(body)
+    page_body["rowLimit"] = page_size
+    if start_row:
+        page_body["startRow"] = start_row
+    for attempt in range(retries + 1):
+        try:
+            resp = service.searchanalytics().query(siteUrl=site_url, body=page_body).execute()
+            return resp.get("rows", []) or []
+        except HttpError as e:
+            if _http_status(e) not in _RETRY_STATUS or attempt >= retries:
+                raise
+            time.sleep(min(30.0, 1.5 * (2 ** attempt)))
+    return []
+
+
+def _fetch_slice_rows(service, site_url, body, page_size=25000, into=None):
+    """
+    Todas las páginas de una consulta (secuencial dentro del tramo; sin tragarse errores).
+    Con `into`, las páginas ya recibidas quedan en esa lista aunque una posterior falle.
+    """
+    rows, start_row = (into if into is not None else []), 0
+    while True:
+        batch = _query_page(service, site_url, body, start_row, page_size)
+        rows.extend(batch)
+        if len(batch) < page_size:
+            return rows
+        start_row += page_size
+
+
+def iter_query_pages(service, site_url, body, max_rows=None, page_size=25000, max_workers=4, stop=None):
+    """
+    Páginas de searchanalytics.query (startRow 0, page_size, 2·page_size…) entregadas EN ORDEN
+    a medida que llegan. La primera va sola (la mayoría de las consultas entra en una página);
+    el resto se pide en paralelo con una ventana deslizante de `max_workers` páginas.
+    Corta cuando una página viene incompleta, al llegar a `max_rows` o cuando `stop(batch)`
+    devuelve True (p.ej. umbrales que, dado el orden, ya no se pueden cumplir).
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    page_size = max(1, min(int(page_size), 25000))
+    limit = int(max_rows) if max_rows else None
+
+    def _fetch(i):
+        size = page_size if limit is None else min(page_size, limit - i * page_size)
+        return _query_page(service, site_url, body, i * page_size, size), size
+
+    def _last(batch, size, sent):
+        # True si después de esta página no hay que pedir más
+        return (len(batch) < size or (limit is not None and sent >= limit)
+                or (stop is not None and bool(batch) and stop(batch)))
+
+    batch, size = _fetch(0)
+    sent = len(batch)
+    if batch:
+        yield batch
+    if _last(batch, size, sent):
+        return
+
+    n_pages = None if limit is None else -(-limit // page_size)
+    workers = max(1, int(max_workers))
+    ex = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gsc-page")
+    fetch = tracing.bind(_fetch)
+    pending, nxt = deque(), 1
+    try:
+        while True:
+            while len(pending) < workers and (n_pages is None or nxt < n_pages):
+                pending.append(ex.submit(fetch, nxt))
+                nxt += 1
+            if not pending:
+                return
+            batch, size = pending.popleft().result()
+            sent += len(batch)
+            if batch:
+                yield batch
+            if _last(batch, size, sent):
+                return
+    finally:
+        # Corte temprano: las páginas en vuelo que sobran no se esperan
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+def date_slices(start_dt, end_dt, slice_days=1):
+    """[(ini, fin)] consecutivos de `slice_days` días que cubren [start_dt, end_dt]."""
+    from datetime import timedelta
+    step = max(1, int(slice_days))
+    out, cur = [], start_dt
+    while cur <= end_dt:
+        hi = min(end_dt, cur + timedelta(days=step - 1))
+        out.append((cur, hi))
+        cur = hi + timedelta(days=1)
+    return out
+
+
+@tracing.traced("GSC: tramos de fecha", kind="gsc")
+def fetch_rows_by_date_slices(service, site_url, body, start_dt, end_dt,
+                              slice_days=1, max_workers=8, page_size=25000):
+    """
+    Parte [start_dt, end_dt] en tramos (día/semana), pagina cada tramo completo y
+    los consulta en paralelo. Devuelve las filas en orden de fecha.
+    A diferencia de _fetch_all_rows, un tramo que falla tras los reintentos levanta la
+    excepción: el reporte no queda incompleto en silencio.
+    `service` debe ser seguro entre hilos (ver modules/google_clients.py).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    slices = date_slices(start_dt, end_dt, slice_days)
+
+    def _one(bounds):
+        lo, hi = bounds
+        b = dict(body)
+        b["startDate"], b["endDate"] = str(lo), str(hi)
+        return _fetch_slice_rows(service, site_url, b, page_size)
+
+    if len(slices) <= 1 or max_workers <= 1:
+        parts = [_one(sl) for sl in slices]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(slices)), thread_name_prefix="gsc-slice") as ex:
+            parts = list(ex.map(tracing.bind(_one), slices))
+    rows = []
+    for part in parts:
+        rows.extend(part)
+    return rows
+
+
+def _consultar_datos_body(fecha_inicio, fecha_fin, tipo_dato, pais=None, seccion_filtro=None):
     seccion_frag = seccion_filtro.strip("/") if seccion_filtro else None
     body = {"startDate": str(fecha_inicio), "endDate": str(fecha_fin), "dimensions": ["page"]}
     body["type"] = "discover" if tipo_dato == "discover" else "web"
@@ -60,8 +202,10 @@ def consultar_datos(service, site_url, fecha_inicio, fecha_fin, tipo_dato, pais=
         filters.append({"dimension": "country", "operator": "equals", "expression": pais})
     if filters:
         body["dimensionFilterGroups"] = [{"filters": filters}]
+    return body
 
-    rows = _fetch_all_rows(service, site_url, body)
+
+def _consultar_datos_frame(rows):
     if not rows:
         return pd.DataFrame(columns=["url", "clicks", "impressions", "ctr", "position"])
     df = pd.DataFrame([
@@ -77,8 +221,13 @@ def consultar_datos(service, site_url, fecha_inicio, fecha_fin, tipo_dato, pais=
     return df
 
 
-def consultar_por_pais(service, site_url, fecha_inicio, fecha_fin, tipo_dato, seccion_filtro=None):
-    """Clicks/Impressions por país en el rango dado (agregado)."""
+def consultar_datos(service, site_url, fecha_inicio, fecha_fin, tipo_dato, pais=None, seccion_filtro=None):
+    """Devuelve métricas por página para el rango dado."""
+    body = _consultar_datos_body(fecha_inicio, fecha_fin, tipo_dato, pais, seccion_filtro)
+    return _consultar_datos_frame(_fetch_all_rows(service, site_url, body))
+
+
+def _por_pais_body(fecha_inicio, fecha_fin, tipo_dato, seccion_filtro=None):
     seccion_frag = seccion_filtro.strip("/") if seccion_filtro else None
     body = {"startDate": str(fecha_inicio), "endDate": str(fecha_fin), "dimensions": ["country"]}
     body["type"] = "discover" if tipo_dato == "discover" else "web"
@@ -90,8 +239,10 @@ def consultar_por_pais(service, site_url, fecha_inicio, fecha_fin, tipo_dato, se
         filters.append({"dimension": "page", "operator": "contains", "expression": f"/{seccion_frag}"})
     if filters:
         body["dimensionFilterGroups"] = [{"filters": filters}]
+    return body
 
-    rows = _fetch_all_rows(service, site_url, body, page_size=250)
+
+def _por_pais_frame(rows):
     if not rows:
         return pd.DataFrame(columns=["country", "clicks", "impressions"])
     df = pd.DataFrame([
@@ -101,6 +252,12 @@ def consultar_por_pais(service, site_url, fecha_inicio, fecha_fin, tipo_dato, se
     return df.groupby("country", as_index=False)[["clicks", "impressions"]].sum().sort_values("clicks", ascending=False)
 
 
+def consultar_por_pais(service, site_url, fecha_inicio, fecha_fin, tipo_dato, seccion_filtro=None):
+    """Clicks/Impressions por país en el rango dado (agregado)."""
+    body = _por_pais_body(fecha_inicio, fecha_fin, tipo_dato, seccion_filtro)
+    return _por_pais_frame(_fetch_all_rows(service, site_url, body, page_size=250))
+
+
 # ========= Evergreen helpers =========
 
 def month_range(start_date, end_date):
@@ -111,8 +268,9 @@ def month_range(start_date, end_date):
         cur = (cur + pd.offsets.MonthBegin(1))
 
 
-def fetch_gsc_monthly_by_page(service, site_url, start_dt, end_dt, country_iso3=None, section_path=None):
-    frames = []
+def _monthly_bodies(start_dt, end_dt, country_iso3=None, section_path=None):
+    """[(primer día del mes, body)] para cada mes de la ventana."""
+    out = []
     for m_start, m_end in month_range(start_dt, end_dt):
         body = {
             "startDate": str(m_start),
@@ -128,7 +286,13 @@ def fetch_gsc_monthly_by_page(service, site_url, start_dt, end_dt, country_iso3=
             filters.append({"dimension": "page", "operator": "contains", "expression": section_path})
         if filters:
             body["dimensionFilterGroups"] = [{"filters": filters}]
-        rows = _fetch_all_rows(service, site_url, body)
+        out.append((m_start, body))
+    return out
+
+
+def _monthly_frame(parts):
+    frames = []
+    for m_start, rows in parts:
         if rows:
             df = pd.DataFrame([
                 {
@@ -143,7 +307,13 @@ def fetch_gsc_monthly_by_page(service, site_url, start_dt, end_dt, country_iso3=
     return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["page", "month", "clicks", "impressions"])
 
 
-def fetch_site_daily_totals(service, site_url, start_dt, end_dt, country_iso3=None, section_path=None):
+def fetch_gsc_monthly_by_page(service, site_url, start_dt, end_dt, country_iso3=None, section_path=None):
+    parts = [(m_start, _fetch_all_rows(service, site_url, body))
+             for m_start, body in _monthly_bodies(start_dt, end_dt, country_iso3, section_path)]
+    return _monthly_frame(parts)
+
+
+def _daily_totals_body(start_dt, end_dt, country_iso3=None, section_path=None):
     body = {"startDate": str(start_dt), "endDate": str(end_dt), "dimensions": ["date"], "type": "web"}
     filters = []
     if country_iso3:
@@ -152,7 +322,10 @@ def fetch_site_daily_totals(service, site_url, start_dt, end_dt, country_iso3=No
         filters.append({"dimension": "page", "operator": "contains", "expression": section_path})
     if filters:
         body["dimensionFilterGroups"] = [{"filters": filters}]
-    rows = _fetch_all_rows(service, site_url, body, page_size=5000)
+    return body
+
+
+def _daily_totals_frame(rows):
     df = pd.DataFrame([
         {"date": pd.to_datetime(r["keys"][0]).date(), "clicks": r.get("clicks", 0), "impressions": r.get("impressions", 0)}
         for r in rows
@@ -162,6 +335,11 @@ def fetch_site_daily_totals(service, site_url, start_dt, end_dt, country_iso3=No
     return df
 
 
+def fetch_site_daily_totals(service, site_url, start_dt, end_dt, country_iso3=None, section_path=None):
+    body = _daily_totals_body(start_dt, end_dt, country_iso3, section_path)
+    return _daily_totals_frame(_fetch_all_rows(service, site_url, body, page_size=5000))
+
+
 def fetch_gsc_daily_evergreen(service, site_url, start_dt, end_dt, country_iso3=None, section_path=None, page_size=25000):
     """Diario por URL (web) para Evergreen (compatibilidad retro)."""
     return fetch_gsc_daily_by_page(service, site_url, start_dt, end_dt, tipo="web",
@@ -170,13 +348,30 @@ def fetch_gsc_daily_evergreen(service, site_url, start_dt, end_dt, country_iso3=
 
 # ========= NUEVO: Diario por URL genérico (web/discover) =========
 
-def fetch_gsc_daily_by_page(service, site_url, start_dt, end_dt, tipo="web", country_iso3=None, section_path=None, page_size=25000):
-    rows_all, start_row = [], 0
+def fetch_gsc_daily_by_page(service, site_url, start_dt, end_dt, tipo="web", country_iso3=None, section_path=None,
+                            page_size=25000, slice_days=31):
+    """
+    Diario por URL. Usa el motor de completitud (modules/gsc_complete.py): primera pasada en
+    tramos de `slice_days` (16 meses ≈ 16 consultas paginadas) y solo los tramos que llegan al
+    tope de filas se parten por fecha y después por dispositivo/país. Un tramo que falla no
+    descarta lo ya bajado (como la paginación histórica). La cobertura estimada queda en
+    df.attrs["coverage"].
+    """
+    from .gsc_complete import fetch_complete
+
+    body = _daily_by_page_body(tipo, country_iso3, section_path)
+    rows, coverage = fetch_complete(service, site_url, body, start_dt, end_dt, slice_days=slice_days,
+                                    page_size=page_size, partial=True)
+    df = _daily_by_page_frame(rows)
+    if coverage is not None:
+        df.attrs["coverage"] = coverage.as_dict()
+        debug_log("Diario por URL", coverage.summary())
+    return df
+
+
+def _daily_by_page_body(tipo="web", country_iso3=None, section_path=None):
     body = {
-        "startDate": str(start_dt),
-        "endDate": str(end_dt),
         "dimensions": ["page", "date"],
-        "rowLimit": page_size,
         "type": "discover" if tipo == "discover" else "web",
         "aggregationType": "auto",
     }
@@ -190,29 +385,18 @@ def fetch_gsc_daily_by_page(service, site_url, start_dt, end_dt, tipo="web", cou
         filters.append({"dimension": "page", "operator": "contains", "expression": section_path})
     if filters:
         body["dimensionFilterGroups"] = [{"filters": filters}]
+    return body
 
-    while True:
-        body["startRow"] = start_row
-        try:
-            resp = service.searchanalytics().query(siteUrl=site_url, body=body).execute()
-        except HttpError as e:
-            debug_log("HttpError diario por URL", str(e))
-            break
-        rows = resp.get("rows", [])
-        if not rows:
-            break
-        for r in rows:
-            rows_all.append({
-                "page": r["keys"][0],
-                "date": pd.to_datetime(r["keys"][1]),
-                "clicks": r.get("clicks", 0),
-                "impressions": r.get("impressions", 0),
-                "ctr": r.get("ctr", 0.0),
-                "position": r.get("position", 0.0),
-            })
-        if len(rows) < page_size:
-            break
-        start_row += page_size
+
+def _daily_by_page_frame(rows):
+    rows_all = [{
+        "page": r["keys"][0],
+        "date": pd.to_datetime(r["keys"][1]),
+        "clicks": r.get("clicks", 0),
+        "impressions": r.get("impressions", 0),
+        "ctr": r.get("ctr", 0.0),
+        "position": r.get("position", 0.0),
+    } for r in rows]
     df = pd.DataFrame(rows_all)
     if not df.empty:
         df["date"] = df["date"].dt.date
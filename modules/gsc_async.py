@@ -0,0 +1,381 @@
+# modules/gsc_async.py
+from __future__ import annotations
+
+"""
+Cliente asíncrono de Search Console (REST sobre aiohttp).
+
+Los clientes de googleapiclient son sincrónicos: para paralelizar hacen falta hilos y cada
+request pasa por httplib2. Acá una sola sesión aiohttp (pool de conexiones + semáforo) permite
+cientos de requests en vuelo dentro de un event loop: sitios × meses × páginas a la vez.
+
+- Tokens: se usan las mismas credenciales OAuth que el resto de la app (token_store /
+  session_state). El refresco se serializa por credencial (lock entre hilos y entre loops) y un
+  401 fuerza un refresco y un reintento. run() devuelve el token nuevo a token_store.
+- Reintentos: 429/5xx con backoff exponencial, igual que modules/gsc.py.
+- Operaciones: las mismas que modules/gsc.py (query, páginas, tramos de fecha, consultar_datos,
+  consultar_por_pais, mensual/diario por URL, totales diarios) con los mismos bodies y DataFrames.
+
+Uso:
+    async def _todo(gsc):
+        return await asyncio.gather(*(gsc.consultar_datos(s, ini, fin, "web") for s in sitios))
+    frames = run(creds, _todo)
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from . import tracing
+from .gsc import (
+    _RETRY_STATUS,
+    _consultar_datos_body,
+    _consultar_datos_frame,
+    _daily_by_page_body,
+    _daily_by_page_frame,
+    _daily_totals_body,
+    _daily_totals_frame,
+    _monthly_bodies,
+    _monthly_frame,
+    _por_pais_body,
+    _por_pais_frame,
+    date_slices,
+)
+from .utils import debug_log
+
+ROOT_URL = "https://searchconsole.googleapis.com/"
+DEFAULT_CONCURRENCY = 200
+TIMEOUT_S = 120
+
+# credentials_key -> lock de refresco (compartido entre loops e hilos del proceso)
+_REFRESH_LOCKS: Dict[str, threading.Lock] = {}
+_REFRESH_LOCKS_GUARD = threading.Lock()
+
+
+class GscHttpError(Exception):
+    """Error HTTP de la API (status_code compatible con gsc._http_status)."""
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(f"HTTP {status_code}: {message}" if message else f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _refresh_lock(creds: Any) -> threading.Lock:
+    from .google_clients import credentials_key
+    key = credentials_key(creds)
+    with _REFRESH_LOCKS_GUARD:
+        lock = _REFRESH_LOCKS.get(key)
+        if lock is None:
+            lock = _REFRESH_LOCKS[key] = threading.Lock()
+        return lock
+
+
+def _refresh_sync(creds: Any, stale: Optional[str]) -> None:
+    """Refresca `creds` salvo que otro hilo ya lo haya hecho (el token ya no es `stale`)."""
+    with _refresh_lock(creds):
+        if getattr(creds, "token", None) and creds.token != stale and getattr(creds, "valid", True):
+            return
+        from google.auth.transport.requests import Request
+        creds.refresh(Request())
+
+
+def credentials_from_store(name: str = "creds_src") -> Any:
+    """Credentials guardadas en token_store (o en session_state si el login fue en esta pestaña)."""
+    from .utils import token_store
+    creds = token_store.as_credentials(name)
+    if creds is None:
+        try:
+            import streamlit as st
+            data = st.session_state.get(name)
+            if data:
+                from google.oauth2.credentials import Credentials
+                creds = Credentials(**data)
+        except Exception:
+            creds = None
+    return creds
+
+
+class _TokenSource:
+    def __init__(self, creds: Any):
+        self._creds = creds
+        self._lock = asyncio.Lock()
+
+    async def token(self, stale: Optional[str] = None) -> str:
+        """Token vigente; con `stale` (el que dio 401) fuerza refresco si nadie lo cambió aún."""
+        c = self._creds
+        if stale is None and getattr(c, "token", None) and getattr(c, "valid", True):
+            return c.token
+        async with self._lock:
+            if getattr(c, "token", None) and c.token != stale and getattr(c, "valid", True):
+                return c.token
+            await asyncio.get_running_loop().run_in_executor(None, _refresh_sync, c, stale)
+            return c.token
+
+
+class AsyncSearchConsole:
+    """
+    Cliente async de Search Console. Usar como `async with AsyncSearchConsole(creds) as gsc:`;
+    la sesión aiohttp se comparte entre todas las consultas del bloque.
+    """
+
+    def __init__(self, credentials: Any, concurrency: int = DEFAULT_CONCURRENCY, retries: int = 4,
+                 root_url: str = ROOT_URL, timeout_s: float = TIMEOUT_S):
+        self.credentials = credentials
+        self._tokens = _TokenSource(credentials)
+        self._concurrency = max(1, int(concurrency))
+        self._retries = retries
+        self._root = root_url.rstrip("/") + "/"
+        self._timeout_s = timeout_s
+        self._session = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+
+    async def __aenter__(self) -> "AsyncSearchConsole":
+        import aiohttp  # type: ignore
+        connector = aiohttp.TCPConnector(limit=self._concurrency, limit_per_host=self._concurrency,
+                                         ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector,
+                                              timeout=aiohttp.ClientTimeout(total=self._timeout_s))
+        self._sem = asyncio.Semaphore(self._concurrency)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # ---------- transporte ----------
+
+    async def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if self._session is None:
+            raise RuntimeError("AsyncSearchConsole se usa dentro de 'async with'.")
+        url = self._root + path
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        token = await self._tokens.token()
+        refreshed = False
+        attempt = 0
+        while True:
+            headers = {"Authorization": f"Bearer {token}"}
+            if payload is not None:
+                headers["Content-Type"] = "application/json"
+            with tracing.span(f"GSC async {method} {path.rsplit('/', 1)[-1]}", "gsc"):
+                async with self._sem:
+                    async with self._session.request(method, url, data=payload, headers=headers) as resp:
+                        status = resp.status
+                        raw = await resp.read()
+                self.calls += 1
+                tracing.add(api_calls=1, bytes=len(raw) + len(payload or b""))
+                if status < 400:
+                    data = json.loads(raw or b"{}")
+                    tracing.add(rows=len(data.get("rows") or []))
+                    return data
+            if status == 401 and not refreshed:
+                # Token vencido o revocado en otro lado: refrescar una vez y reintentar
+                token = await self._tokens.token(stale=token)
+                refreshed = True
+                continue
+            if status in _RETRY_STATUS and attempt < self._retries:
+                await asyncio.sleep(min(30.0, 1.5 * (2 ** attempt)))
+                attempt += 1
+                continue
+            try:
+                message = json.loads(raw).get("error", {}).get("message", "")
+            except Exception:
+                message = raw[:200].decode("utf-8", "replace")
+            raise GscHttpError(status, message)
+
+    # ---------- operaciones básicas ----------
+
+    async def list_sites(self) -> List[Dict[str, Any]]:
+        data = await self._request("GET", "webmasters/v3/sites")
+        return data.get("siteEntry", []) or []
+
+    async def query(self, site_url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        path = f"webmasters/v3/sites/{quote(site_url, safe='')}/searchAnalytics/query"
+        return await self._request("POST", path, body)
+
+    async def query_page(self, site_url: str, body: Dict[str, Any], start_row: int = 0,
+                         page_size: int = 25000) -> List[Dict[str, Any]]:
+        """Una página con reintentos; propaga el error final (como gsc._query_page)."""
+        page_body = dict(body)
+        page_body["rowLimit"] = page_size
+        if start_row:
+            page_body["startRow"] = start_row
+        resp = await self.query(site_url, page_body)
+        return resp.get("rows", []) or []
+
+    async def fetch_slice_rows(self, site_url: str, body: Dict[str, Any], page_size: int = 25000,
+                               window: int = 4, into: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Todas las páginas de una consulta: la primera sola y, si vino llena, de a `window`
+        páginas concurrentes hasta la primera incompleta. Propaga errores; con `into`, las
+        páginas contiguas ya recibidas quedan en esa lista aunque una posterior falle.
+        """
+        rows = into if into is not None else []
+        first = await self.query_page(site_url, body, 0, page_size)
+        rows.extend(first)
+        if len(first) < page_size:
+            return rows
+        start = page_size
+        while True:
+            starts = [start + i * page_size for i in range(max(1, window))]
+            batches = await asyncio.gather(*(self.query_page(site_url, body, s, page_size) for s in starts),
+                                           return_exceptions=True)
+            for batch in batches:
+                if isinstance(batch, BaseException):
+                    raise batch
+                rows.extend(batch)
+                if len(batch) < page_size:
+                    return rows
+            start = starts[-1] + page_size
+
+    async def fetch_all_rows(self, site_url: str, body: Dict[str, Any], page_size: int = 25000) -> List[Dict[str, Any]]:
+        """Como gsc._fetch_all_rows: ante un error devuelve las páginas ya obtenidas y lo registra."""
+        rows: List[Dict[str, Any]] = []
+        try:
+            await self.fetch_slice_rows(site_url, body, page_size, into=rows)
+        except Exception as e:
+            debug_log("Error en Search Console (async)", str(e))
+        return rows
+
+    async def fetch_rows_by_date_slices(self, site_url: str, body: Dict[str, Any], start_dt, end_dt,
+                                        slice_days: int = 1, page_size: int = 25000) -> List[Dict[str, Any]]:
+        """Todos los tramos de fecha en vuelo a la vez; filas en orden de fecha. Propaga errores."""
+        async def _one(lo, hi):
+            b = dict(body)
+            b["startDate"], b["endDate"] = str(lo), str(hi)
+            return await self.fetch_slice_rows(site_url, b, page_size)
+
+        parts = await asyncio.gather(*(_one(lo, hi) for lo, hi in date_slices(start_dt, end_dt, slice_days)))
+        return [r for part in parts for r in part]
+
+    # ---------- operaciones de modules/gsc.py ----------
+
+    async def consultar_datos(self, site_url, fecha_inicio, fecha_fin, tipo_dato, pais=None, seccion_filtro=None):
+        body = _consultar_datos_body(fecha_inicio, fecha_fin, tipo_dato, pais, seccion_filtro)
+        return _consultar_datos_frame(await self.fetch_all_rows(site_url, body))
+
+    async def consultar_por_pais(self, site_url, fecha_inicio, fecha_fin, tipo_dato, seccion_filtro=None):
+        body = _por_pais_body(fecha_inicio, fecha_fin, tipo_dato, seccion_filtro)
+        return _por_pais_frame(await self.fetch_all_rows(site_url, body, page_size=250))
+
+    async def fetch_gsc_monthly_by_page(self, site_url, start_dt, end_dt, country_iso3=None, section_path=None):
+        bodies = _monthly_bodies(start_dt, end_dt, country_iso3, section_path)
+        rows = await asyncio.gather(*(self.fetch_all_rows(site_url, b) for _, b in bodies))
+        return _monthly_frame([(m_start, r) for (m_start, _), r in zip(bodies, rows)])
+
+    async def fetch_site_daily_totals(self, site_url, start_dt, end_dt, country_iso3=None, section_path=None):
+        body = _daily_totals_body(start_dt, end_dt, country_iso3, section_path)
+        return _daily_totals_frame(await self.fetch_all_rows(site_url, body, page_size=5000))
+
+    async def fetch_gsc_daily_by_page(self, site_url, start_dt, end_dt, tipo="web", country_iso3=None,
+                                      section_path=None, page_size=25000, slice_days=31):
+        """
+        Diario por URL como gsc.fetch_gsc_daily_by_page: primera pasada en tramos de `slice_days`,
+        todos en vuelo, y solo los tramos que llegan al tope de filas se parten por fecha hasta
+        llegar a un día. Un tramo que falla se registra y se conservan sus páginas ya recibidas y
+        el resto de los tramos. En df.attrs: "saturated_days" (días que siguen en el tope; el
+        partido por dispositivo/país es del motor sincrónico, modules/gsc_complete.py) y
+        "failed_slices".
+        """
+        from datetime import timedelta
+
+        from .gsc_complete import ROW_CAP
+
+        body = _daily_by_page_body(tipo, country_iso3, section_path)
+        saturated: List[str] = []
+        failed: List[str] = []
+
+        async def _one(lo, hi) -> List[List[Dict[str, Any]]]:
+            b = dict(body)
+            b["startDate"], b["endDate"] = str(lo), str(hi)
+            rows: List[Dict[str, Any]] = []
+            try:
+                await self.fetch_slice_rows(site_url, b, page_size, into=rows)
+            except Exception as e:
+                debug_log("Error diario por URL (async)", {"desde": str(lo), "hasta": str(hi),
+                                                          "filas": len(rows), "error": str(e)})
+                failed.append(f"{lo}..{hi}")
+                return [rows]
+            if len(rows) < ROW_CAP:
+                return [rows]
+            if hi <= lo:
+                saturated.append(str(lo))
+                return [rows]
+            # Tramo en el tope: se parte por fecha y se vuelve a pedir
+            mid = lo + timedelta(days=(hi - lo).days // 2)
+            return await _gather(((lo, mid), (mid + timedelta(days=1), hi)))
+
+        async def _gather(slices) -> List[List[Dict[str, Any]]]:
+            out: List[List[Dict[str, Any]]] = []
+            results = await asyncio.gather(*(_one(lo, hi) for lo, hi in slices), return_exceptions=True)
+            for (lo, hi), res in zip(slices, results):
+                if isinstance(res, BaseException):
+                    debug_log("Error diario por URL (async)", {"desde": str(lo), "hasta": str(hi), "error": str(res)})
+                    failed.append(f"{lo}..{hi}")
+                    continue
+                out.extend(res)
+            return out
+
+        parts = await _gather(list(date_slices(start_dt, end_dt, slice_days)))
+        df = _daily_by_page_frame([r for part in parts for r in part])
+        df.attrs["saturated_days"] = sorted(saturated)
+        df.attrs["failed_slices"] = sorted(failed)
+        return df
+
+
+def _run_coro(coro):
+    """asyncio.run, o un loop propio en otro hilo si ya hay uno corriendo en este."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    out: Dict[str, Any] = {}
+
+    def _target():
+        try:
+            out["value"] = asyncio.run(coro)
+        except BaseException as e:  # se re-lanza en el hilo que llamó
+            out["error"] = e
+
+    t = threading.Thread(target=_target, name="gsc-async")
+    t.start()
+    t.join()
+    if "error" in out:
+        raise out["error"]
+    return out.get("value")
+
+
+def run(credentials: Any, fn: Callable[[AsyncSearchConsole], Awaitable[Any]],
+        concurrency: int = DEFAULT_CONCURRENCY, store_name: Optional[str] = None, **kwargs: Any) -> Any:
+    """
+    Corre `fn(gsc)` en un event loop con un AsyncSearchConsole abierto y devuelve su resultado.
+    Si el token se refrescó y `store_name` está dado, se guarda en token_store.
+    """
+    before = getattr(credentials, "token", None)
+
+    async def _main():
+        async with AsyncSearchConsole(credentials, concurrency=concurrency, **kwargs) as gsc:
+            return await fn(gsc)
+
+    try:
+        return _run_coro(_main())
+    finally:
+        if store_name and getattr(credentials, "token", None) != before:
+            try:
+                from .utils import token_store
+                data = dict(token_store.load(store_name) or {})
+                if data:
+                    data["token"] = credentials.token
+                    token_store.save(store_name, data)
+            except Exception as e:
+                debug_log("No pude guardar el token refrescado", str(e))
+
+
+def fetch_many(credentials: Any, queries: Sequence[Tuple[str, Dict[str, Any]]],
+               concurrency: int = DEFAULT_CONCURRENCY, **kwargs: Any) -> List[List[Dict[str, Any]]]:
+    """Filas de varias consultas (site_url, body) a la vez, en el mismo orden. Propaga errores."""
+    async def _all(gsc: AsyncSearchConsole):
+        return await asyncio.gather(*(gsc.fetch_slice_rows(s, b) for s, b in queries))
+    return run(credentials, _all, concurrency=concurrency, **kwargs)
@@ -0,0 +1,259 @@
+# modules/gsc_complete.py
+from __future__ import annotations
+
+"""
+Motor de completitud para consultas grandes de Search Console.
+
+La API devuelve como máximo ~50.000 filas por consulta (por día y tipo de búsqueda): en
+medios grandes, page×date pierde el long tail sin avisar. Acá cada tramo se consulta
+completo y, si vuelve con el tope de filas (saturado), se parte y se vuelve a pedir:
+
+  1) por fecha (bisección hasta llegar a un día),
+  2) por dispositivo (DESKTOP / MOBILE / TABLET; solo Search),
+  3) por país (los N países con más clics + un resto con notEquals de todos ellos).
+
+Cada nivel se pide en paralelo y los resultados se fusionan por `keys` (sumando clics e
+impresiones, CTR recalculado y posición ponderada por impresiones). La cobertura estimada
+compara los clics/impresiones obtenidos con el total del sitio para la misma ventana y filtros.
+"""
+
+import threading
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import tracing
+from .gsc import _fetch_slice_rows, date_slices
+from .gsc_filters import with_filters
+from .utils import debug_log
+
+# Filas que la API entrega como máximo para una consulta (paginando)
+ROW_CAP = 50000
+DEVICES = ("DESKTOP", "MOBILE", "TABLET")
+TOP_COUNTRIES = 8
+
+
+class Coverage:
+    """Resumen de una consulta completa: particiones, cortes y cobertura estimada."""
+
+    def __init__(self):
+        self.queries = 0
+        self.saturated = 0           # tramos que siguen en el tope y ya no se pueden partir
+        self.failed = 0              # tramos con error (partial=True): quedan las filas ya bajadas
+        self.splits = {"date": 0, "device": 0, "country": 0}
+        self.rows = 0
+        self.clicks = 0
+        self.impressions = 0
+        self.total_clicks: Optional[int] = None
+        self.total_impressions: Optional[int] = None
+
+    @staticmethod
+    def _pct(part: int, total: Optional[int]) -> Optional[float]:
+        if not total:
+            return None
+        return round(min(100.0, 100.0 * part / total), 2)
+
+    @property
+    def clicks_pct(self) -> Optional[float]:
+        return self._pct(self.clicks, self.total_clicks)
+
+    @property
+    def impressions_pct(self) -> Optional[float]:
+        return self._pct(self.impressions, self.total_impressions)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries, "saturated": self.saturated, "failed": self.failed,
+            "splits": dict(self.splits),
+            "rows": self.rows, "clicks": self.clicks, "impressions": self.impressions,
+            "total_clicks": self.total_clicks, "total_impressions": self.total_impressions,
+            "clicks_pct": self.clicks_pct, "impressions_pct": self.impressions_pct,
+        }
+
+    def summary(self) -> str:
+        parts = []
+        if self.clicks_pct is not None:
+            parts.append(f"{self.clicks_pct}% de clics")
+        if self.impressions_pct is not None:
+            parts.append(f"{self.impressions_pct}% de impresiones")
+        txt = "Cobertura estimada: " + (", ".join(parts) if parts else "sin total de referencia")
+        txt += f" ({self.rows:,} filas, {self.queries} consultas"
+        if self.saturated:
+            txt += f", {self.saturated} tramo(s) aún en el tope"
+        if self.failed:
+            txt += f", {self.failed} tramo(s) con error"
+        return txt + ")"
+
+
+class _Part:
+    __slots__ = ("lo", "hi", "filters", "split")
+
+    def __init__(self, lo, hi, filters: Tuple[Dict[str, str], ...] = (), split: Tuple[str, ...] = ()):
+        self.lo, self.hi, self.filters, self.split = lo, hi, filters, split
+
+
+def _has_equals_filter(body: Dict[str, Any], dimension: str) -> bool:
+    for g in body.get("dimensionFilterGroups") or []:
+        for f in g.get("filters") or []:
+            if f.get("dimension") == dimension and f.get("operator", "equals") == "equals":
+                return True
+    return False
+
+
+def _part_body(base: Dict[str, Any], part: _Part) -> Dict[str, Any]:
+    b = with_filters(base, part.filters)
+    b["startDate"], b["endDate"] = str(part.lo), str(part.hi)
+    return b
+
+
+def _merge(chunks: List[List[Dict[str, Any]]], disjoint: bool) -> List[Dict[str, Any]]:
+    if disjoint:
+        return [r for rows in chunks for r in rows]
+    acc: Dict[tuple, List[float]] = {}
+    order: List[tuple] = []
+    for rows in chunks:
+        for r in rows:
+            k = tuple(r.get("keys") or ())
+            a = acc.get(k)
+            if a is None:
+                a = acc[k] = [0.0, 0.0, 0.0]
+                order.append(k)
+            impr = float(r.get("impressions", 0) or 0)
+            a[0] += float(r.get("clicks", 0) or 0)
+            a[1] += impr
+            a[2] += float(r.get("position", 0) or 0) * impr
+    out = []
+    for k in order:
+        clicks, impr, pos_w = acc[k]
+        out.append({
+            "keys": list(k),
+            "clicks": int(clicks) if clicks.is_integer() else clicks,
+            "impressions": int(impr) if impr.is_integer() else impr,
+            "ctr": (clicks / impr) if impr else 0.0,
+            "position": (pos_w / impr) if impr else 0.0,
+        })
+    return out
+
+
+def _site_totals(service, site_url, base: Dict[str, Any], start_dt, end_dt, page_size: int) -> Tuple[int, int]:
+    """Clics/impresiones del sitio para la ventana y filtros (agregado por página, comparable)."""
+    b = dict(base)
+    b["dimensions"] = ["date"]
+    b["aggregationType"] = "byPage"
+    b["startDate"], b["endDate"] = str(start_dt), str(end_dt)
+    rows = _fetch_slice_rows(service, site_url, b, page_size)
+    return (sum(int(r.get("clicks", 0) or 0) for r in rows),
+            sum(int(r.get("impressions", 0) or 0) for r in rows))
+
+
+def fetch_complete(service, site_url, body, start_dt, end_dt, cap=ROW_CAP, slice_days=1,
+                   max_workers=8, top_countries=TOP_COUNTRIES, page_size=25000,
+                   with_coverage=True, partial=False) -> Tuple[List[Dict[str, Any]], Coverage]:
+    """
+    Filas de `body` para [start_dt, end_dt] partiendo los tramos saturados (ver docstring del
+    módulo). Devuelve (filas, Coverage). Un tramo que falla tras los reintentos levanta la
+    excepción, igual que fetch_rows_by_date_slices; con `partial=True` se registra, se
+    conservan las páginas ya recibidas de ese tramo y se sigue con el resto (Coverage.failed).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    base = {k: v for k, v in dict(body).items() if k not in ("startRow", "rowLimit", "startDate", "endDate")}
+    can_device = str(base.get("type", "web")) == "web" and not _has_equals_filter(base, "device")
+    can_country = not _has_equals_filter(base, "country")
+    cov = Coverage()
+    lock = threading.Lock()
+
+    failed: set = set()
+
+    def _fetch(part: _Part) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        try:
+            _fetch_slice_rows(service, site_url, _part_body(base, part), page_size, into=rows)
+        except Exception as e:
+            if not partial:
+                raise
+            debug_log("Consulta completa GSC: tramo con error", {"desde": str(part.lo), "hasta": str(part.hi),
+                                                                 "filas": len(rows), "error": str(e)})
+            with lock:
+                cov.failed += 1
+                failed.add(id(part))
+        return rows
+
+    def _split(part: _Part) -> Optional[Tuple[str, List[_Part]]]:
+        if part.hi > part.lo:
+            mid = part.lo + timedelta(days=(part.hi - part.lo).days // 2)
+            return "date", [_Part(part.lo, mid, part.filters, part.split),
+                            _Part(mid + timedelta(days=1), part.hi, part.filters, part.split)]
+        if can_device and "device" not in part.split:
+            return "device", [_Part(part.lo, part.hi, part.filters + ({"dimension": "device", "operator": "equals", "expression": d},),
+                                    part.split + ("device",)) for d in DEVICES]
+        if can_country and "country" not in part.split:
+            b = _part_body(base, part)
+            b["dimensions"] = ["country"]
+            with lock:
+                cov.queries += 1
+            rows = _fetch_slice_rows(service, site_url, b, 250)
+            rows.sort(key=lambda r: r.get("clicks", 0), reverse=True)
+            top = [r["keys"][0] for r in rows[:top_countries] if r.get("keys")]
+            if len(top) < 2:
+                return None
+            children = [_Part(part.lo, part.hi, part.filters + ({"dimension": "country", "operator": "equals", "expression": c},),
+                              part.split + ("country",)) for c in top]
+            rest = tuple({"dimension": "country", "operator": "notEquals", "expression": c} for c in top)
+            children.append(_Part(part.lo, part.hi, part.filters + rest, part.split + ("country",)))
+            return "country", children
+        return None
+
+    def _split_safe(part: _Part) -> Optional[Tuple[str, List[_Part]]]:
+        try:
+            return _split(part)
+        except Exception as e:
+            if not partial:
+                raise
+            # La consulta de países falló: el tramo queda como vino (en el tope)
+            debug_log("Consulta completa GSC: no pude partir el tramo", str(e))
+            return None
+
+    done: List[Tuple[Any, List[Dict[str, Any]]]] = []
+    level = [_Part(lo, hi) for lo, hi in date_slices(start_dt, end_dt, slice_days)]
+    with tracing.span("GSC: consulta completa", "gsc"), \
+            ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="gsc-complete") as ex:
+        while level:
+            fetched = list(ex.map(tracing.bind(_fetch), level))
+            with lock:
+                cov.queries += len(level)
+            full = []
+            for part, rows in zip(level, fetched):
+                if len(rows) >= cap and id(part) not in failed:
+                    full.append((part, rows))
+                else:
+                    done.append((part.lo, rows))
+            level = []
+            if not full:
+                break
+            for (part, rows), res in zip(full, ex.map(tracing.bind(_split_safe), [p for p, _ in full])):
+                if res is None:
+                    # No se puede partir más: queda lo que vino (en el tope)
+                    cov.saturated += 1
+                    done.append((part.lo, rows))
+                    continue
+                kind, children = res
+                cov.splits[kind] += 1
+                level.extend(children)
+        debug_log("Consulta completa GSC", {"splits": cov.splits, "saturated": cov.saturated})
+
+    done.sort(key=lambda t: t[0])
+    # Los tramos de fecha solo son disjuntos si "date" es dimensión: sin ella (p.ej. ["page"]) la
+    # misma clave vuelve en cada tramo y hay que sumarla
+    has_date = "date" in (base.get("dimensions") or [])
+    rows = _merge([r for _, r in done],
+                  disjoint=has_date and not (cov.splits["device"] or cov.splits["country"]))
+    cov.rows = len(rows)
+    cov.clicks = int(sum(r.get("clicks", 0) or 0 for r in rows))
+    cov.impressions = int(sum(r.get("impressions", 0) or 0 for r in rows))
+    if with_coverage:
+        try:
+            cov.total_clicks, cov.total_impressions = _site_totals(service, site_url, base, start_dt, end_dt, page_size)
+            cov.queries += 1
+        except Exception as e:
+            debug_log("Cobertura GSC: no pude obtener totales", str(e))
+    return rows, cov
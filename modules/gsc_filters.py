@@ -0,0 +1,144 @@
+# modules/gsc_filters.py
+from __future__ import annotations
+
+"""
+Compilador de filtros de URL a dimensionFilterGroups de Search Console.
+
+Reglas que antes se aplicaban después de bajar todas las filas (secciones/subsecciones
+incluir-excluir, "solo artículos") se traducen a filtros `page` con includingRegex /
+excludingRegex (RE2), así la API devuelve solo candidatas y el rowLimit rinde en notas reales.
+Los filtros del cliente se mantienen como red de seguridad: el resultado es el mismo.
+
+- section_filters(payload): {"sections": {"mode", "paths"}, "subsections": {...}} → filtros.
+- article_filters(drop_patterns, extensions, min_slashes): equivalente a _is_article_url.
+- countries_filter(countries): un filtro country para "alguno de estos países" (ISO-3).
+- with_filters(body, filters): agrega los filtros al primer grupo "and" del body.
+- FilteredSearchConsole: envuelve el servicio y los inyecta en las consultas con dimensión page
+  (para runners externos que filtran en el cliente).
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+# Límite de la API para expresiones regex
+MAX_REGEX_LEN = 4096
+
+
+def _alternation(parts: Iterable[str]) -> str:
+    esc = [re.escape(p) for p in parts if p]
+    return esc[0] if len(esc) == 1 else "(?:" + "|".join(esc) + ")"
+
+
+def _page_filter(operator: str, expression: str) -> Dict[str, str]:
+    if len(expression) > MAX_REGEX_LEN:
+        raise ValueError(f"Expresión de filtro demasiado larga para Search Console ({len(expression)} caracteres).")
+    return {"dimension": "page", "operator": operator, "expression": expression}
+
+
+def paths_filter(mode: str, paths: Iterable[str]) -> Optional[Dict[str, str]]:
+    """Un filtro page para "la URL contiene alguno de `paths`" (include) o "ninguno" (exclude)."""
+    paths = [str(p).strip() for p in (paths or []) if str(p).strip()]
+    if not paths:
+        return None
+    if len(paths) == 1:
+        # Un solo path: contains/notContains, igual que los runners
+        return _page_filter("contains" if mode == "include" else "notContains", paths[0])
+    rx = _alternation(paths)
+    return _page_filter("includingRegex" if mode == "include" else "excludingRegex", rx)
+
+
+def section_filters(payload: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Filtros de secciones + subsecciones (formato de app_params._build_advanced_filters_payload)."""
+    out: List[Dict[str, str]] = []
+    if not isinstance(payload, dict):
+        return out
+    for key in ("sections", "subsections"):
+        rule = payload.get(key)
+        if not isinstance(rule, dict):
+            continue
+        mode = "exclude" if str(rule.get("mode", "")).lower() == "exclude" else "include"
+        f = paths_filter(mode, rule.get("paths") or [])
+        if f:
+            out.append(f)
+    return out
+
+
+def article_filters(drop_patterns: Iterable[str] = (), extensions: Iterable[str] = (),
+                    min_slashes: int = 0) -> List[Dict[str, str]]:
+    """
+    Filtros "solo artículos" (sin distinguir mayúsculas, como el filtro del cliente):
+    - excludingRegex: contiene algún patrón de `drop_patterns` o termina en alguna extensión.
+    - includingRegex: al menos `min_slashes` barras (descarta home y portadas de sección).
+    """
+    excl = []
+    drops = [p for p in drop_patterns if p]
+    if drops:
+        excl.append(_alternation(drops))
+    exts = [e.lstrip(".") for e in extensions if e]
+    if exts:
+        excl.append(r"\." + _alternation(exts) + "$")
+    out: List[Dict[str, str]] = []
+    if excl:
+        out.append(_page_filter("excludingRegex", "(?i)" + (excl[0] if len(excl) == 1 else "(?:" + "|".join(excl) + ")")))
+    if min_slashes > 0:
+        out.append(_page_filter("includingRegex", "^(?:[^/]*/){%d}" % int(min_slashes)))
+    return out
+
+
+def countries_filter(countries: Iterable[str]) -> Optional[Dict[str, str]]:
+    """Filtro country para varios países en una sola consulta (equals si es uno solo)."""
+    codes = sorted({str(c).strip().lower() for c in (countries or []) if str(c).strip()})
+    if not codes:
+        return None
+    if len(codes) == 1:
+        return {"dimension": "country", "operator": "equals", "expression": codes[0]}
+    return {"dimension": "country", "operator": "includingRegex",
+            "expression": "^(?:" + "|".join(re.escape(c) for c in codes) + ")$"}
+
+
+def with_filters(body: Dict[str, Any], filters: Iterable[Dict[str, str]]) -> Dict[str, Any]:
+    """Copia de `body` con `filters` agregados al primer grupo "and" (o a uno nuevo)."""
+    filters = [dict(f) for f in filters if f]
+    if not filters:
+        return body
+    out = dict(body)
+    groups = [dict(g) for g in (out.get("dimensionFilterGroups") or [])]
+    if groups and str(groups[0].get("groupType", "and")).lower() == "and":
+        existing = list(groups[0].get("filters") or [])
+        groups[0]["filters"] = existing + [f for f in filters if f not in existing]
+    else:
+        groups.insert(0, {"groupType": "and", "filters": filters})
+    out["dimensionFilterGroups"] = groups
+    return out
+
+
+# ========= Servicio con filtros inyectados =========
+
+class _FilteredSearchAnalytics:
+    def __init__(self, inner: Any, filters: List[Dict[str, str]]):
+        self._inner = inner
+        self._filters = filters
+
+    def query(self, siteUrl=None, body=None, **kwargs):
+        body = dict(body or {})
+        # Solo consultas por página: en totales (date, country…) cambiaría el número del sitio
+        if "page" in (body.get("dimensions") or []):
+            body = with_filters(body, self._filters)
+        return self._inner.query(siteUrl=siteUrl, body=body, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class FilteredSearchConsole:
+    """Proxy de un servicio searchconsole que empuja `filters` a cada consulta con dimensión page."""
+
+    def __init__(self, service: Any, filters: Iterable[Dict[str, str]]):
+        self._service = service
+        self._filters = [dict(f) for f in filters if f]
+
+    def searchanalytics(self):
+        return _FilteredSearchAnalytics(self._service.searchanalytics(), self._filters)
+
+    def __getattr__(self, name):
+        return getattr(self._service, name)
@@ -0,0 +1,380 @@
+# modules/gsc_periods.py
+from __future__ import annotations
+
+"""
+Planificador multi-período para Search Console: bajar una vez, cortar localmente.
+
+Core Update (pre/post), Auditoría ("períodos previos") y Reporte de resultados piden
+totales del sitio para ventanas que se solapan. Acá, por (sitio, tipo, filtros, dimensiones)
+se baja la serie diaria (`date` + dimensiones chicas como country/device) una sola vez y
+cada período se deriva con máscaras de fecha vectorizadas:
+
+- clics e impresiones se suman,
+- CTR = clics / impresiones (no el promedio de CTRs),
+- posición ponderada por impresiones.
+
+- PeriodPlanner.daily(...): filas diarias de una ventana (solo se piden los días que faltan).
+- PeriodPlanner.slices(...): totales por período (la unión se pide de una vez).
+- aggregate_periods(df, periods, by): la agregación, usable sobre cualquier DataFrame diario.
+- PlannedSearchConsole: proxy del servicio que responde desde el planificador las consultas
+  sin `page`/`query` (así los runners externos reutilizan lo ya bajado sin cambios).
+
+Abanico por país: una consulta con `country equals X` no baja su propia serie sino la de
+date×country (acotada con includingRegex a los países del reporte) y se filtra localmente.
+Con N países se pasa de N+1 consultas (Global + una por país) a 2. Solo se usa cuando la
+ejecución informa sus países: sin ellos la serie date×country traería todos los países.
+"""
+
+import json
+import threading
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import tracing
+from .gsc import fetch_rows_by_date_slices
+from .gsc_filters import countries_filter
+from .utils import debug_log
+
+# Dimensiones que el planificador acepta además de `date` (cardinalidad baja por día)
+PLANNABLE_DIMS = ("country", "device")
+
+
+def _as_date(d) -> date:
+    if isinstance(d, date):
+        return d
+    s = str(d).strip()
+    return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+
+
+def _norm_periods(periods: Iterable[Any]) -> List[Tuple[str, date, date]]:
+    """Acepta (label, ini, fin) o {"label", "start", "end"}; ini/fin como date o 'YYYY-MM-DD'."""
+    out = []
+    for i, p in enumerate(periods or []):
+        if isinstance(p, dict):
+            label, lo, hi = p.get("label") or f"P{i + 1}", p.get("start"), p.get("end")
+        else:
+            label, lo, hi = p
+        lo, hi = _as_date(lo), _as_date(hi)
+        if hi < lo:
+            lo, hi = hi, lo
+        out.append((str(label), lo, hi))
+    return out
+
+
+def union_window(periods: Iterable[Any]) -> Optional[Tuple[date, date]]:
+    """(primer día, último día) que cubre todos los períodos."""
+    ps = _norm_periods(periods)
+    if not ps:
+        return None
+    return min(p[1] for p in ps), max(p[2] for p in ps)
+
+
+def _empty_daily(dims: Sequence[str]) -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype="object") for c in ["date", *dims]}
+                        | {"clicks": pd.Series(dtype="float"), "impressions": pd.Series(dtype="float"),
+                           "position": pd.Series(dtype="float")})
+
+
+def rows_to_frame(rows: List[Dict[str, Any]], dims: Sequence[str]) -> pd.DataFrame:
+    """Filas de la API (keys = ["date", *dims]) → DataFrame con columnas date, dims y métricas."""
+    if not rows:
+        return _empty_daily(dims)
+    cols = ["date", *dims]
+    keys = [list(r.get("keys") or []) + [""] * len(cols) for r in rows]
+    df = pd.DataFrame([k[:len(cols)] for k in keys], columns=cols)
+    df["clicks"] = np.fromiter((float(r.get("clicks", 0) or 0) for r in rows), float, len(rows))
+    df["impressions"] = np.fromiter((float(r.get("impressions", 0) or 0) for r in rows), float, len(rows))
+    df["position"] = np.fromiter((float(r.get("position", 0) or 0) for r in rows), float, len(rows))
+    return df
+
+
+def aggregate_periods(df: pd.DataFrame, periods: Iterable[Any], by: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    Totales por período (y por `by`) de un DataFrame diario con columnas date, clicks,
+    impressions, position. Devuelve period, start, end, [by], clicks, impressions, ctr, position.
+    """
+    ps = _norm_periods(periods)
+    by = [c for c in by if c]
+    cols = ["period", "start", "end", *by, "clicks", "impressions", "ctr", "position"]
+    if not ps:
+        return pd.DataFrame(columns=cols)
+    if df is None or df.empty:
+        df = _empty_daily(by)
+
+    d = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[D]")
+    starts = np.array([p[1] for p in ps], dtype="datetime64[D]")
+    ends = np.array([p[2] for p in ps], dtype="datetime64[D]")
+    # filas × períodos
+    mask = (d[:, None] >= starts[None, :]) & (d[:, None] <= ends[None, :])
+
+    clicks = df["clicks"].to_numpy(dtype=float)
+    impr = df["impressions"].to_numpy(dtype=float)
+    pos_w = df["position"].to_numpy(dtype=float) * impr
+    vals = np.column_stack([clicks, impr, pos_w]) if len(df) else np.zeros((0, 3))
+
+    if not by:
+        sums = mask.T.astype(float) @ vals                      # períodos × 3
+        out = pd.DataFrame(sums, columns=["clicks", "impressions", "pos_w"])
+        out.insert(0, "period", [p[0] for p in ps])
+        out.insert(1, "start", [str(p[1]) for p in ps])
+        out.insert(2, "end", [str(p[2]) for p in ps])
+    else:
+        codes, uniques = pd.MultiIndex.from_frame(df[by].astype(str)).factorize() if len(df) else (np.zeros(0, int), None)
+        n_groups = len(uniques) if uniques is not None else 0
+        parts = []
+        for j, (label, lo, hi) in enumerate(ps):
+            m = mask[:, j]
+            sums = [np.bincount(codes, weights=vals[:, k] * m, minlength=n_groups) for k in range(3)]
+            present = np.bincount(codes, weights=m.astype(float), minlength=n_groups) > 0
+            part = pd.DataFrame(list(uniques[present]) if n_groups else [], columns=by)
+            part["clicks"], part["impressions"], part["pos_w"] = (s[present] for s in sums)
+            part.insert(0, "period", label)
+            part.insert(1, "start", str(lo))
+            part.insert(2, "end", str(hi))
+            parts.append(part)
+        out = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=cols + ["pos_w"])
+
+    imp = out["impressions"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["ctr"] = np.where(imp > 0, out["clicks"].to_numpy(dtype=float) / imp, 0.0)
+        out["position"] = np.where(imp > 0, out["pos_w"].to_numpy(dtype=float) / imp, 0.0)
+    return out[cols]
+
+
+def _missing_ranges(covered: set, lo: date, hi: date) -> List[Tuple[date, date]]:
+    """Tramos contiguos de [lo, hi] cuyos días no están en `covered` (ordinales)."""
+    out: List[Tuple[date, date]] = []
+    cur = None
+    for o in range(lo.toordinal(), hi.toordinal() + 1):
+        if o in covered:
+            if cur is not None:
+                out.append((date.fromordinal(cur), date.fromordinal(o - 1)))
+                cur = None
+        elif cur is None:
+            cur = o
+    if cur is not None:
+        out.append((date.fromordinal(cur), hi))
+    return out
+
+
+def _country_fanout(groups: List[Dict[str, Any]]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+    """(país, grupos sin ese filtro) si los filtros piden exactamente un país con equals."""
+    if len(groups) != 1 or str(groups[0].get("groupType", "and")).lower() != "and":
+        return None
+    filters = list(groups[0].get("filters") or [])
+    country = [f for f in filters if f.get("dimension") == "country"]
+    if len(country) != 1 or country[0].get("operator", "equals") != "equals":
+        return None
+    rest = [f for f in filters if f.get("dimension") != "country"]
+    code = str(country[0].get("expression", "")).strip().lower()
+    if not code:
+        return None
+    return code, ([dict(groups[0], filters=rest)] if rest else [])
+
+
+def _filters_key(filters: Any) -> str:
+    return json.dumps(filters or [], sort_keys=True, ensure_ascii=False)
+
+
+class _Series:
+    __slots__ = ("frame", "covered", "lock")
+
+    def __init__(self, dims: Sequence[str]):
+        self.frame = _empty_daily(dims)
+        self.covered: set = set()
+        self.lock = threading.Lock()
+
+
+class PeriodPlanner:
+    """
+    Serie diaria cacheada por (sitio, tipo, dataState, filtros, dimensiones). Vive lo que dura
+    una ejecución (el proxy crea uno por runner): no se comparte entre usuarios ni reruns.
+    """
+
+    def __init__(self, service: Any, slice_days: int = 31, max_workers: int = 4,
+                 countries: Optional[Iterable[str]] = None):
+        self._service = service
+        # Países del reporte (ISO-3): acotan la serie date×country del abanico por país
+        self._countries = {str(c).strip().lower() for c in (countries or []) if str(c).strip()}
+        self._slice_days = slice_days
+        self._max_workers = max_workers
+        self._series: Dict[tuple, _Series] = {}
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.served = 0
+
+    def _entry(self, key: tuple, dims: Sequence[str]) -> _Series:
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = _Series(dims)
+            return s
+
+    def daily(self, site_url: str, search_type: str, start, end, filters: Any = None,
+              dims: Sequence[str] = (), data_state: Optional[str] = None) -> pd.DataFrame:
+        """Filas diarias de [start, end]; solo se consultan los días que todavía no se bajaron."""
+        lo, hi = _as_date(start), _as_date(end)
+        dims = [d for d in dims if d != "date"]
+        key = (site_url, search_type or "web", data_state or "", _filters_key(filters), tuple(dims))
+        entry = self._entry(key, dims)
+        with entry.lock:
+            gaps = _missing_ranges(entry.covered, lo, hi)
+            if gaps:
+                body: Dict[str, Any] = {"dimensions": ["date", *dims], "type": search_type or "web"}
+                if filters:
+                    body["dimensionFilterGroups"] = filters
+                if data_state:
+                    body["dataState"] = data_state
+                # Mismo tramo con o sin dimensiones extra: la paginación cubre los tramos grandes
+                step = self._slice_days
+                new = []
+                with tracing.span("GSC: serie multi-período", "gsc"):
+                    for g_lo, g_hi in gaps:
+                        rows = fetch_rows_by_date_slices(self._service, site_url, body, g_lo, g_hi,
+                                                         slice_days=step, max_workers=self._max_workers)
+                        self.queries += 1
+                        new.append(rows_to_frame(rows, dims))
+                        entry.covered.update(range(g_lo.toordinal(), g_hi.toordinal() + 1))
+                entry.frame = pd.concat([entry.frame, *new], ignore_index=True).sort_values(["date", *dims], kind="stable")
+                debug_log("Planificador GSC: días pedidos", {"site": site_url, "tipo": search_type,
+                                                             "dims": dims, "tramos": [(str(a), str(b)) for a, b in gaps]})
+            frame = entry.frame
+        m = (frame["date"] >= str(lo)) & (frame["date"] <= str(hi))
+        return frame.loc[m].reset_index(drop=True)
+
+    def slices(self, site_url: str, search_type: str, periods: Iterable[Any], filters: Any = None,
+               by: Sequence[str] = (), data_state: Optional[str] = None) -> pd.DataFrame:
+        """Totales por período: baja la ventana unión de una vez y agrega con aggregate_periods."""
+        ps = _norm_periods(periods)
+        win = union_window(ps)
+        if win is None:
+            return aggregate_periods(None, [], by)
+        df = self.daily(site_url, search_type, win[0], win[1], filters=filters, dims=by, data_state=data_state)
+        return aggregate_periods(df, ps, by)
+
+    def answer(self, site_url: str, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Respuesta con forma de la API para `body`, o None si la consulta no es planificable."""
+        dims = list(body.get("dimensions") or [])
+        extra = [d for d in dims if d != "date"]
+        if any(d not in PLANNABLE_DIMS for d in extra) or len(set(dims)) != len(dims):
+            return None
+        if str(body.get("aggregationType", "auto")).lower() not in ("auto", "byproperty"):
+            return None
+        if not body.get("startDate") or not body.get("endDate"):
+            return None
+        groups = body.get("dimensionFilterGroups") or []
+        for g in groups:
+            for f in g.get("filters") or []:
+                if f.get("dimension") in ("page", "query"):
+                    # Filtros por página/consulta cambian los totales: se pide tal cual
+                    return None
+
+        fan = _country_fanout(groups) if "country" not in extra else None
+        if fan is not None:
+            # Un país: se responde desde la serie con country como dimensión (compartida por todos)
+            code, rest = fan
+            # Solo con los países de la ejecución conocidos: sin ellos la serie traería todos
+            if not self._countries or code not in self._countries:
+                fan = None
+        if fan is not None:
+            restrict = countries_filter(self._countries)
+            if restrict:
+                rest = [dict(rest[0], filters=list(rest[0]["filters"]) + [restrict])] if rest \
+                    else [{"groupType": "and", "filters": [restrict]}]
+            df = self.daily(site_url, str(body.get("type", "web")), body["startDate"], body["endDate"],
+                            filters=rest or None, dims=[*extra, "country"], data_state=body.get("dataState"))
+            df = df.loc[df["country"].str.lower() == code].drop(columns=["country"])
+        else:
+            # Los filtros (país, dispositivo, tipo) son parte de la clave de la serie
+            df = self.daily(site_url, str(body.get("type", "web")), body["startDate"], body["endDate"],
+                            filters=groups or None, dims=extra, data_state=body.get("dataState"))
+        with self._lock:
+            self.served += 1
+
+        if "date" in dims:
+            out = df.copy()
+            imp = out["impressions"].to_numpy(dtype=float)
+            out["ctr"] = np.divide(out["clicks"].to_numpy(dtype=float), imp, out=np.zeros(len(out)), where=imp > 0)
+        else:
+            out = aggregate_periods(df, [("w", body["startDate"], body["endDate"])], extra)
+            out = out.sort_values("clicks", ascending=False, kind="stable")
+        out = out[(out["impressions"] > 0) | (out["clicks"] > 0)]
+
+        start_row = int(body.get("startRow", 0) or 0)
+        row_limit = int(body.get("rowLimit", 1000) or 1000)
+        out = out.iloc[start_row:start_row + row_limit]
+        rows = []
+        for rec in out.itertuples(index=False):
+            r = rec._asdict()
+            clicks, impr = r["clicks"], r["impressions"]
+            row = {"keys": [str(r[d]) for d in dims]} if dims else {}
+            row.update({
+                "clicks": int(clicks) if float(clicks).is_integer() else clicks,
+                "impressions": int(impr) if float(impr).is_integer() else impr,
+                "ctr": float(r["ctr"]),
+                "position": float(r["position"]),
+            })
+            rows.append(row)
+        return {"rows": rows, "responseAggregationType": "byProperty"} if rows else {"responseAggregationType": "byProperty"}
+
+
+# ========= Servicio con planificador =========
+
+class _Answered:
+    def __init__(self, resp: Dict[str, Any]):
+        self._resp = resp
+
+    def execute(self, *args, **kwargs):
+        return self._resp
+
+
+class _LazyPlanned:
+    """Request diferido: el planificador (o la API) se consulta recién en execute()."""
+
+    def __init__(self, planner: PeriodPlanner, inner: Any, site_url: str, body: Dict[str, Any], kwargs):
+        self._planner, self._inner = planner, inner
+        self._site_url, self._body, self._kwargs = site_url, body, kwargs
+
+    def execute(self, *args, **kwargs):
+        try:
+            resp = self._planner.answer(self._site_url, self._body)
+        except Exception as e:
+            debug_log("Planificador GSC: consulta directa", str(e))
+            resp = None
+        if resp is not None:
+            return resp
+        return self._inner.query(siteUrl=self._site_url, body=self._body, **self._kwargs).execute(*args, **kwargs)
+
+
+class _PlannedSearchAnalytics:
+    def __init__(self, inner: Any, planner: PeriodPlanner):
+        self._inner = inner
+        self._planner = planner
+
+    def query(self, siteUrl=None, body=None, **kwargs):
+        return _LazyPlanned(self._planner, self._inner, siteUrl, dict(body or {}), kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class PlannedSearchConsole:
+    """
+    Proxy de un servicio searchconsole: las consultas de totales (date/country/device, sin
+    filtros por página o consulta) se responden desde un PeriodPlanner, así las ventanas que
+    se solapan entre períodos se piden una sola vez. El resto pasa directo a la API.
+    """
+
+    def __init__(self, service: Any, planner: Optional[PeriodPlanner] = None,
+                 countries: Optional[Iterable[str]] = None):
+        self._service = service
+        self.planner = planner or PeriodPlanner(service, countries=countries)
+
+    def searchanalytics(self):
+        return _PlannedSearchAnalytics(self._service.searchanalytics(), self.planner)
+
+    def __getattr__(self, name):
+        return getattr(self._service, name)
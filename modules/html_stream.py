@@ -0,0 +1,243 @@
+# modules/html_stream.py
+from __future__ import annotations
+
+"""
+Descarga parcial de HTML para extracción de metadatos.
+
+En vez de bajar la nota completa, lee el cuerpo por chunks y corta apenas:
+  - se cumple la condición `stop(texto_acumulado)` (p.ej. ya apareció article:published_time), o
+  - se leyó `</head>` (si stop_at_head=True), o
+  - se alcanzó el presupuesto de bytes `max_bytes`.
+
+Motor: aiohttp (una sola sesión con pool de conexiones y semáforo de concurrencia).
+Fallback: requests con stream=True en un ThreadPoolExecutor.
+
+Cada resultado es un dict:
+  {"url", "status", "error", "used", "length", "html", "truncated", "elapsed_ms"}
+"""
+
+import asyncio
+import codecs
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+DEFAULT_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+)
+CHUNK_SIZE = 16 * 1024
+
+_RE_HEAD_END = re.compile(r"</head\s*>", re.I)
+_RE_CHARSET = re.compile(r"charset=([\w\-]+)", re.I)
+
+# Señales de fecha de publicación suficientes para cortar la descarga
+_RE_PUB_META = re.compile(
+    r"<meta\b[^>]*(?:article:published_time|itemprop=[\"']datePublished)[^>]*>", re.I
+)
+_RE_PUB_JSONLD = re.compile(r"\"datePublished\"\s*:\s*\"[^\"]+\"")
+
+
+def has_pubdate_signal(text: str) -> bool:
+    """True si el fragmento ya contiene una fecha de publicación extraíble (meta o JSON-LD completo)."""
+    if _RE_PUB_META.search(text):
+        return True
+    m = _RE_PUB_JSONLD.search(text)
+    # El bloque JSON-LD tiene que estar cerrado para poder parsearlo
+    return bool(m) and text.find("</script", m.end()) != -1
+
+
+def _charset_from(content_type: str) -> str:
+    m = _RE_CHARSET.search(content_type or "")
+    if m:
+        try:
+            codecs.lookup(m.group(1))
+            return m.group(1)
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class _Reader:
+    """Acumula chunks decodificados y decide cuándo cortar."""
+
+    def __init__(self, charset: str, max_bytes: int, stop_at_head: bool,
+                 stop: Optional[Callable[[str], bool]]):
+        self._dec = codecs.getincrementaldecoder(charset)(errors="ignore")
+        self.max_bytes = max_bytes
+        self.stop_at_head = stop_at_head
+        self.stop = stop
+        self.parts: List[str] = []
+        self.nbytes = 0
+        self.truncated = False
+        self._tail = ""
+
+    def feed(self, chunk: bytes) -> bool:
+        """Agrega un chunk; devuelve True si hay que dejar de leer."""
+        self.nbytes += len(chunk)
+        piece = self._dec.decode(chunk)
+        self.parts.append(piece)
+        # buscar </head> en la costura entre chunks también
+        window = self._tail + piece
+        self._tail = piece[-16:]
+        if self.stop_at_head:
+            m = _RE_HEAD_END.search(window)
+            if m:
+                # recortar lo que vino después de </head>
+                extra = len(window) - m.end()
+                if extra > 0:
+                    self.parts[-1] = self.parts[-1][: len(self.parts[-1]) - extra]
+                self.truncated = True
+                return True
+        if self.stop is not None and self.stop(self.text()):
+            self.truncated = True
+            return True
+        if self.max_bytes and self.nbytes >= self.max_bytes:
+            self.truncated = True
+            return True
+        return False
+
+    def text(self) -> str:
+        if len(self.parts) > 1:
+            self.parts = ["".join(self.parts)]
+        return self.parts[0] if self.parts else ""
+
+
+# ========= Motor async =========
+
+async def fetch_partial(session, url: str, *, timeout_s: float = 8.0, max_bytes: int = 256 * 1024,
+                        stop_at_head: bool = False, stop: Optional[Callable[[str], bool]] = None,
+                        headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    import aiohttp  # type: ignore
+
+    info: Dict[str, Any] = {"url": url, "status": 0, "error": "", "used": "aiohttp", "length": 0,
+                            "html": "", "truncated": False, "elapsed_ms": 0}
+    t0 = time.perf_counter()
+    try:
+        tmo = aiohttp.ClientTimeout(total=timeout_s)
+        async with session.get(url, timeout=tmo, allow_redirects=True, headers=headers) as resp:
+            info["status"] = resp.status
+            if resp.status >= 400:
+                info["error"] = f"http {resp.status}"
+                return info
+            reader = _Reader(_charset_from(resp.headers.get("Content-Type", "")), max_bytes, stop_at_head, stop)
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                if reader.feed(chunk):
+                    break
+            info["html"] = reader.text()
+            info["length"] = reader.nbytes
+            info["truncated"] = reader.truncated
+            if reader.truncated:
+                # No drenar el resto del cuerpo: cerrar la conexión
+                resp.close()
+    except Exception as e:
+        info["error"] = str(e) or type(e).__name__
+    finally:
+        info["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+    return info
+
+
+async def _fetch_many_async(urls: List[str], ua: str, concurrency: int, on_result, **kw) -> List[Dict[str, Any]]:
+    import aiohttp  # type: ignore
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+    connector = aiohttp.TCPConnector(limit=max(1, concurrency), limit_per_host=max(1, min(concurrency, 16)),
+                                     ttl_dns_cache=300)
+    out: List[Dict[str, Any]] = []
+    async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": ua}) as session:
+        async def _one(u):
+            async with sem:
+                return await fetch_partial(session, u, **kw)
+
+        for coro in asyncio.as_completed([_one(u) for u in urls]):
+            res = await coro
+            out.append(res)
+            if on_result is not None:
+                on_result(res)
+    return out
+
+
+# ========= Fallback sync =========
+
+def fetch_partial_sync(url: str, ua: str, *, timeout_s: float = 8.0, max_bytes: int = 256 * 1024,
+                        stop_at_head: bool = False, stop: Optional[Callable[[str], bool]] = None) -> Dict[str, Any]:
+    import requests  # type: ignore
+
+    info: Dict[str, Any] = {"url": url, "status": 0, "error": "", "used": "requests", "length": 0,
+                            "html": "", "truncated": False, "elapsed_ms": 0}
+    t0 = time.perf_counter()
+    try:
+        with requests.get(url, headers={"User-Agent": ua}, timeout=timeout_s,
+                          allow_redirects=True, stream=True) as rs:
+            info["status"] = rs.status_code
+            if rs.status_code >= 400:
+                info["error"] = f"http {rs.status_code}"
+                return info
+            reader = _Reader(_charset_from(rs.headers.get("Content-Type", "")), max_bytes, stop_at_head, stop)
+            for chunk in rs.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk and reader.feed(chunk):
+                    break
+            info["html"] = reader.text()
+            info["length"] = reader.nbytes
+            info["truncated"] = reader.truncated
+    except Exception as e:
+        info["error"] = str(e) or type(e).__name__
+    finally:
+        info["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+    return info
+
+
+def _fetch_many_sync(urls: List[str], ua: str, concurrency: int, on_result, **kw) -> List[Dict[str, Any]]:
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    out: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+        futs = [ex.submit(fetch_partial_sync, u, ua, **kw) for u in urls]
+        for f in as_completed(futs):
+            res = f.result()
+            out.append(res)
+            if on_result is not None:
+                on_result(res)
+    return out
+
+
+def _run_coro(coro):
+    """asyncio.run, o un loop propio en otro hilo si ya hay uno corriendo en este."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    out: Dict[str, Any] = {}
+
+    def _target():
+        try:
+            out["value"] = asyncio.run(coro)
+        except BaseException as e:  # se re-lanza en el hilo que llamó
+            out["error"] = e
+
+    t = threading.Thread(target=_target, name="html-stream")
+    t.start()
+    t.join()
+    if "error" in out:
+        raise out["error"]
+    return out.get("value")
+
+
+def fetch_many_partial(urls: Iterable[str], *, ua: str = DEFAULT_UA, concurrency: int = 50,
+                       timeout_s: float = 8.0, max_bytes: int = 256 * 1024, stop_at_head: bool = False,
+                       stop: Optional[Callable[[str], bool]] = None,
+                       on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Descarga parcial de muchas URLs. Resultados en orden de llegada; `on_result` se llama
+    por cada uno (útil para progreso o para parsear mientras siguen llegando).
+    """
+    urls = [u for u in urls if u]
+    if not urls:
+        return []
+    kw = dict(timeout_s=timeout_s, max_bytes=max_bytes, stop_at_head=stop_at_head, stop=stop)
+    try:
+        import aiohttp  # type: ignore  # noqa: F401
+    except Exception:
+        return _fetch_many_sync(urls, ua, min(concurrency, 32), on_result, **kw)
+    return _run_coro(_fetch_many_async(urls, ua, concurrency, on_result, **kw))
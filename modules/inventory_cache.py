@@ -0,0 +1,98 @@
+# modules/inventory_cache.py
+from __future__ import annotations
+
+"""
+Caché por credencial de inventarios que casi no cambian (sitios de Search Console,
+propiedades GA4), compartido entre reruns y pestañas del mismo usuario.
+
+- Fresco (< FRESH_S): se devuelve sin llamar a la API.
+- Viejo pero usable (< STALE_S): se devuelve lo cacheado y se refresca en segundo plano.
+- Más viejo o sin entrada: se carga en el momento (los errores se propagan, no se cachean).
+- invalidate(): al cambiar de cuenta/propiedad o con el botón de actualizar.
+
+La clave es credentials_key (modules/google_clients.py): client_id + refresh_token + scopes.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .utils import debug_log
+
+FRESH_S = 10 * 60
+STALE_S = 6 * 60 * 60
+
+KIND_GSC_SITES = "gsc_sites"
+KIND_GA4_PROPERTIES = "ga4_properties"
+
+_LOCK = threading.Lock()
+# (kind, ckey) -> (cargado_en, valor)
+_ENTRIES: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_REFRESHING: set = set()
+
+
+def key_for(creds: Any) -> str:
+    """credentials_key de un objeto Credentials o del dict guardado en session_state."""
+    from .google_clients import credentials_key
+    if isinstance(creds, dict):
+        creds = SimpleNamespace(**creds)
+    return credentials_key(creds)
+
+
+def _store(key: Tuple[str, str], value: Any) -> None:
+    with _LOCK:
+        _ENTRIES[key] = (time.time(), value)
+
+
+def _refresh_in_background(key: Tuple[str, str], loader: Callable[[], Any]) -> None:
+    with _LOCK:
+        if key in _REFRESHING:
+            return
+        _REFRESHING.add(key)
+
+    def _run():
+        try:
+            _store(key, loader())
+        except Exception as e:
+            # Se conserva la versión vieja; el próximo rerun lo vuelve a intentar
+            debug_log(f"Refresco en segundo plano de {key[0]} falló", str(e))
+        finally:
+            with _LOCK:
+                _REFRESHING.discard(key)
+
+    threading.Thread(target=_run, name=f"inv-{key[0]}", daemon=True).start()
+
+
+def cached(kind: str, creds: Any, loader: Callable[[], Any],
+           fresh_s: float = FRESH_S, stale_s: float = STALE_S) -> Any:
+    """Valor de `loader()` cacheado por (kind, credencial) con refresco en segundo plano."""
+    key = (kind, key_for(creds))
+    with _LOCK:
+        entry = _ENTRIES.get(key)
+    if entry is not None:
+        age = time.time() - entry[0]
+        if age < fresh_s:
+            return entry[1]
+        if age < stale_s:
+            _refresh_in_background(key, loader)
+            return entry[1]
+    value = loader()
+    _store(key, value)
+    return value
+
+
+def invalidate(kind: Optional[str] = None, creds: Any = None) -> None:
+    """Olvida entradas: de un tipo, de una credencial, ambas cosas o todo."""
+    ckey = key_for(creds) if creds else None
+    with _LOCK:
+        for k in list(_ENTRIES):
+            if (kind is None or k[0] == kind) and (ckey is None or k[1] == ckey):
+                _ENTRIES.pop(k, None)
+
+
+def age_s(kind: str, creds: Any) -> Optional[float]:
+    """Segundos desde la última carga (None si no hay entrada)."""
+    with _LOCK:
+        entry = _ENTRIES.get((kind, key_for(creds)))
+    return None if entry is None else time.time() - entry[0]
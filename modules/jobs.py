@@ -0,0 +1,406 @@
+# modules/jobs.py
+from __future__ import annotations
+
+"""
+Cola local de trabajos: los análisis corren en procesos worker y no dentro del rerun de
+Streamlit (un click en otro widget o una desconexión ya no corta un informe de varios minutos,
+y el hilo del servidor queda libre).
+
+- Tabla SQLite (`.jobs/jobs.sqlite`, o SEO_JOBS_DB): estado, progreso, mensaje, resultado
+  (sheet IDs por sitio) y error de cada trabajo. WAL + conexiones cortas: la leen la UI y
+  los workers a la vez.
+- Workers: procesos `spawn` (SEO_JOB_WORKERS, 2 por defecto) que toman el trabajo en cola más
+  viejo, reconstruyen los clientes de Google con las credenciales del trabajo y corren el
+  runner de modules/app_ext sitio por sitio.
+- submit() encola; get()/list_jobs() para el polling de la UI; cancel() corta antes del
+  próximo sitio o en el próximo report(); report() deja progreso desde dentro de un runner
+  (no-op fuera de un worker) y levanta JobCancelled si pidieron cancelar.
+- Las credenciales OAuth viajan en `payload` solo mientras el trabajo está pendiente: al
+  terminar (listo, error o cancelado) se borran de la tabla.
+
+Solo se encolan runners con la firma (sc_service, drive_service, gs_client, site_url, params,
+dest_folder_id) exportados por modules/app_ext (ver JOBABLE).
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+DB_PATH = os.environ.get("SEO_JOBS_DB") or os.path.join(".jobs", "jobs.sqlite")
+DEFAULT_WORKERS = int(os.environ.get("SEO_JOB_WORKERS") or 2)
+POLL_S = 1.0
+
+QUEUED, RUNNING, DONE, ERROR, CANCELLED = "queued", "running", "done", "error", "cancelled"
+FINISHED = (DONE, ERROR, CANCELLED)
+
+# Runners de modules/app_ext que se pueden correr en un worker
+JOBABLE = (
+    "run_core_update",
+    "run_evergreen",
+    "run_traffic_audit",
+    "run_sections_analysis",
+    "run_report_results",
+    "run_content_analysis",
+    "run_content_structure",
+    "run_discover_retention",
+)
+
+# Variables de entorno que algunos runners leen (p.ej. filtros avanzados de Core Update)
+_ENV_PREFIX = "SEO_"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    owner       TEXT NOT NULL DEFAULT '',
+    title       TEXT NOT NULL DEFAULT '',
+    runner      TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    progress    REAL NOT NULL DEFAULT 0,
+    message     TEXT NOT NULL DEFAULT '',
+    result      TEXT NOT NULL DEFAULT '[]',
+    error       TEXT NOT NULL DEFAULT '',
+    cancel      INTEGER NOT NULL DEFAULT 0,
+    sites       INTEGER NOT NULL DEFAULT 1,
+    pid         INTEGER,
+    payload     BLOB,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, created_at);
+"""
+
+_LOCK = threading.Lock()
+_PROCS: List[Any] = []
+_READY: set = set()
+
+# Trabajo que corre en este proceso (solo dentro de un worker)
+_CURRENT: Dict[str, Any] = {}
+_CANCEL_CHECK_S = 2.0
+
+
+class JobCancelled(Exception):
+    """El usuario canceló el trabajo en curso (lo levanta report())."""
+
+
+# ========= Tabla =========
+
+def _connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    path = db_path or DB_PATH
+    con = sqlite3.connect(path, timeout=30, isolation_level=None)
+    con.row_factory = sqlite3.Row
+    if path not in _READY:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.executescript(_SCHEMA)
+        try:
+            con.execute("ALTER TABLE jobs ADD COLUMN sites INTEGER NOT NULL DEFAULT 1")
+        except sqlite3.OperationalError:
+            pass  # ya existe
+        _READY.add(path)
+    return con
+
+
+def _row_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    out = {k: row[k] for k in row.keys() if k != "payload"}
+    try:
+        out["result"] = json.loads(out.get("result") or "[]")
+    except Exception:
+        out["result"] = []
+    return out
+
+
+def _update(job_id: str, db_path: Optional[str] = None, **fields: Any) -> None:
+    if not fields:
+        return
+    if fields.get("status") in FINISHED:
+        fields["payload"] = None  # credenciales fuera de la tabla apenas termina
+    cols = ", ".join(f"{k} = ?" for k in fields)
+    con = _connect(db_path)
+    try:
+        con.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))
+    finally:
+        con.close()
+
+
+# ========= API para la UI =========
+
+def runner_name_for(fn: Any) -> Optional[str]:
+    """Nombre en modules/app_ext del runner `fn` (None si no es encolable)."""
+    try:
+        from modules import app_ext
+    except Exception:
+        return None
+    for name in JOBABLE:
+        if fn is not None and getattr(app_ext, name, None) is fn:
+            return name
+    return None
+
+
+def submit(runner: str, site_urls: Sequence[str], params: Any, dest_folder_id: Optional[str],
+           creds_src: Optional[Dict[str, Any]], creds_dest: Dict[str, Any], *, title: str = "",
+           owner: str = "", activity: Optional[Dict[str, Any]] = None, db_path: Optional[str] = None) -> str:
+    """Encola un trabajo y devuelve su ID. Los workers se levantan si no están corriendo."""
+    if runner not in JOBABLE:
+        raise ValueError(f"El runner {runner!r} no se puede correr en segundo plano.")
+    payload = {
+        "site_urls": list(site_urls),
+        "params": params,
+        "dest_folder_id": dest_folder_id,
+        "creds_src": dict(creds_src) if creds_src else None,
+        "creds_dest": dict(creds_dest),
+        "env": {k: v for k, v in os.environ.items() if k.startswith(_ENV_PREFIX)},
+        "activity": dict(activity or {}),
+    }
+    job_id = uuid.uuid4().hex[:12]
+    con = _connect(db_path)
+    try:
+        con.execute(
+            "INSERT INTO jobs (id, owner, title, runner, status, sites, payload, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, owner or "", title or runner, runner, QUEUED, len(payload["site_urls"]),
+             pickle.dumps(payload), time.time()),
+        )
+    finally:
+        con.close()
+    ensure_workers(db_path=db_path)
+    return job_id
+
+
+def get(job_id: str, db_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    con = _connect(db_path)
+    try:
+        row = con.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        con.close()
+    return _row_dict(row) if row else None
+
+
+def list_jobs(owner: Optional[str] = None, limit: int = 20, db_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Trabajos más recientes primero (de un owner, o todos)."""
+    con = _connect(db_path)
+    try:
+        if owner is None:
+            rows = con.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        else:
+            rows = con.execute("SELECT * FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?",
+                               (owner, limit)).fetchall()
+    finally:
+        con.close()
+    return [_row_dict(r) for r in rows]
+
+
+def can_cancel(job: Dict[str, Any]) -> bool:
+    """
+    En cola siempre; corriendo, solo si tiene varios sitios (corta entre sitios). Un runner de
+    un solo sitio solo se entera en report(), y no todos lo llaman.
+    """
+    return job.get("status") == QUEUED or (job.get("status") == RUNNING and int(job.get("sites") or 1) > 1)
+
+
+def cancel(job_id: str, db_path: Optional[str] = None) -> None:
+    """En cola: se cancela ya. Corriendo: se corta antes del próximo sitio (o en report())."""
+    con = _connect(db_path)
+    try:
+        con.execute("UPDATE jobs SET status = ?, finished_at = ?, message = 'Cancelado', payload = NULL "
+                    "WHERE id = ? AND status = ?",
+                    (CANCELLED, time.time(), job_id, QUEUED))
+        con.execute("UPDATE jobs SET cancel = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+    finally:
+        con.close()
+
+
+def report(progress: Optional[float] = None, message: Optional[str] = None) -> None:
+    """
+    Progreso del trabajo en curso (0..1 dentro del sitio actual). No-op fuera de un worker.
+    Levanta JobCancelled si el usuario canceló (se consulta cada _CANCEL_CHECK_S como mucho).
+    """
+    job_id = _CURRENT.get("id")
+    if not job_id:
+        return
+    now = time.monotonic()
+    if now - _CURRENT.get("cancel_checked", 0.0) >= _CANCEL_CHECK_S:
+        _CURRENT["cancel_checked"] = now
+        if _cancel_requested(job_id, _CURRENT.get("db_path")):
+            raise JobCancelled(job_id)
+    fields: Dict[str, Any] = {}
+    if progress is not None:
+        i, n = _CURRENT.get("site_index", 0), max(1, _CURRENT.get("sites", 1))
+        fields["progress"] = round((i + max(0.0, min(1.0, float(progress)))) / n, 4)
+    if message is not None:
+        fields["message"] = str(message)[:500]
+    try:
+        _update(job_id, _CURRENT.get("db_path"), **fields)
+    except Exception:
+        pass
+
+
+# ========= Workers =========
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except OSError:
+        return False
+
+
+def _reap_orphans(db_path: Optional[str] = None) -> None:
+    """Trabajos 'running' cuyo worker ya no existe (reinicio del servidor, crash) → error."""
+    con = _connect(db_path)
+    try:
+        rows = con.execute("SELECT id, pid FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+        for r in rows:
+            if not _pid_alive(r["pid"]):
+                con.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ?, payload = NULL "
+                            "WHERE id = ? AND status = ?",
+                            (ERROR, "El worker se interrumpió antes de terminar.", time.time(), r["id"], RUNNING))
+    finally:
+        con.close()
+
+
+def ensure_workers(n: Optional[int] = None, db_path: Optional[str] = None) -> int:
+    """Levanta (o repone) los procesos worker de este servidor. Devuelve cuántos hay vivos."""
+    import multiprocessing as mp
+
+    n = max(1, int(n or DEFAULT_WORKERS))
+    path = os.path.abspath(db_path or DB_PATH)
+    with _LOCK:
+        _PROCS[:] = [p for p in _PROCS if p.is_alive()]
+        if len(_PROCS) < n:
+            _reap_orphans(path)
+            ctx = mp.get_context("spawn")  # fork no es seguro con los hilos del servidor
+            for _ in range(n - len(_PROCS)):
+                p = ctx.Process(target=_worker_main, args=(path, os.getpid()), name="seo-job-worker", daemon=True)
+                p.start()
+                _PROCS.append(p)
+        return len(_PROCS)
+
+
+def _claim(db_path: str) -> Optional[sqlite3.Row]:
+    con = _connect(db_path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        row = con.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)).fetchone()
+        if row is not None:
+            con.execute("UPDATE jobs SET status = ?, pid = ?, started_at = ?, message = 'Iniciando' WHERE id = ?",
+                        (RUNNING, os.getpid(), time.time(), row["id"]))
+        con.execute("COMMIT")
+        return row
+    except Exception:
+        try:
+            con.execute("ROLLBACK")
+        except Exception:
+            pass
+        raise
+    finally:
+        con.close()
+
+
+def _cancel_requested(job_id: str, db_path: Optional[str]) -> bool:
+    con = _connect(db_path)
+    try:
+        row = con.execute("SELECT cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        con.close()
+    return bool(row and row["cancel"])
+
+
+def _run_job(row: sqlite3.Row, db_path: str) -> None:
+    from google.oauth2.credentials import Credentials
+
+    from modules import app_ext, checkpoints, tracing
+    from modules.app_activity import activity_log_append, maybe_prefix_sheet_name_with_medio
+    from modules.drive import ensure_drive_clients
+    from modules.gsc import ensure_sc_client
+
+    job_id = row["id"]
+    payload = pickle.loads(row["payload"])
+    os.environ.update(payload.get("env") or {})
+    fn = getattr(app_ext, row["runner"], None)
+    if fn is None:
+        raise RuntimeError(f"Este despliegue no incluye {row['runner']}.")
+
+    creds_src = Credentials(**payload["creds_src"]) if payload.get("creds_src") else None
+    creds_dest = Credentials(**payload["creds_dest"])
+    sc_service = ensure_sc_client(creds_src) if creds_src else None
+    drive_service, gs_client = ensure_drive_clients(creds_dest)
+
+    sites = payload["site_urls"]
+    activity = payload.get("activity") or {}
+    results: List[List[str]] = []
+    _CURRENT.update(id=job_id, db_path=db_path, sites=len(sites), site_index=0)
+    sink: Dict[str, Any] = {}
+    # Mismo checkpoint de lote que run_for_sites: un reintento saltea los sitios ya generados
+    batch = checkpoints.for_run("sites:" + row["runner"], list(sites), payload["params"],
+                                dest_folder_id=payload.get("dest_folder_id"),
+                                owner=checkpoints.owner_key(drive_service, gs_client))
+    done: Dict[str, Any] = batch.load("sites", {})
+    for i, site in enumerate(sites):
+        if _cancel_requested(job_id, db_path):
+            _update(job_id, db_path, status=CANCELLED, message="Cancelado", finished_at=time.time())
+            return
+        _CURRENT["site_index"] = i
+        if site in done:
+            if done[site]:
+                results.append([site, done[site]])
+                _update(job_id, db_path, result=json.dumps(results))
+            continue
+        _update(job_id, db_path, progress=round(i / len(sites), 4), message=f"{site} ({i + 1}/{len(sites)})")
+        with tracing.trace(row["title"], sink=sink, sitio=site):
+            sid = checkpoints.run_resumable(row["runner"], fn, sc_service, drive_service, gs_client, site,
+                                            payload["params"], payload.get("dest_folder_id"))
+        done[site] = sid
+        batch.save("sites", done)
+        if sid:
+            try:
+                maybe_prefix_sheet_name_with_medio(drive_service, sid, site)
+            except Exception:
+                pass
+            results.append([site, sid])
+            _update(job_id, db_path, result=json.dumps(results))
+            if activity.get("user_email") is not None:
+                activity_log_append(
+                    drive_service, gs_client,
+                    user_email=activity.get("user_email") or "", event="analysis", site_url=site,
+                    analysis_kind=activity.get("analysis_kind") or row["title"],
+                    sheet_id=sid, sheet_name="", sheet_url=f"https://docs.google.com/spreadsheets/d/{sid}",
+                    gsc_account=activity.get("gsc_account") or "", notes=f"job={job_id}",
+                )
+    batch.finish()
+    _update(job_id, db_path, status=DONE, progress=1.0, finished_at=time.time(),
+            message="Listo" if results else "Terminó sin generar documentos")
+
+
+def _worker_main(db_path: str, parent_pid: int) -> None:
+    """Bucle de un worker: toma trabajos en cola hasta que el servidor que lo levantó termina."""
+    while _pid_alive(parent_pid):
+        try:
+            row = _claim(db_path)
+        except sqlite3.OperationalError:
+            row = None
+        if row is None:
+            time.sleep(POLL_S)
+            continue
+        try:
+            _run_job(row, db_path)
+        except JobCancelled:
+            _update(row["id"], db_path, status=CANCELLED, message="Cancelado", finished_at=time.time())
+        except BaseException as e:
+            _update(row["id"], db_path, status=ERROR, message="Error", finished_at=time.time(),
+                    error=(f"{type(e).__name__}: {e}\n\n" + traceback.format_exc())[-4000:])
+            if isinstance(e, (KeyboardInterrupt, SystemExit)):
+                raise
+        finally:
+            _CURRENT.clear()
@@ -0,0 +1,192 @@
+# modules/lazy_imports.py
+from __future__ import annotations
+
+"""
+Carga diferida de módulos pesados + registro de tiempos de import.
+
+- lazy_module("pandas") devuelve un proxy: el import real ocurre en el primer acceso a un atributo.
+- timed_import(name) importa ya, pero registra cuánto tardó (solo la primera vez por proceso).
+- module_available(name) chequea si un paquete está instalado sin importarlo.
+- import_timings() alimenta el panel de DEBUG.
+
+Perfil de arranque en frío (proceso nuevo, -X importtime):
+    python -m modules.lazy_imports [modulo ...]
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+_LOCK = threading.RLock()
+_TIMINGS: Dict[str, float] = {}   # módulo -> segundos del primer import en este proceso
+
+
+def timed_import(name: str) -> types.ModuleType:
+    """importlib.import_module con registro del costo del primer import."""
+    mod = sys.modules.get(name)
+    if mod is not None and not isinstance(mod, _LazyModule):
+        return mod
+    t0 = time.perf_counter()
+    mod = importlib.import_module(name)
+    with _LOCK:
+        _TIMINGS.setdefault(name, time.perf_counter() - t0)
+    return mod
+
+
+def module_available(name: str) -> bool:
+    """True si el módulo se puede importar (no lo ejecuta)."""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except Exception:
+        return False
+
+
+_PASSIVE_DUNDERS = frozenset({"__file__", "__path__", "__cached__", "__wrapped__", "__origin__"})
+
+
+class _LazyModule(types.ModuleType):
+    """Proxy de módulo: resuelve el import real en el primer getattr."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = name
+        self.__dict__["_lazy_mod"] = None
+
+    def _lazy_load(self) -> types.ModuleType:
+        mod = self.__dict__["_lazy_mod"]
+        if mod is None:
+            with _LOCK:
+                mod = self.__dict__["_lazy_mod"]
+                if mod is None:
+                    mod = timed_import(self.__dict__["_lazy_target"])
+                    self.__dict__["_lazy_mod"] = mod
+        return mod
+
+    def __getattr__(self, attr: str) -> Any:
+        # Introspección (file watchers, inspect) no debe forzar el import
+        if attr in _PASSIVE_DUNDERS and self.__dict__["_lazy_mod"] is None:
+            raise AttributeError(attr)
+        return getattr(self._lazy_load(), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = "cargado" if self.__dict__["_lazy_mod"] is not None else "diferido"
+        return f"<lazy module {self.__dict__['_lazy_target']!r} ({state})>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """Módulo ya importado, o un proxy que lo importa recién cuando se usa."""
+    mod = sys.modules.get(name)
+    if mod is not None:
+        return mod
+    return _LazyModule(name)
+
+
+def is_loaded(mod_or_name: Any) -> bool:
+    if isinstance(mod_or_name, _LazyModule):
+        return mod_or_name.__dict__["_lazy_mod"] is not None
+    name = mod_or_name if isinstance(mod_or_name, str) else getattr(mod_or_name, "__name__", "")
+    mod = sys.modules.get(name)
+    return mod is not None and not isinstance(mod, _LazyModule)
+
+
+def import_timings() -> List[Tuple[str, float]]:
+    """[(módulo, segundos)] de los imports diferidos/temporizados, del más caro al más barato."""
+    with _LOCK:
+        return sorted(_TIMINGS.items(), key=lambda kv: kv[1], reverse=True)
+
+
+# ========= Perfil en frío (subproceso) =========
+
+# Lo que la pantalla de login necesita vs. lo que se difiere hasta elegir un análisis
+STARTUP_MODULES: Tuple[str, ...] = (
+    "streamlit",
+    "google.oauth2.credentials",
+    "modules.ui",
+    "modules.app_config",
+    "modules.app_utils",
+    "modules.app_errors",
+    "modules.app_auth_flow",
+    "modules.drive",
+)
+DEFERRED_MODULES: Tuple[str, ...] = (
+    "pandas",
+    "googleapiclient.discovery",
+    "gspread",
+    "google.analytics.data_v1beta",
+    "google.analytics.admin_v1beta",
+    "google.generativeai",
+    "bs4",
+    "lxml.html",
+    "aiohttp",
+    "spacy",
+    "modules.gsc",
+    "modules.app_ext",
+    "modules.app_params",
+)
+
+
+def profile_cold_import(modules: Tuple[str, ...], python: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Importa `modules` en un intérprete nuevo con -X importtime y devuelve
+    {"total_s": float, "top": [(módulo, acumulado_s)]}.
+    """
+    import os
+    import subprocess
+
+    script = (
+        "import importlib, time\n"
+        "t0 = time.perf_counter()\n"
+        f"for _m in {list(modules)!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(_m)\n"
+        "    except Exception:\n"
+        "        pass\n"
+        "print(time.perf_counter() - t0)\n"
+    )
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    rows: List[Tuple[str, float]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = [p.strip() for p in line.split(":", 1)[1].split("|")]
+            rows.append((name, int(cumulative) / 1e6))
+        except Exception:
+            continue
+    try:
+        total = float(proc.stdout.strip().splitlines()[-1])
+    except Exception:
+        total = float("nan")
+    return {
+        "total_s": round(total, 3),
+        "top": sorted(rows, key=lambda r: r[1], reverse=True)[:25],
+    }
+
+
+if __name__ == "__main__":
+    wanted = tuple(sys.argv[1:])
+    if wanted:
+        rep = profile_cold_import(wanted)
+        print(f"import en frío de {', '.join(wanted)}: {rep['total_s']:.2f}s")
+    else:
+        rep_login = profile_cold_import(STARTUP_MODULES)
+        rep_all = profile_cold_import(STARTUP_MODULES + DEFERRED_MODULES)
+        print(f"pantalla de login (imports eager): {rep_login['total_s']:.2f}s")
+        print(f"con todos los módulos pesados:     {rep_all['total_s']:.2f}s")
+        rep = rep_all
+    print("\nmódulos más caros (acumulado):")
+    for name, secs in rep["top"]:
+        print(f"  {secs:7.3f}s  {name}")
@@ -0,0 +1,162 @@
+# modules/pubdate_index.py
+from __future__ import annotations
+
+"""
+Índice local de fechas de publicación por URL (SQLite).
+
+La fecha de publicación de una nota no cambia: una vez detectada se guarda y
+los análisis siguientes (Discover Retention, Estructura de contenidos con w_pub)
+solo scrapean las URLs nuevas.
+
+Cada entrada: url -> {pub_date, pub_time, raw, method, source, fetched_at}
+Solo se guardan detecciones exitosas; las URLs sin fecha se reintentan en la próxima corrida.
+
+Ruta por defecto: .cache/pubdate_index.sqlite3 (override con PUBDATE_INDEX_PATH).
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+_LOCK = threading.RLock()
+_READY: set = set()
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "pubdate_index.sqlite3"
+)
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pubdates (
+    url        TEXT PRIMARY KEY,
+    pub_date   TEXT NOT NULL,
+    pub_time   TEXT NOT NULL DEFAULT '',
+    raw        TEXT NOT NULL DEFAULT '',
+    method     TEXT NOT NULL DEFAULT '',
+    source     TEXT NOT NULL DEFAULT '',
+    fetched_at TEXT NOT NULL
+)
+"""
+
+
+def index_path() -> str:
+    return os.environ.get("PUBDATE_INDEX_PATH") or DEFAULT_PATH
+
+
+def normalize_url(url: str) -> str:
+    """Clave del índice: sin espacios ni fragmento (#...)."""
+    u = (url or "").strip()
+    return u.split("#", 1)[0]
+
+
+def _connect() -> sqlite3.Connection:
+    path = index_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    if path not in _READY:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        conn.commit()
+        _READY.add(path)
+    return conn
+
+
+def get_many(urls: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """{url_original: entrada} para las URLs que ya están en el índice."""
+    by_key: Dict[str, List[str]] = {}
+    for u in urls:
+        if u:
+            by_key.setdefault(normalize_url(u), []).append(u)
+    if not by_key:
+        return {}
+
+    out: Dict[str, Dict[str, str]] = {}
+    keys = list(by_key)
+    try:
+        with _LOCK:
+            conn = _connect()
+            try:
+                for i in range(0, len(keys), _BATCH):
+                    chunk = keys[i:i + _BATCH]
+                    q = ("SELECT url, pub_date, pub_time, raw, method, source, fetched_at FROM pubdates "
+                         f"WHERE url IN ({','.join('?' * len(chunk))})")
+                    for url, d, t, raw, method, source, fetched_at in conn.execute(q, chunk):
+                        entry = {"pub_date": d, "pub_time": t, "raw": raw, "method": method,
+                                 "source": source, "fetched_at": fetched_at}
+                        for orig in by_key.get(url, []):
+                            out[orig] = entry
+            finally:
+                conn.close()
+    except Exception:
+        # El índice es una optimización: si falla, se scrapea como siempre
+        return {}
+    return out
+
+
+def put_many(entries: Iterable[Dict[str, Any]], source: str = "") -> int:
+    """
+    Guarda/actualiza entradas {url, pub_date, pub_time?, raw?, method?}.
+    Ignora las que no traen pub_date. Devuelve cuántas se escribieron.
+    """
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    rows = []
+    for e in entries:
+        url = normalize_url(str(e.get("url") or ""))
+        pub_date = str(e.get("pub_date") or "").strip()
+        if not url or not pub_date:
+            continue
+        rows.append((url, pub_date, str(e.get("pub_time") or ""), str(e.get("raw") or ""),
+                     str(e.get("method") or ""), str(e.get("source") or source), now))
+    if not rows:
+        return 0
+    try:
+        with _LOCK:
+            conn = _connect()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pubdates (url, pub_date, pub_time, raw, method, source, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.commit()
+            finally:
+                conn.close()
+    except Exception:
+        return 0
+    return len(rows)
+
+
+def stats() -> Dict[str, Any]:
+    """Resumen para diagnóstico."""
+    path = index_path()
+    if not os.path.exists(path):
+        return {"path": path, "urls": 0, "size_kb": 0}
+    try:
+        with _LOCK:
+            conn = _connect()
+            try:
+                n = conn.execute("SELECT COUNT(*) FROM pubdates").fetchone()[0]
+                last = conn.execute("SELECT MAX(fetched_at) FROM pubdates").fetchone()[0]
+            finally:
+                conn.close()
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+    return {"path": path, "urls": int(n), "last_fetched_at": last or "",
+            "size_kb": round(os.path.getsize(path) / 1024, 1)}
+
+
+def forget(urls: Optional[Iterable[str]] = None) -> None:
+    """Borra entradas puntuales, o todo el índice si urls es None."""
+    with _LOCK:
+        conn = _connect()
+        try:
+            if urls is None:
+                conn.execute("DELETE FROM pubdates")
+            else:
+                keys = [normalize_url(u) for u in urls if u]
+                for i in range(0, len(keys), _BATCH):
+                    chunk = keys[i:i + _BATCH]
+                    conn.execute(f"DELETE FROM pubdates WHERE url IN ({','.join('?' * len(chunk))})", chunk)
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,152 @@
+# modules/structured_data.py
+from __future__ import annotations
+
+"""
+Extractor de datos estructurados (JSON-LD schema.org) para los scrapers.
+
+- Ubica los <script type="application/ld+json"> con una sola pasada de regex compilada.
+- Parsea con orjson si está instalado (json estándar si no); html.unescape solo si el
+  bloque no parsea tal cual, y como último recurso una regex directa sobre el texto.
+- Recorre el grafo de forma iterativa y se queda con el nodo tipo Article más completo.
+- Los campos por bloque quedan en un LRU: el mismo JSON-LD (plantillas repetidas,
+  o la misma página en Discover Retention y Estructura de contenidos) se parsea una vez.
+
+Campos devueltos por article_fields(html):
+  {"type", "date_published", "date_modified", "headline", "author", "section"}
+"""
+
+import html as _html
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import orjson as _orjson  # type: ignore
+except Exception:
+    _orjson = None
+
+_RE_LD_BLOCK = re.compile(
+    r"<script\b[^>]*?type\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.I | re.S,
+)
+_RE_DATE_PUBLISHED = re.compile(r"\"datePublished\"\s*:\s*\"([^\"]+)\"")
+
+ARTICLE_TYPES = frozenset({
+    "article", "newsarticle", "reportagenewsarticle", "analysisnewsarticle", "opinionnewsarticle",
+    "reviewnewsarticle", "backgroundnewsarticle", "blogposting", "liveblogposting", "report",
+    "techarticle", "scholarlyarticle", "webpage",
+})
+FIELDS = ("type", "date_published", "date_modified", "headline", "author", "section")
+
+_EMPTY: Dict[str, str] = {k: "" for k in FIELDS}
+
+
+def _loads(text: str) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(text)
+    return json.loads(text)
+
+
+def iter_ld_blocks(html_text: str) -> Iterator[str]:
+    """Contenido crudo de cada bloque ld+json, en orden de aparición."""
+    if not html_text or "ld+json" not in html_text:
+        return
+    for m in _RE_LD_BLOCK.finditer(html_text):
+        block = m.group(1).strip()
+        if block:
+            yield block
+
+
+def _types(node: Dict[str, Any]) -> List[str]:
+    t = node.get("@type")
+    if isinstance(t, list):
+        return [str(x).lower() for x in t]
+    return [str(t).lower()] if t else []
+
+
+def _name_of(v: Any) -> str:
+    """author/articleSection pueden venir como string, dict {name} o lista de ambos."""
+    if isinstance(v, str):
+        return v.strip()
+    if isinstance(v, dict):
+        return str(v.get("name") or "").strip()
+    if isinstance(v, list):
+        names = [_name_of(x) for x in v]
+        return ", ".join(n for n in names if n)
+    return ""
+
+
+def _iter_nodes(data: Any) -> Iterator[Dict[str, Any]]:
+    stack = [data]
+    while stack:
+        o = stack.pop()
+        if isinstance(o, dict):
+            yield o
+            stack.extend(v for v in reversed(list(o.values())) if isinstance(v, (dict, list)))
+        elif isinstance(o, list):
+            stack.extend(reversed(o))
+
+
+def _fields_from_data(data: Any) -> Dict[str, str]:
+    best: Optional[Dict[str, str]] = None
+    best_score = -1
+    for node in _iter_nodes(data):
+        types = _types(node)
+        if not any(t in ARTICLE_TYPES for t in types):
+            continue
+        date_pub = node.get("datePublished") or node.get("dateCreated") or ""
+        cand = {
+            "type": types[0] if types else "",
+            "date_published": date_pub.strip() if isinstance(date_pub, str) else "",
+            "date_modified": str(node.get("dateModified") or "").strip(),
+            "headline": str(node.get("headline") or "").strip(),
+            "author": _name_of(node.get("author")),
+            "section": _name_of(node.get("articleSection")),
+        }
+        # WebPage solo desempata: un Article con fecha siempre gana
+        score = sum(1 for k in FIELDS[1:] if cand[k]) + (0 if "webpage" in types else 10)
+        if cand["date_published"]:
+            score += 5
+        if score > best_score:
+            best, best_score = cand, score
+    return best or dict(_EMPTY)
+
+
+@lru_cache(maxsize=4096)
+def _fields_from_block(block: str) -> Dict[str, str]:
+    for text in (block, _html.unescape(block)):
+        try:
+            return _fields_from_data(_loads(text))
+        except Exception:
+            continue
+    # JSON roto (comas colgantes, comentarios, etc.): al menos la fecha
+    out = dict(_EMPTY)
+    m = _RE_DATE_PUBLISHED.search(_html.unescape(block))
+    if m:
+        out["date_published"] = m.group(1).strip()
+    return out
+
+
+def article_fields(html_text: str) -> Dict[str, str]:
+    """
+    Campos schema.org del artículo de la página. Combina bloques: el primero que trae
+    cada campo gana. Todos los valores son strings ("" si no hay).
+    """
+    out = dict(_EMPTY)
+    for block in iter_ld_blocks(html_text):
+        got = _fields_from_block(block)
+        for k in FIELDS:
+            if not out[k] and got[k]:
+                out[k] = got[k]
+        if all(out[k] for k in FIELDS):
+            break
+    return out
+
+
+def date_published(html_text: str) -> str:
+    return article_fields(html_text)["date_published"]
+
+
+def cache_info():
+    return _fields_from_block.cache_info()
@@ -0,0 +1,300 @@
+# modules/tracing.py
+from __future__ import annotations
+
+"""
+Trazas de tiempo por etapa para los runners (sin dependencias de Streamlit).
+
+- trace(nombre): abre una traza (o un span "runner" si ya hay una activa).
+- span(nombre, kind=...): mide un tramo; casi gratis si no hay traza activa.
+- add(api_calls=, rows=, bytes=): suma contadores al span actual.
+- bind(fn): propaga la traza a hilos de un ThreadPoolExecutor.
+
+Las llamadas a Google (googleapiclient, gspread, GA4 Data) se instrumentan solas desde
+modules/google_clients.py; los helpers de GSC/GA4/Sheets agregan spans con contexto.
+breakdown() resume por tipo (gsc, ga4, sheets, drive, docs, ai…) con el tiempo de pared
+de cada tipo (unión de intervalos, así los hilos en paralelo no se suman dos veces) y
+lo que queda sin instrumentar como "procesamiento".
+"""
+
+import contextvars
+import functools
+import itertools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, MutableMapping, Optional, Tuple
+
+_CURRENT: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("tracing_span", default=None)
+
+# Kinds que solo estructuran la traza (no cuentan como trabajo propio en el desglose)
+STRUCTURAL_KINDS = ("runner", "sites")
+COUNTERS = ("api_calls", "rows", "bytes")
+SESSION_KEY = "_traces"
+MAX_TRACES = 10
+
+_IDS = itertools.count(1)
+
+
+class Span:
+    __slots__ = ("id", "parent_id", "name", "kind", "attrs", "counters", "t0", "t1", "thread", "error", "trace")
+
+    def __init__(self, trace: "Trace", name: str, kind: str, parent_id: Optional[int], attrs: Dict[str, Any]):
+        self.id = next(_IDS)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind or "otro"
+        self.attrs = attrs
+        self.counters: Dict[str, int] = {}
+        self.t0 = time.perf_counter()
+        self.t1: Optional[float] = None
+        self.thread = threading.current_thread().name
+        self.error = ""
+        self.trace = trace
+
+    @property
+    def duration(self) -> float:
+        return ((self.t1 if self.t1 is not None else time.perf_counter()) - self.t0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        base = self.trace.root.t0
+        return {
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_s": round(self.t0 - base, 4),
+            "end_s": round((self.t1 if self.t1 is not None else time.perf_counter()) - base, 4),
+            "duration_s": round(self.duration, 4),
+            "thread": self.thread,
+            "error": self.error,
+            "counters": dict(self.counters),
+            "attrs": {k: _jsonable(v) for k, v in self.attrs.items()},
+        }
+
+
+class Trace:
+    def __init__(self, name: str, kind: str = "runner", attrs: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self._new_span(name, kind, None, dict(attrs or {}))
+
+    def _new_span(self, name: str, kind: str, parent_id: Optional[int], attrs: Dict[str, Any]) -> Span:
+        sp = Span(self, name, kind, parent_id, attrs)
+        with self._lock:
+            self.spans.append(sp)
+        return sp
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def totals(self) -> Dict[str, int]:
+        out = {c: 0 for c in COUNTERS}
+        with self._lock:
+            spans = list(self.spans)
+        for sp in spans:
+            for k, v in sp.counters.items():
+                out[k] = out.get(k, 0) + v
+        return out
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """Una fila por tipo de trabajo + "procesamiento" (tiempo no cubierto por ninguno)."""
+        with self._lock:
+            spans = list(self.spans)
+        total = self.root.duration
+        by_kind: Dict[str, Dict[str, Any]] = {}
+        work: List[Tuple[float, float]] = []
+        for sp in spans:
+            acc = by_kind.get(sp.kind)
+            if acc is None and (sp.counters or sp.kind not in STRUCTURAL_KINDS):
+                acc = by_kind[sp.kind] = {"spans": 0, "intervals": [], **{c: 0 for c in COUNTERS}}
+            if acc is None:
+                continue
+            for k, v in sp.counters.items():
+                acc[k] = acc.get(k, 0) + v
+            if sp.kind in STRUCTURAL_KINDS:
+                continue
+            iv = (sp.t0, sp.t1 if sp.t1 is not None else time.perf_counter())
+            acc["spans"] += 1
+            acc["intervals"].append(iv)
+            work.append(iv)
+
+        rows = []
+        for kind, acc in by_kind.items():
+            wall = _union_length(acc.pop("intervals"))
+            if not acc["spans"] and not any(acc[c] for c in COUNTERS):
+                continue
+            rows.append({"etapa": kind, "segundos": round(wall, 3),
+                         "pct": round(100.0 * wall / total, 1) if total else 0.0, **acc})
+        rows.sort(key=lambda r: r["segundos"], reverse=True)
+        rest = max(0.0, total - _union_length(work))
+        rows.append({"etapa": "procesamiento", "segundos": round(rest, 3),
+                     "pct": round(100.0 * rest / total, 1) if total else 0.0,
+                     "spans": 0, **{c: 0 for c in COUNTERS}})
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_s": round(self.duration, 4),
+            "error": self.root.error,
+            "totals": self.totals(),
+            "breakdown": self.breakdown(),
+            "spans": [sp.to_dict() for sp in spans],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+
+# ========= API =========
+
+def _jsonable(v: Any) -> Any:
+    if v is None or isinstance(v, (bool, int, float, str)):
+        return v
+    return str(v)
+
+
+def _union_length(intervals: List[Tuple[float, float]]) -> float:
+    total, cur_lo, cur_hi = 0.0, None, None
+    for lo, hi in sorted(intervals):
+        if cur_hi is None or lo > cur_hi:
+            if cur_hi is not None:
+                total += cur_hi - cur_lo
+            cur_lo, cur_hi = lo, hi
+        else:
+            cur_hi = max(cur_hi, hi)
+    if cur_hi is not None:
+        total += cur_hi - cur_lo
+    return total
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def current_trace() -> Optional[Trace]:
+    sp = _CURRENT.get()
+    return sp.trace if sp is not None else None
+
+
+@contextmanager
+def span(name: str, kind: str = "", **attrs: Any) -> Iterator[Optional[Span]]:
+    """Span hijo del actual. Sin traza activa no mide nada y entrega None."""
+    parent = _CURRENT.get()
+    if parent is None:
+        yield None
+        return
+    sp = parent.trace._new_span(name, kind or parent.kind, parent.id, attrs)
+    token = _CURRENT.set(sp)
+    try:
+        yield sp
+    except BaseException as e:
+        sp.error = type(e).__name__
+        raise
+    finally:
+        sp.t1 = time.perf_counter()
+        _CURRENT.reset(token)
+
+
+@contextmanager
+def trace(name: str, kind: str = "runner", sink: Optional[MutableMapping[str, Any]] = None,
+          **attrs: Any) -> Iterator[Optional[Trace]]:
+    """
+    Traza nueva, o span `kind` dentro de la traza activa (entrega None en ese caso).
+    Con `sink` (p.ej. st.session_state) la traza raíz se guarda al cerrar con keep(),
+    también si el bloque termina con excepción (st.stop incluido).
+    """
+    if _CURRENT.get() is not None:
+        with span(name, kind, **attrs):
+            yield None
+        return
+    tr = Trace(name, kind, attrs)
+    token = _CURRENT.set(tr.root)
+    try:
+        yield tr
+    except BaseException as e:
+        tr.root.error = type(e).__name__
+        raise
+    finally:
+        tr.root.t1 = time.perf_counter()
+        _CURRENT.reset(token)
+        if sink is not None:
+            keep(sink, tr)
+
+
+def add(**counters: int) -> None:
+    """Suma contadores (api_calls, rows, bytes…) al span actual."""
+    sp = _CURRENT.get()
+    if sp is None:
+        return
+    c = sp.counters
+    for k, v in counters.items():
+        if v:
+            c[k] = c.get(k, 0) + int(v)
+
+
+def set_attrs(**attrs: Any) -> None:
+    sp = _CURRENT.get()
+    if sp is not None:
+        sp.attrs.update(attrs)
+
+
+def traced(name: Optional[str] = None, kind: str = "") -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorador: cada llamada a la función es un span."""
+    def _wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def _inner(*args, **kwargs):
+            if _CURRENT.get() is None:
+                return fn(*args, **kwargs)
+            with span(label, kind):
+                return fn(*args, **kwargs)
+        return _inner
+    return _wrap
+
+
+def bind(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Envuelve `fn` para que corra con la traza del hilo que llama a bind()
+    (los hilos de un ThreadPoolExecutor no heredan contextvars).
+    """
+    if _CURRENT.get() is None:
+        return fn
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def _inner(*args, **kwargs):
+        # Un Context no se puede entrar desde dos hilos a la vez: una copia por llamada
+        return ctx.copy().run(fn, *args, **kwargs)
+    return _inner
+
+
+# ========= Guardado por sesión =========
+
+def keep(sink: MutableMapping[str, Any], tr: Trace, limit: int = MAX_TRACES) -> None:
+    """Guarda la traza en sink[SESSION_KEY] (las últimas `limit`, la más nueva primero)."""
+    try:
+        traces = list(sink.get(SESSION_KEY) or [])
+        traces.insert(0, tr)
+        sink[SESSION_KEY] = traces[:limit]
+    except Exception:
+        pass
+
+
+def recent(sink: MutableMapping[str, Any]) -> List[Trace]:
+    try:
+        return list(sink.get(SESSION_KEY) or [])
+    except Exception:
+        return []